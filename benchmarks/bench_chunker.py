@@ -0,0 +1,87 @@
+"""
+Benchmark the offset-based chunker against LangChain's RecursiveCharacterTextSplitter.
+
+Usage:
+    python -m benchmarks.bench_chunker --size-mb 4
+"""
+import argparse
+import random
+import time
+
+from src.chunker import OffsetChunker
+
+
+def make_text(size_bytes: int, seed: int = 0) -> str:
+    """
+    Generate paragraph-structured text of roughly the requested size.
+
+    Args:
+        size_bytes: Approximate size of the text
+        seed: Random seed
+
+    Returns:
+        Generated text
+    """
+    rng = random.Random(seed)
+    words = ["neural", "network", "gradient", "descent", "attention", "the", "of", "loss", "function"]
+    parts = []
+    size = 0
+    while size < size_bytes:
+        lines = [" ".join(rng.choice(words) for _ in range(rng.randint(5, 30))) for _ in range(rng.randint(1, 6))]
+        paragraph = "\n".join(lines)
+        parts.append(paragraph)
+        size += len(paragraph) + 2
+    return "\n\n".join(parts)
+
+
+def best_of(fn, repeat: int) -> float:
+    """Return the fastest wall time of fn over several runs."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark text chunkers")
+    parser.add_argument("--size-mb", type=float, default=4, help="Size of the generated text in MB")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Maximum size of each chunk")
+    parser.add_argument("--overlap", type=int, default=200, help="Overlap between consecutive chunks")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of runs per chunker")
+    args = parser.parse_args()
+
+    text = make_text(int(args.size_mb * 1024 * 1024))
+    print(f"Text size: {len(text) / (1024 * 1024):.2f} MB")
+
+    chunker = OffsetChunker(chunk_size=args.chunk_size, overlap=args.overlap)
+    spans_time = best_of(lambda: chunker.split(text), args.repeat)
+    list_time = best_of(lambda: list(chunker.split(text)), args.repeat)
+    print(f"OffsetChunker spans:          {spans_time:.3f}s")
+    print(f"OffsetChunker materialized:   {list_time:.3f}s")
+
+    try:
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+    except ImportError:
+        print("langchain-text-splitters not installed; skipping comparison")
+        return
+
+    def run_langchain():
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=args.chunk_size,
+            chunk_overlap=args.overlap,
+            separators=["\n\n", "\n", " ", ""]
+        )
+        return splitter.split_text(text)
+
+    langchain_time = best_of(run_langchain, args.repeat)
+    print(f"RecursiveCharacterTextSplitter: {langchain_time:.3f}s")
+    print(f"Speedup (spans):        {langchain_time / spans_time:.1f}x")
+    print(f"Speedup (materialized): {langchain_time / list_time:.1f}x")
+
+    assert list(chunker.split(text)) == run_langchain(), "chunker output differs from LangChain"
+
+
+if __name__ == "__main__":
+    main()
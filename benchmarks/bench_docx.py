@@ -0,0 +1,102 @@
+"""
+Benchmark streaming DOCX extraction against the python-docx object model.
+
+Each extractor runs in a fresh subprocess so peak RSS is measured in isolation.
+
+Usage:
+    python -m benchmarks.bench_docx --paragraphs 20000 --tables 200
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# ru_maxrss survives exec on Linux, so prefer the per-address-space VmHWM
+_RUNNER = """
+import json, resource, sys, time
+from src.document import DocxExtractor
+
+def peak_kb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+extractor = DocxExtractor(streaming=sys.argv[2] == "streaming")
+start = time.perf_counter()
+text = extractor.extract(sys.argv[1])
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "peak_rss_mb": peak_kb() / 1024, "chars": len(text)}))
+"""
+
+
+def make_docx(path: str, paragraphs: int, tables: int) -> None:
+    """
+    Write a heavily styled DOCX file with paragraphs and tables.
+
+    Args:
+        path: Output path
+        paragraphs: Number of body paragraphs
+        tables: Number of 5x4 tables, spread evenly through the body
+    """
+    import docx
+
+    doc = docx.Document()
+    table_every = max(1, paragraphs // max(tables, 1))
+    for i in range(paragraphs):
+        paragraph = doc.add_paragraph(style="List Bullet" if i % 7 == 0 else None)
+        run = paragraph.add_run(f"Paragraph {i}: gradient descent updates the weights ")
+        run.bold = i % 2 == 0
+        paragraph.add_run("in the direction of the negative gradient.").italic = True
+        if tables and i % table_every == 0:
+            table = doc.add_table(rows=5, cols=4)
+            for row in table.rows:
+                for cell in row.cells:
+                    cell.text = f"cell {i}"
+    doc.save(path)
+
+
+def run(path: str, mode: str) -> dict:
+    """Run one extractor in a subprocess and return its measurements."""
+    result = subprocess.run(
+        [sys.executable, "-c", _RUNNER, path, mode],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DOCX extraction")
+    parser.add_argument("--paragraphs", type=int, default=20000, help="Number of paragraphs to generate")
+    parser.add_argument("--tables", type=int, default=200, help="Number of tables to generate")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "bench.docx")
+        make_docx(path, args.paragraphs, args.tables)
+        print(f"Document size: {os.path.getsize(path) / (1024 * 1024):.2f} MB")
+
+        results = {mode: run(path, mode) for mode in ("python-docx", "streaming")}
+
+    for mode, result in results.items():
+        print(f"{mode:12s} {result['seconds']:7.3f}s  peak RSS {result['peak_rss_mb']:7.1f} MB  "
+              f"{result['chars']} chars")
+
+    speedup = results["python-docx"]["seconds"] / results["streaming"]["seconds"]
+    print(f"Speedup: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
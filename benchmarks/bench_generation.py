@@ -0,0 +1,54 @@
+"""
+Benchmark sequential vs concurrent flashcard generation against the local stub server.
+
+Usage:
+    python -m benchmarks.bench_generation --chunks 15 --latency 0.5 --error-rate 0.1 --concurrency 5
+"""
+import argparse
+import time
+
+from benchmarks.stub_openai_server import start_stub_server
+from src.config import settings
+from src.flashcard_generator import FlashcardGenerator
+
+
+def run(chunks: list, concurrency: int, rpm: float, tpm: float) -> tuple:
+    """Generate cards once and return (elapsed seconds, cards)."""
+    generator = FlashcardGenerator(max_concurrency=concurrency, requests_per_minute=rpm, tokens_per_minute=tpm)
+    start = time.perf_counter()
+    cards = generator.generate(chunks)
+    return time.perf_counter() - start, cards
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark flashcard generation concurrency")
+    parser.add_argument("--chunks", type=int, default=15, help="Number of chunks to generate from")
+    parser.add_argument("--latency", type=float, default=0.5, help="Stub response latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Stub latency jitter in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.1, help="Fraction of 429 responses")
+    parser.add_argument("--concurrency", type=int, default=5, help="Concurrent requests for the parallel run")
+    parser.add_argument("--rpm", type=float, default=None, help="Requests-per-minute limit")
+    parser.add_argument("--tpm", type=float, default=None, help="Tokens-per-minute limit")
+    args = parser.parse_args()
+
+    server, url = start_stub_server(args.latency, args.jitter, args.error_rate)
+    settings.OPENAI_BASE_URL = url
+    settings.OPENAI_API_KEY = settings.OPENAI_API_KEY or "stub"
+
+    chunks = [f"Chunk {i}: stochastic gradient descent with momentum." for i in range(args.chunks)]
+    try:
+        sequential_time, sequential_cards = run(chunks, 1, args.rpm, args.tpm)
+        concurrent_time, concurrent_cards = run(chunks, args.concurrency, args.rpm, args.tpm)
+    finally:
+        server.shutdown()
+
+    print(f"Sequential:             {sequential_time:.2f}s ({len(sequential_cards)} cards)")
+    print(f"Concurrent (x{args.concurrency}):       {concurrent_time:.2f}s ({len(concurrent_cards)} cards)")
+    print(f"Speedup:                {sequential_time / concurrent_time:.1f}x")
+    print(f"Requests served: {server.RequestHandlerClass.requests}, "
+          f"429s: {server.RequestHandlerClass.rate_limited}")
+    print(f"Card order identical:   {sequential_cards == concurrent_cards}")
+
+
+if __name__ == "__main__":
+    main()
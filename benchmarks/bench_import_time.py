@@ -0,0 +1,74 @@
+"""
+Report startup import time for the CLI entry points using `python -X importtime`.
+
+Usage:
+    python -m benchmarks.bench_import_time
+    python -m benchmarks.bench_import_time --max-ms 150 --top 15
+
+Exits with status 1 if any module's cumulative import time exceeds --max-ms,
+so it can be used as a regression check in CI.
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_MODULES = ["src.cli", "src.generate_and_upload"]
+
+
+def import_times(module: str) -> List[Tuple[str, int, int]]:
+    """
+    Import a module in a fresh interpreter and collect its import timings.
+
+    Args:
+        module: Dotted module name to import
+
+    Returns:
+        List of (module name, self microseconds, cumulative microseconds)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings.append((name.strip(), int(self_us), int(cumulative_us)))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report startup import time for entry points")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="Modules to import")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest imports to list")
+    parser.add_argument("--max-ms", type=float, default=None, help="Fail if a module takes longer than this")
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        timings = import_times(module)
+        total_ms = next(cumulative for name, _, cumulative in timings if name == module) / 1000
+
+        print(f"{module}: {total_ms:.1f} ms")
+        for name, self_us, cumulative_us in sorted(timings, key=lambda t: t[1], reverse=True)[:args.top]:
+            print(f"  {self_us / 1000:8.1f} ms self  {cumulative_us / 1000:8.1f} ms cumulative  {name}")
+
+        if args.max_ms is not None and total_ms > args.max_ms:
+            print(f"  FAIL: exceeds {args.max_ms:.1f} ms")
+            failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
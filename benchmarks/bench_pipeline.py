@@ -0,0 +1,132 @@
+"""
+Load-test the generate-and-upload pipeline with the in-process fake LLM backend.
+
+Synthetic chunks are generated into cards at each concurrency level, then
+written to JSON and upserted into a fake Supabase client that sleeps for
+a fixed time per request, so generation and upload are measured without
+any network service.
+
+Usage:
+    python -m benchmarks.bench_pipeline --chunks 200 --latency 0.2 --sigma 0.5 --error-rate 0.05 --concurrency 1 4 16
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from src.flashcard_generator import FlashcardGenerator
+from src.flashcards_db import bulk_upsert_flashcards, upsert_flashcards_from_json
+from src.llm_backends import FakeLLMBackend
+from src.metrics import MetricsRegistry
+from src.model import OpenAIClient
+from src.retry import RetryPolicy
+
+
+class FakeSupabase:
+    """Minimal Supabase client whose requests take a fixed time."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.requests = 0
+        self.rows = 0
+
+    def table(self, name: str) -> "FakeSupabase":
+        return self
+
+    def upsert(self, rows: list, **kwargs) -> SimpleNamespace:
+        self.rows += len(rows)
+        return SimpleNamespace(execute=self.execute, request=SimpleNamespace(
+            session=self, http_method="POST", path="flashcards", json=rows, params=None, headers={}, auth=None,
+        ))
+
+    def execute(self) -> None:
+        self.requests += 1
+        time.sleep(self.latency)
+
+    def request(self, *args, **kwargs) -> SimpleNamespace:
+        self.execute()
+        return SimpleNamespace(is_success=True)
+
+
+def generate(chunks: list, concurrency: int, args: argparse.Namespace) -> tuple:
+    """Generate cards once and return (elapsed seconds, cards, backend, metrics)."""
+    backend = FakeLLMBackend(
+        latency=args.latency,
+        latency_sigma=args.sigma,
+        error_rate=args.error_rate,
+        cards_per_response=args.cards_per_response,
+        seed=concurrency,
+    )
+    metrics = MetricsRegistry()
+    client = OpenAIClient(
+        backend=backend,
+        retry_policy=RetryPolicy(base_delay=0.05, max_delay=1.0),
+        metrics=metrics,
+    )
+    generator = FlashcardGenerator(
+        max_concurrency=concurrency,
+        context_token_budget=args.context_tokens,
+        openai_client=client,
+        metrics=metrics,
+    )
+    start = time.perf_counter()
+    cards = generator.generate(chunks)
+    return time.perf_counter() - start, cards, backend, metrics
+
+
+def upload(cards: list, latency: float, page_size: int = None, workers: int = 4) -> tuple:
+    """Upload cards through the JSON upsert path, paged when page_size is set; return (elapsed seconds, fake client)."""
+    supabase = FakeSupabase(latency)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "flashcards.json")
+        with open(path, "w") as f:
+            json.dump(cards, f)
+        with patch("src.flashcards_db.get_supabase_client", return_value=supabase):
+            start = time.perf_counter()
+            if page_size:
+                bulk_upsert_flashcards(path, page_size=page_size, max_workers=workers)
+            else:
+                upsert_flashcards_from_json(path)
+            return time.perf_counter() - start, supabase
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test generation and upload with a fake LLM backend")
+    parser.add_argument("--chunks", type=int, default=200, help="Number of synthetic chunks")
+    parser.add_argument("--context-tokens", type=int, default=400, help="Prompt token budget per request")
+    parser.add_argument("--latency", type=float, default=0.2, help="Median fake LLM latency in seconds")
+    parser.add_argument("--sigma", type=float, default=0.5, help="Lognormal spread of the fake latency")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="Fraction of fake 429 responses")
+    parser.add_argument("--cards-per-response", type=int, default=5, help="Cards in each fake response")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16],
+                        help="Concurrency levels to measure")
+    parser.add_argument("--upload-latency", type=float, default=0.05, help="Fake Supabase request latency")
+    parser.add_argument("--upload-page-size", type=int, default=None, help="Rows per upsert page (default: one request)")
+    parser.add_argument("--upload-workers", type=int, default=4, help="Concurrent upsert requests for paged uploads")
+    args = parser.parse_args()
+
+    chunks = [
+        f"Section {i}: stochastic gradient descent updates parameters using mini-batch {i} of the data."
+        for i in range(args.chunks)
+    ]
+
+    print(f"{'concurrency':>11} {'seconds':>8} {'requests/s':>10} {'cards/s':>8} {'calls':>6} "
+          f"{'errors':>6} {'p50':>6} {'p95':>6}")
+    cards = []
+    for concurrency in args.concurrency:
+        elapsed, cards, backend, metrics = generate(chunks, concurrency, args)
+        latency = metrics.summary().get("llm_request_duration_seconds", [{}])[0]
+        print(f"{concurrency:>11} {elapsed:>8.2f} {backend.calls / elapsed:>10.1f} "
+              f"{len(cards) / elapsed:>8.1f} {backend.calls:>6} {backend.errors:>6} "
+              f"{latency.get('p50', '-'):>6} {latency.get('p95', '-'):>6}")
+
+    elapsed, supabase = upload(cards, args.upload_latency, args.upload_page_size, args.upload_workers)
+    print(f"Upload: {supabase.rows} rows in {supabase.requests} requests, "
+          f"{elapsed:.2f}s ({supabase.rows / elapsed:.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
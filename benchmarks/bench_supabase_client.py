@@ -0,0 +1,73 @@
+"""
+Benchmark get_flashcards with a new Supabase client per call vs the shared pooled client.
+
+Runs against the local PostgREST stand-in, which delays each new
+connection to stand in for the TCP and TLS handshakes of a remote
+database.
+
+Usage:
+    python -m benchmarks.bench_supabase_client --calls 200 --latency 0.002 --handshake-latency 0.03 --threads 1 8
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from benchmarks.stub_postgrest_server import start_stub_server
+from src import flashcards_db, supabase_client
+
+
+def per_call_client():
+    """The previous behavior: a new client, and connection, for every call."""
+    from supabase import create_client
+
+    return create_client(supabase_client.SUPABASE_URL, supabase_client.SUPABASE_KEY)
+
+
+def run(calls: int, threads: int) -> list:
+    """Call get_flashcards and return the latency of each call in seconds."""
+    def one(_):
+        start = time.perf_counter()
+        flashcards_db.get_flashcards(limit=20)
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        return list(executor.map(one, range(calls)))
+
+
+def report(name: str, latencies: list, elapsed: float, server) -> None:
+    ordered = sorted(latencies)
+    print(f"{name:<22} p50 {statistics.median(ordered) * 1000:7.1f}ms  "
+          f"p95 {ordered[int(0.95 * len(ordered)) - 1] * 1000:7.1f}ms  "
+          f"{len(latencies) / elapsed:7.0f} calls/s  "
+          f"{server.RequestHandlerClass.connections} connections")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Supabase client reuse")
+    parser.add_argument("--calls", type=int, default=200, help="get_flashcards calls per run")
+    parser.add_argument("--latency", type=float, default=0.002, help="Stub response latency in seconds")
+    parser.add_argument("--handshake-latency", type=float, default=0.03,
+                        help="Stub latency for each new connection in seconds")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8], help="Concurrent callers per run")
+    args = parser.parse_args()
+
+    for threads in args.threads:
+        print(f"{threads} thread(s), {args.calls} calls:")
+        for name, factory in (("new client per call", per_call_client),
+                              ("pooled client", supabase_client.get_supabase_client)):
+            server, url = start_stub_server(args.latency, args.handshake_latency)
+            with patch.object(supabase_client, "SUPABASE_URL", url), \
+                 patch.object(supabase_client, "SUPABASE_KEY", "stub"), \
+                 patch.object(flashcards_db, "get_supabase_client", factory):
+                start = time.perf_counter()
+                latencies = run(args.calls, threads)
+                elapsed = time.perf_counter() - start
+                supabase_client.close_supabase_client()
+            server.shutdown()
+            report(name, latencies, elapsed, server)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Local stand-in for the OpenAI chat completions endpoint.
+
+Simulates response latency, a slow tail, 429 rate-limit responses and
+streamed (server-sent event) completions so generation can be benchmarked
+and tested without network access or API spend.
+
+Usage:
+    python -m benchmarks.stub_openai_server --port 8099 --latency 0.5 --error-rate 0.1
+    OPENAI_BASE_URL=http://127.0.0.1:8099/v1 OPENAI_API_KEY=stub python -m src.generate_and_upload ...
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+
+
+class StubOpenAIHandler(BaseHTTPRequestHandler):
+    """Answers chat completion requests with a fixed set of flashcards."""
+
+    latency = 0.2
+    jitter = 0.0
+    error_rate = 0.0
+    retry_after = 0.1
+    slow_every = 0
+    slow_latency = 2.0
+    requests = 0
+    rate_limited = 0
+    _lock = threading.Lock()
+    _random = random.Random(0)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+
+        cls = type(self)
+        with cls._lock:
+            cls.requests += 1
+            throttled = cls._random.random() < cls.error_rate
+            delay = max(0.0, cls.latency + cls._random.uniform(-cls.jitter, cls.jitter))
+            if cls.slow_every and cls.requests % cls.slow_every == 0:
+                delay = cls.slow_latency
+            if throttled:
+                cls.rate_limited += 1
+
+        if throttled:
+            self._send_json(429, {"error": {"message": "Rate limit exceeded", "type": "rate_limit_error"}},
+                            {"Retry-After": str(cls.retry_after)})
+            return
+
+        time.sleep(delay)
+        prompt = body.get("messages", [{}])[-1].get("content", "")
+        cards = [
+            {
+                "question": f"Stub question {i} ({len(prompt)} prompt chars)",
+                "answer": f"Stub answer {i}",
+                "tags": ["stub"],
+            }
+            for i in range(5)
+        ]
+        content = json.dumps(cards)
+        if body.get("stream"):
+            self._send_stream(body.get("model", "stub"), content)
+            return
+
+        self._send_json(200, {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": len(prompt) // 4,
+                "completion_tokens": len(content) // 4,
+                "total_tokens": len(prompt) // 4 + len(content) // 4,
+            },
+        })
+
+    def _send_json(self, status: int, payload: dict, headers: dict = None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, model: str, content: str, piece_size: int = 32):
+        # The handler speaks HTTP/1.0, so closing the connection ends the stream
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for i in range(0, len(content), piece_size):
+            event = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": content[i:i + piece_size]}, "finish_reason": None}],
+            }
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub_server(
+    latency: float = 0.2,
+    jitter: float = 0.0,
+    error_rate: float = 0.0,
+    retry_after: float = 0.1,
+    port: int = 0,
+    seed: int = 0,
+    slow_every: int = 0,
+    slow_latency: float = 2.0
+) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Start the stub server on a background thread.
+
+    Args:
+        latency: Mean response latency in seconds
+        jitter: Maximum deviation from the mean latency in seconds
+        error_rate: Fraction of requests answered with 429
+        retry_after: Retry-After value sent with 429 responses
+        port: Port to listen on (0 picks a free port)
+        seed: Seed for the latency and error draws
+        slow_every: Make every nth request take slow_latency seconds (0 disables)
+        slow_latency: Latency of the slow requests in seconds
+
+    Returns:
+        Tuple of (server, base URL to use as OPENAI_BASE_URL)
+    """
+    handler = type("ConfiguredStubOpenAIHandler", (StubOpenAIHandler,), {
+        "latency": latency,
+        "jitter": jitter,
+        "error_rate": error_rate,
+        "retry_after": retry_after,
+        "slow_every": slow_every,
+        "slow_latency": slow_latency,
+        "requests": 0,
+        "rate_limited": 0,
+        "_lock": threading.Lock(),
+        "_random": random.Random(seed),
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a stub OpenAI chat completions server")
+    parser.add_argument("--port", type=int, default=8099, help="Port to listen on")
+    parser.add_argument("--latency", type=float, default=0.5, help="Mean response latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Latency jitter in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--slow-every", type=int, default=0, help="Make every nth request slow (0 disables)")
+    parser.add_argument("--slow-latency", type=float, default=2.0, help="Latency of slow requests in seconds")
+    args = parser.parse_args()
+
+    server, url = start_stub_server(args.latency, args.jitter, args.error_rate, port=args.port,
+                                    slow_every=args.slow_every, slow_latency=args.slow_latency)
+    print(f"Stub OpenAI server listening on {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Local stand-in for the Supabase REST (PostgREST) endpoint.
+
+Answers selects on the flashcards table, upserts and RPC calls with
+canned rows over HTTP/1.1 keep-alive. Each new connection waits for
+handshake_latency before it is served, standing in for the TCP and TLS
+handshakes of a remote database, so connection reuse can be measured
+locally.
+
+Usage:
+    python -m benchmarks.stub_postgrest_server --port 8098 --latency 0.005 --handshake-latency 0.05
+    SUPABASE_URL=http://127.0.0.1:8098 SUPABASE_KEY=stub python -m src.cli list
+"""
+import argparse
+import json
+import socket
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+
+
+class StubPostgRESTHandler(BaseHTTPRequestHandler):
+    """Answers PostgREST requests with generated flashcard rows."""
+
+    protocol_version = "HTTP/1.1"
+    latency = 0.0
+    handshake_latency = 0.0
+    requests = 0
+    connections = 0
+    _lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        # Headers and body are written separately; don't let Nagle hold the body back
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        cls = type(self)
+        with cls._lock:
+            cls.connections += 1
+        time.sleep(cls.handshake_latency)
+
+    def _count(self):
+        cls = type(self)
+        with cls._lock:
+            cls.requests += 1
+        time.sleep(cls.latency)
+
+    def do_GET(self):
+        self._count()
+        url = urllib.parse.urlsplit(self.path)
+        params = urllib.parse.parse_qs(url.query)
+        limit = int(params.get("limit", ["10"])[0])
+        rows = [
+            {
+                "id": f"00000000-0000-0000-0000-{i:012d}",
+                "question": f"Stub question {i}",
+                "answer": f"Stub answer {i}",
+                "tags": ["stub"],
+                "level": "intermediate",
+                "created_at": "2024-05-01T10:00:00+00:00",
+            }
+            for i in range(limit)
+        ]
+        self._send_json(200, rows)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"null")
+        self._count()
+        self._send_json(201 if "/rpc/" not in self.path else 200, body if isinstance(body, list) else [body])
+
+    def _send_json(self, status: int, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub_server(latency: float = 0.0, handshake_latency: float = 0.0, port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Start the stub server on a background thread.
+
+    Args:
+        latency: Time to answer each request in seconds
+        handshake_latency: Extra time before serving each new connection in seconds
+        port: Port to listen on (0 picks a free port)
+
+    Returns:
+        Tuple of (server, base URL to use as SUPABASE_URL)
+    """
+    handler = type("ConfiguredStubPostgRESTHandler", (StubPostgRESTHandler,), {
+        "latency": latency,
+        "handshake_latency": handshake_latency,
+        "requests": 0,
+        "connections": 0,
+        "_lock": threading.Lock(),
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a stub PostgREST server")
+    parser.add_argument("--port", type=int, default=8098, help="Port to listen on")
+    parser.add_argument("--latency", type=float, default=0.005, help="Response latency in seconds")
+    parser.add_argument("--handshake-latency", type=float, default=0.05,
+                        help="Extra latency for each new connection in seconds")
+    args = parser.parse_args()
+
+    server, url = start_stub_server(args.latency, args.handshake_latency, port=args.port)
+    print(f"Stub PostgREST server listening on {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,425 @@
+"""
+Offline batch generation for StudyWise AI.
+This module writes every prompt for a set of documents to a JSONL job file
+in the OpenAI Batch API format, submits it, polls until it finishes and maps
+the results back to their documents and chunks. Job state is kept on disk,
+so a run that crashes can be resumed from the same job directory.
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from src.flashcard_generator import FlashcardGenerator
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    """Write a file so readers never see it half-written."""
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+class OpenAIBatchBackend:
+    """Runs job files through the OpenAI Batch API."""
+
+    def __init__(self, client: Any = None):
+        """
+        Initialize the backend.
+
+        Args:
+            client: OpenAI SDK client (defaults to one built from settings)
+        """
+        if client is None:
+            from openai import OpenAI
+            from src.config import settings
+
+            client = OpenAI(api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL)
+        self.client = client
+
+    def submit(self, requests_path: Path) -> str:
+        """
+        Upload a job file and start a batch.
+
+        Args:
+            requests_path: JSONL file of batch requests
+
+        Returns:
+            Batch ID
+        """
+        with open(requests_path, "rb") as f:
+            uploaded = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window="24h",
+        )
+        return batch.id
+
+    def status(self, job_id: str) -> str:
+        """
+        Return the status of a batch.
+
+        Args:
+            job_id: Batch ID
+
+        Returns:
+            Batch status, e.g. "in_progress" or "completed"
+        """
+        return self.client.batches.retrieve(job_id).status
+
+    def download(self, job_id: str, destination: Path) -> None:
+        """
+        Write a batch's output and error lines to a file.
+
+        Args:
+            job_id: Batch ID
+            destination: JSONL file to write
+        """
+        batch = self.client.batches.retrieve(job_id)
+        with open(destination, "wb") as f:
+            for file_id in (batch.output_file_id, batch.error_file_id):
+                if file_id:
+                    content = self.client.files.content(file_id).content
+                    f.write(content if content.endswith(b"\n") or not content else content + b"\n")
+
+
+def respond_with(backend: Any) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Adapt an LLM backend into a LocalBatchBackend respond function.
+
+    Args:
+        backend: OpenAIBackend, FakeLLMBackend or compatible object
+
+    Returns:
+        Function mapping a request body to a chat completion response body
+    """
+    def respond(body: Dict[str, Any]) -> Dict[str, Any]:
+        completion = backend.complete(**body)
+        response = {
+            "object": "chat.completion",
+            "model": body.get("model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": completion.content},
+                "finish_reason": "stop",
+            }],
+        }
+        if completion.usage is not None:
+            response["usage"] = {
+                "prompt_tokens": completion.usage.prompt_tokens,
+                "completion_tokens": completion.usage.completion_tokens,
+                "total_tokens": completion.usage.total_tokens,
+            }
+        return response
+    return respond
+
+
+class LocalBatchBackend:
+    """
+    Stand-in for the Batch API that answers requests locally.
+
+    Jobs are kept in a directory so they survive a restart. A job reports
+    "in_progress" for the given number of polls, then answers every request
+    with respond, which by default sends it to the chat completions
+    endpoint (for example the local stub server); respond_with(backend)
+    answers with any LLM backend instead.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        respond: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+        polls_until_complete: int = 1
+    ):
+        """
+        Initialize the local backend.
+
+        Args:
+            directory: Directory holding submitted jobs and their outputs
+            respond: Function mapping a request body to a chat completion response body
+            polls_until_complete: Number of status polls before a job completes
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.respond = respond
+        self.polls_until_complete = polls_until_complete
+
+    def _default_respond(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a request to the configured chat completions endpoint."""
+        if self.respond is None:
+            from src.llm_backends import OpenAIBackend
+
+            self.respond = respond_with(OpenAIBackend())
+        return self.respond(body)
+
+    def _state_path(self, job_id: str) -> Path:
+        return self.directory / f"{job_id}.json"
+
+    def submit(self, requests_path: Path) -> str:
+        """
+        Store a job file.
+
+        Args:
+            requests_path: JSONL file of batch requests
+
+        Returns:
+            Job ID
+        """
+        job_id = f"local-{uuid.uuid4().hex}"
+        shutil.copyfile(requests_path, self.directory / f"{job_id}.input.jsonl")
+        _write_atomic(self._state_path(job_id), json.dumps({"status": "in_progress", "polls": 0}))
+        return job_id
+
+    def status(self, job_id: str) -> str:
+        """
+        Return the status of a job, completing it once enough polls have passed.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            Job status
+        """
+        state = json.loads(self._state_path(job_id).read_text(encoding="utf-8"))
+        if state["status"] == "in_progress":
+            state["polls"] += 1
+            if state["polls"] >= self.polls_until_complete:
+                self._run(job_id)
+                state["status"] = "completed"
+            _write_atomic(self._state_path(job_id), json.dumps(state))
+        return state["status"]
+
+    def _run(self, job_id: str) -> None:
+        """Answer every request of a job and write the output file."""
+        lines = []
+        with open(self.directory / f"{job_id}.input.jsonl", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                result = {"id": f"batch_req_{uuid.uuid4().hex}", "custom_id": request["custom_id"]}
+                try:
+                    result["response"] = {"status_code": 200, "body": self._default_respond(request["body"])}
+                    result["error"] = None
+                except Exception as e:
+                    result["response"] = None
+                    result["error"] = {"code": type(e).__name__, "message": str(e)}
+                lines.append(json.dumps(result))
+        _write_atomic(self.directory / f"{job_id}.output.jsonl", "\n".join(lines) + "\n")
+
+    def download(self, job_id: str, destination: Path) -> None:
+        """
+        Copy a job's output to a file.
+
+        Args:
+            job_id: Job ID
+            destination: JSONL file to write
+        """
+        shutil.copyfile(self.directory / f"{job_id}.output.jsonl", destination)
+
+
+@dataclass
+class BatchResults:
+    """Cards and failures of a finished batch job, mapped back to their documents."""
+    status: str = ""
+    cards: Dict[str, List[dict]] = field(default_factory=dict)
+    chunks_covered: Dict[str, List[int]] = field(default_factory=dict)
+    failed: List[Tuple[str, List[int], str]] = field(default_factory=list)
+
+
+class BatchJob:
+    """
+    A resumable batch generation job stored in a directory.
+
+    The directory holds requests.jsonl (the job file), manifest.json
+    (which document and chunks each request covers), state.json (backend
+    job ID and last status) and, once finished, results.jsonl.
+    """
+
+    def __init__(
+        self,
+        generator: "FlashcardGenerator",
+        backend: Any,
+        job_dir: str,
+        poll_interval: float = 30.0,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Initialize the batch job.
+
+        Args:
+            generator: Generator whose packing, prompts and parsing the job uses
+            backend: OpenAIBatchBackend, LocalBatchBackend or compatible object
+            job_dir: Directory holding the job's files
+            poll_interval: Seconds between status polls
+            sleep: Sleep function, overridable for tests
+        """
+        self.generator = generator
+        self.backend = backend
+        self.job_dir = Path(job_dir)
+        self.job_dir.mkdir(parents=True, exist_ok=True)
+        self.poll_interval = poll_interval
+        self._sleep = sleep
+
+        self.requests_path = self.job_dir / "requests.jsonl"
+        self.manifest_path = self.job_dir / "manifest.json"
+        self.state_path = self.job_dir / "state.json"
+        self.results_path = self.job_dir / "results.jsonl"
+
+    @property
+    def state(self) -> Dict[str, Any]:
+        """The job's saved state, or an empty dict before prepare."""
+        if not self.state_path.exists():
+            return {}
+        return json.loads(self.state_path.read_text(encoding="utf-8"))
+
+    def _save_state(self, **changes: Any) -> None:
+        """Merge changes into the saved state."""
+        _write_atomic(self.state_path, json.dumps({**self.state, **changes}))
+
+    def _build(self, documents: Dict[str, List[str]]) -> Tuple[str, Dict[str, Any]]:
+        """Build the job file text and manifest for a set of documents."""
+        lines = []
+        manifest = {}
+        for document, chunks in documents.items():
+            for indices in self.generator.pack_chunks(chunks):
+                custom_id = f"request-{len(lines)}"
+                prompt = self.generator.build_prompt([chunks[i] for i in indices])
+                lines.append(json.dumps({
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": BATCH_ENDPOINT,
+                    "body": self.generator.openai.request_body(prompt),
+                }))
+                manifest[custom_id] = {"document": document, "chunks": indices}
+        return "\n".join(lines) + "\n", manifest
+
+    def prepare(self, documents: Dict[str, List[str]]) -> int:
+        """
+        Write the job file for a set of documents, or verify it matches a saved job.
+
+        Args:
+            documents: Chunks of each document, keyed by document name
+
+        Returns:
+            Number of requests in the job
+
+        Raises:
+            ValueError: If the directory already holds a job for different inputs
+        """
+        text, manifest = self._build(documents)
+        fingerprint = hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+        state = self.state
+        if state:
+            if state.get("fingerprint") != fingerprint:
+                raise ValueError(f"Job directory {self.job_dir} holds a job for different documents")
+            return len(manifest)
+
+        _write_atomic(self.requests_path, text)
+        _write_atomic(self.manifest_path, json.dumps(manifest))
+        self._save_state(status="prepared", fingerprint=fingerprint, job_id=None)
+        return len(manifest)
+
+    def submit(self) -> str:
+        """
+        Submit the job file unless it has already been submitted.
+
+        Returns:
+            Backend job ID
+        """
+        job_id = self.state.get("job_id")
+        if job_id is None:
+            job_id = self.backend.submit(self.requests_path)
+            self._save_state(status="submitted", job_id=job_id)
+        return job_id
+
+    def wait(self) -> str:
+        """
+        Poll the backend until the job reaches a terminal status.
+
+        Returns:
+            Final status
+        """
+        job_id = self.submit()
+        while True:
+            status = self.backend.status(job_id)
+            self._save_state(status=status)
+            if status in TERMINAL_STATUSES:
+                return status
+            self._sleep(self.poll_interval)
+
+    def collect(self) -> BatchResults:
+        """
+        Download the job's results if needed and map them back to documents.
+
+        Returns:
+            BatchResults with cards per document in chunk order
+        """
+        state = self.state
+        if not self.results_path.exists():
+            tmp_path = self.results_path.with_name(f"{self.results_path.name}.{os.getpid()}.tmp")
+            self.backend.download(state["job_id"], tmp_path)
+            os.replace(tmp_path, self.results_path)
+
+        manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        results = BatchResults(status=state.get("status", ""))
+        for entry in manifest.values():
+            results.cards.setdefault(entry["document"], [])
+            results.chunks_covered.setdefault(entry["document"], [])
+
+        outputs = {}
+        with open(self.results_path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    output = json.loads(line)
+                    outputs[output["custom_id"]] = output
+
+        # Manifest order is document order, then batch order within a document
+        for custom_id, entry in manifest.items():
+            document, chunks = entry["document"], entry["chunks"]
+            output = outputs.get(custom_id)
+            response = (output or {}).get("response") or {}
+            if output is None:
+                results.failed.append((document, chunks, "no result returned"))
+                continue
+            if response.get("status_code") != 200:
+                error = output.get("error") or response.get("body", {}).get("error") or "request failed"
+                results.failed.append((document, chunks, json.dumps(error)))
+                continue
+
+            content = response["body"]["choices"][0]["message"]["content"]
+            cards, ok = self.generator.parse_batch(int(custom_id.rsplit("-", 1)[1]), content,
+                                                   response["body"].get("model"))
+            if not ok:
+                results.failed.append((document, chunks, "response could not be parsed"))
+                continue
+            if self.generator.card_deduplicator is not None:
+                cards = self.generator.card_deduplicator.filter(cards)
+            results.cards[document].extend(cards)
+            results.chunks_covered[document].extend(chunks)
+        return results
+
+    def run(self, documents: Dict[str, List[str]]) -> BatchResults:
+        """
+        Prepare, submit, wait for and collect the job, resuming any saved progress.
+
+        Args:
+            documents: Chunks of each document, keyed by document name
+
+        Returns:
+            BatchResults of the finished job
+        """
+        self.prepare(documents)
+        self.wait()
+        return self.collect()
@@ -0,0 +1,131 @@
+"""
+Flashcard schema for StudyWise AI.
+This module defines the JSON schema requested from the model in
+structured-output mode and validates or repairs individual cards so a
+single malformed card does not discard the rest of its batch.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+# Fields stored in the flashcards table that the model may fill in
+CARD_FIELDS = ("question", "answer", "tags", "level")
+
+# Alternative field names models commonly use for question and answer
+_ALIASES = {
+    "question": ("question", "front", "q"),
+    "answer": ("answer", "back", "a"),
+}
+
+FLASHCARD_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "cards": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "question": {"type": "string"},
+                    "answer": {"type": "string"},
+                    "tags": {"type": "array", "items": {"type": "string"}},
+                },
+                "required": ["question", "answer", "tags"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["cards"],
+    "additionalProperties": False,
+}
+
+# response_format argument for chat completions in structured-output mode
+RESPONSE_FORMAT: Dict[str, Any] = {
+    "type": "json_schema",
+    "json_schema": {"name": "flashcards", "strict": True, "schema": FLASHCARD_SCHEMA},
+}
+
+
+def _text(value: Any) -> Optional[str]:
+    """Return a stripped string for scalar values, or None."""
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    return None
+
+
+def _tags(value: Any) -> Tuple[List[str], bool]:
+    """Normalize a tags value to a list of unique non-empty strings."""
+    if value is None:
+        return [], False
+    if isinstance(value, str):
+        items, repaired = value.split(","), True
+    elif isinstance(value, list):
+        items, repaired = value, False
+    else:
+        return [], True
+
+    tags = []
+    for item in items:
+        tag = _text(item)
+        if not tag or tag in tags:
+            repaired = True
+            continue
+        if tag != item:
+            repaired = True
+        tags.append(tag)
+    return tags, repaired
+
+
+def validate_card(card: Any) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """
+    Validate a card from the model, repairing what can be repaired.
+
+    Question and answer are taken from common aliases and stripped, tags
+    are coerced to a list of unique strings, and fields the flashcards
+    table does not have are dropped.
+
+    Args:
+        card: A decoded card object
+
+    Returns:
+        Tuple of (the valid card, or None if it must be rejected; whether it was repaired)
+    """
+    if not isinstance(card, dict):
+        return None, False
+
+    repaired = False
+    result: Dict[str, Any] = {}
+    for field, aliases in _ALIASES.items():
+        key = next((alias for alias in aliases if alias in card), None)
+        value = _text(card[key]) if key is not None else None
+        if not value:
+            return None, False
+        if key != field or value != card[key]:
+            repaired = True
+        result[field] = value
+
+    tags, tags_repaired = _tags(card.get("tags"))
+    result["tags"] = tags
+    repaired = repaired or tags_repaired
+
+    if isinstance(card.get("level"), str):
+        result["level"] = card["level"]
+
+    used = {key for aliases in _ALIASES.values() for key in aliases if key in card}
+    if set(card) - used - set(CARD_FIELDS):
+        repaired = True
+    return result, repaired
+
+
+def extract_cards(data: Any) -> Optional[List[Any]]:
+    """
+    Return the list of cards from a decoded response.
+
+    Args:
+        data: A bare JSON array or a structured-output object with a "cards" key
+
+    Returns:
+        The card list, or None if the response has no card list
+    """
+    if isinstance(data, dict):
+        data = data.get("cards")
+    return data if isinstance(data, list) else None
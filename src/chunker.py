@@ -0,0 +1,298 @@
+"""
+Offset-based recursive text chunker.
+
+Produces the same chunks as LangChain's RecursiveCharacterTextSplitter (with
+its default keep_separator and strip_whitespace behaviour) but represents them
+as (start, end) offsets into the source text. Chunk strings are only created
+when they are accessed.
+"""
+import re
+from array import array
+from collections import deque
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+DEFAULT_SEPARATORS = ["\n\n", "\n", " ", ""]
+
+
+class ChunkSpans(Sequence):
+    """
+    Array-backed sequence of chunk spans over a source text.
+
+    Indexing returns the chunk string, which is sliced from the source text
+    on demand.
+    """
+
+    def __init__(self, text: str, starts: array, ends: array):
+        """
+        Initialize the chunk spans.
+
+        Args:
+            text: The source text
+            starts: Start offset of each chunk
+            ends: End offset of each chunk
+        """
+        self.text = text
+        self.starts = starts
+        self.ends = ends
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(index, slice):
+            return [self.text[self.starts[i]:self.ends[i]] for i in range(*index.indices(len(self)))]
+        return self.text[self.starts[index]:self.ends[index]]
+
+    def __iter__(self) -> Iterator[str]:
+        text = self.text
+        for start, end in zip(self.starts, self.ends):
+            yield text[start:end]
+
+    def span(self, index: int) -> Tuple[int, int]:
+        """
+        Return the (start, end) offsets of a chunk.
+
+        Args:
+            index: Index of the chunk
+
+        Returns:
+            Half-open offsets of the chunk in the source text
+        """
+        return self.starts[index], self.ends[index]
+
+    def spans(self) -> Iterator[Tuple[int, int]]:
+        """Iterate over the (start, end) offsets of every chunk."""
+        return zip(self.starts, self.ends)
+
+
+class OffsetChunker:
+    """Recursive character chunker that works on offsets instead of substrings."""
+
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        overlap: int = 200,
+        separators: Optional[List[str]] = None
+    ):
+        """
+        Initialize the chunker.
+
+        Args:
+            chunk_size: Maximum size of each chunk
+            overlap: Overlap between consecutive chunks
+            separators: Separators to split on, from coarsest to finest
+
+        Raises:
+            ValueError: If overlap is larger than chunk_size
+        """
+        if overlap > chunk_size:
+            raise ValueError(f"Overlap ({overlap}) must not be larger than chunk size ({chunk_size})")
+
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.separators = list(separators) if separators is not None else list(DEFAULT_SEPARATORS)
+        self._patterns = [re.compile(re.escape(sep)) if sep else None for sep in self.separators]
+
+    def split(self, text: str) -> ChunkSpans:
+        """
+        Split text into overlapping chunks.
+
+        Args:
+            text: The text to split
+
+        Returns:
+            ChunkSpans over the text
+        """
+        starts = array('q')
+        ends = array('q')
+        if text:
+            self._split_span(text, 0, len(text), 0, starts, ends)
+        return ChunkSpans(text, starts, ends)
+
+    def split_stream(self, fragments: Iterable[str]) -> Iterator[str]:
+        """
+        Split a stream of text fragments into the same chunks split gives for their concatenation.
+
+        Text is cut only where the coarsest separator occurs, exactly where
+        split would cut it, and the merge of small pieces carries over from
+        one cut to the next. Only the current top-level piece and the chunk
+        being merged are held in memory.
+
+        Args:
+            fragments: Text fragments in document order
+
+        Yields:
+            Chunk strings in document order
+        """
+        pattern = self._patterns[0]
+        if pattern is None or len(self.separators) < 2:
+            yield from self.split("".join(fragments))
+            return
+
+        chunk_size = self.chunk_size
+        overlap = self.overlap
+        current: deque = deque()
+        total = 0
+
+        def flush() -> Iterator[str]:
+            nonlocal total
+            if current:
+                chunk = "".join(current).strip()
+                if chunk:
+                    yield chunk
+            current.clear()
+            total = 0
+
+        def piece(text: str) -> Iterator[str]:
+            # Mirrors _split_span's top level: small pieces are merged, large ones split further
+            nonlocal total
+            length = len(text)
+            if length >= chunk_size:
+                yield from flush()
+                starts, ends = array('q'), array('q')
+                self._split_span(text, 0, length, 1, starts, ends)
+                yield from ChunkSpans(text, starts, ends)
+                return
+
+            # Mirrors _merge one piece at a time
+            if total + length > chunk_size and current:
+                chunk = "".join(current).strip()
+                if chunk:
+                    yield chunk
+                while total > overlap or (total + length > chunk_size and total > 0):
+                    total -= len(current.popleft())
+            current.append(text)
+            total += length
+
+        # tail starts at the last cut; separators are searched from search_from on
+        separator_length = len(self.separators[0])
+        tail = ""
+        search_from = 0
+        for fragment in fragments:
+            if not fragment:
+                continue
+            tail += fragment
+            piece_start = 0
+            for match in pattern.finditer(tail, search_from):
+                if match.start() > piece_start:
+                    yield from piece(tail[piece_start:match.start()])
+                piece_start = match.start()
+                search_from = match.end()
+            tail = tail[piece_start:]
+            search_from = max(search_from - piece_start, len(tail) - separator_length + 1, 0)
+
+        if tail:
+            yield from piece(tail)
+        yield from flush()
+
+    def _split_span(self, text: str, start: int, end: int, level: int, starts: array, ends: array) -> None:
+        """
+        Recursively split text[start:end] using the separators from level on.
+
+        Args:
+            text: The source text
+            start: Start offset of the span
+            end: End offset of the span
+            level: Index of the first separator to consider
+            starts: Output array of chunk start offsets
+            ends: Output array of chunk end offsets
+        """
+        # Pick the first separator that occurs in the span
+        sep_index = len(self.separators) - 1
+        for i in range(level, len(self.separators)):
+            pattern = self._patterns[i]
+            if pattern is None or pattern.search(text, start, end):
+                sep_index = i
+                break
+
+        has_finer = self._patterns[sep_index] is not None and sep_index + 1 < len(self.separators)
+        chunk_size = self.chunk_size
+        good: List[Tuple[int, int]] = []
+
+        for piece_start, piece_end in self._split_points(text, start, end, sep_index):
+            if piece_end - piece_start < chunk_size:
+                good.append((piece_start, piece_end))
+                continue
+
+            if good:
+                self._merge(text, good, starts, ends)
+                good = []
+
+            if has_finer:
+                self._split_span(text, piece_start, piece_end, sep_index + 1, starts, ends)
+            else:
+                # Oversized pieces that cannot be split further are kept verbatim
+                starts.append(piece_start)
+                ends.append(piece_end)
+
+        if good:
+            self._merge(text, good, starts, ends)
+
+    def _split_points(self, text: str, start: int, end: int, sep_index: int) -> Iterator[Tuple[int, int]]:
+        """
+        Yield the non-empty pieces of a span, keeping each separator at the
+        start of the piece that follows it.
+
+        Args:
+            text: The source text
+            start: Start offset of the span
+            end: End offset of the span
+            sep_index: Index of the separator to split on
+
+        Yields:
+            (start, end) offsets of each piece
+        """
+        pattern = self._patterns[sep_index]
+        if pattern is None:
+            for i in range(start, end):
+                yield i, i + 1
+            return
+
+        piece_start = start
+        for match in pattern.finditer(text, start, end):
+            boundary = match.start()
+            if boundary > piece_start:
+                yield piece_start, boundary
+            piece_start = boundary
+        if end > piece_start:
+            yield piece_start, end
+
+    def _merge(self, text: str, pieces: List[Tuple[int, int]], starts: array, ends: array) -> None:
+        """
+        Greedily merge adjacent pieces into chunks with overlap.
+
+        Args:
+            text: The source text
+            pieces: Contiguous (start, end) pieces, each shorter than chunk_size
+            starts: Output array of chunk start offsets
+            ends: Output array of chunk end offsets
+        """
+        chunk_size = self.chunk_size
+        overlap = self.overlap
+        current: deque = deque()
+        total = 0
+
+        for piece_start, piece_end in pieces:
+            length = piece_end - piece_start
+            if total + length > chunk_size and current:
+                self._append(text, current[0][0], current[-1][1], starts, ends)
+                # Drop pieces from the front until only the overlap remains
+                while total > overlap or (total + length > chunk_size and total > 0):
+                    first_start, first_end = current.popleft()
+                    total -= first_end - first_start
+            current.append((piece_start, piece_end))
+            total += length
+
+        if current:
+            self._append(text, current[0][0], current[-1][1], starts, ends)
+
+    @staticmethod
+    def _append(text: str, start: int, end: int, starts: array, ends: array) -> None:
+        """Record a chunk with surrounding whitespace trimmed, skipping blank chunks."""
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if start < end:
+            starts.append(start)
+            ends.append(end)
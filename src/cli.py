@@ -7,7 +7,7 @@ import os
 import sys
 from typing import List, Optional
 
-from src.flashcards_db import upsert_flashcards_from_json, get_flashcards
+from src.flashcards_db import bulk_upsert_flashcards, upsert_flashcards_from_json, get_flashcards
 from src.init_supabase import initialize_tables
 
 
@@ -26,6 +26,31 @@ def upload_flashcards(filepath: str) -> None:
         sys.exit(1)
 
 
+def bulk_upload_flashcards(filepath: str, page_size: int = 500, workers: int = 4, max_retries: int = 3) -> None:
+    """
+    Upload flashcards from a JSON or JSONL file to Supabase in pages.
+
+    Args:
+        filepath: Path to the JSON or JSONL file containing flashcards
+        page_size: Rows per upsert request
+        workers: Concurrent upsert requests
+        max_retries: Retries per failed page
+    """
+    try:
+        stats = bulk_upsert_flashcards(filepath, page_size=page_size, max_workers=workers, max_retries=max_retries)
+    except Exception as e:
+        print(f"Error uploading flashcards: {str(e)}")
+        sys.exit(1)
+
+    print(f"Uploaded {stats.rows} flashcards in {stats.pages} pages "
+          f"({stats.seconds:.1f}s, {stats.rows_per_second:.0f} rows/s, {stats.retries} retries)")
+    if stats.invalid:
+        print(f"Skipped {stats.invalid} malformed entries")
+    if stats.failed_pages:
+        print(f"Failed to upload {stats.failed_rows} flashcards in {stats.failed_pages} pages: {stats.errors[0]}")
+        sys.exit(1)
+
+
 def list_flashcards(limit: int, offset: int, level: Optional[str], tags: Optional[List[str]]) -> None:
     """
     List flashcards from Supabase with optional filtering.
@@ -72,6 +97,13 @@ def main() -> None:
     upload_parser = subparsers.add_parser("upload", help="Upload flashcards from JSON")
     upload_parser.add_argument("filepath", help="Path to the JSON file containing flashcards")
 
+    # Bulk upload command
+    bulk_parser = subparsers.add_parser("bulk-upload", help="Stream a large JSON or JSONL file to Supabase in pages")
+    bulk_parser.add_argument("filepath", help="Path to the JSON or JSONL file containing flashcards")
+    bulk_parser.add_argument("--page-size", type=int, default=500, help="Rows per upsert request")
+    bulk_parser.add_argument("--workers", type=int, default=4, help="Concurrent upsert requests")
+    bulk_parser.add_argument("--max-retries", type=int, default=3, help="Retries per failed page")
+
     # List command
     list_parser = subparsers.add_parser("list", help="List flashcards")
     list_parser.add_argument("--limit", type=int, default=10, help="Maximum number of flashcards to retrieve")
@@ -85,6 +117,8 @@ def main() -> None:
         setup_db()
     elif args.command == "upload":
         upload_flashcards(args.filepath)
+    elif args.command == "bulk-upload":
+        bulk_upload_flashcards(args.filepath, args.page_size, args.workers, args.max_retries)
     elif args.command == "list":
         list_flashcards(args.limit, args.offset, args.level, args.tags)
     else:
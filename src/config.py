@@ -11,5 +11,6 @@ class Settings:
     SUPABASE_KEY: str = os.getenv("SUPABASE_SERVICE_ROLE_KEY")  # or ANON_KEY
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY")
     OPENAI_MODEL: str = os.getenv("OPENAI_MODEL")
+    OPENAI_BASE_URL: str = os.getenv("OPENAI_BASE_URL")  # e.g. a local stub server
 
 settings = Settings()
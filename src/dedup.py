@@ -0,0 +1,426 @@
+"""
+Near-duplicate detection for StudyWise AI.
+This module provides MinHash signatures over word shingles and an LSH index
+used to drop near-identical chunks before they are sent to the LLM, and
+near-identical generated cards before they are saved.
+"""
+import operator
+import random
+import re
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from src.tokens import count_tokens
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_WORD_RE = re.compile(r"\w+")
+
+# Words that carry no topic in a flashcard question
+_QUESTION_STOPWORDS = frozenset("""
+    a an and are as at be by can define describe do does explain for how in is it its mean meant
+    of on or play s the this that these those to was were what when where which who why with
+""".split())
+
+
+def shingle(text: str, size: int = 5) -> Set[int]:
+    """
+    Hash the overlapping word n-grams of a normalized text.
+
+    Args:
+        text: The text to shingle
+        size: Number of words per shingle
+
+    Returns:
+        Set of 32-bit shingle hashes
+    """
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < size:
+        return {zlib.crc32(" ".join(words).encode("utf-8"))} if words else set()
+
+    return {
+        zlib.crc32(" ".join(words[i:i + size]).encode("utf-8"))
+        for i in range(len(words) - size + 1)
+    }
+
+
+def _topic_words(text: str) -> List[str]:
+    """Lowercase words of a text without question stopwords, with a plural "s" stripped."""
+    words = _WORD_RE.findall(text.lower())
+    topic = [w for w in words if w not in _QUESTION_STOPWORDS] or words
+    return [w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w for w in topic]
+
+
+def normalize_question(text: str) -> str:
+    """
+    Reduce a question to its topic words, in order.
+
+    Lowercases, drops punctuation and question stopwords and strips a plural
+    "s", so rephrasings such as "What is YOLO?" and "Define YOLO." normalize
+    to the same text. Word order is kept: "Why is ReLU preferred over
+    sigmoid?" and "Why is sigmoid preferred over ReLU?" ask different things.
+
+    Args:
+        text: Question text
+
+    Returns:
+        Normalized question
+    """
+    return " ".join(_topic_words(text))
+
+
+def question_shingles(normalized: str, max_size: int = 3) -> Set[int]:
+    """
+    Hash every word n-gram of up to max_size words of a normalized question.
+
+    Single words let rephrasings match; the longer n-grams keep swapped
+    or substituted words (encoder/decoder) from matching.
+
+    Args:
+        normalized: Question from normalize_question
+        max_size: Longest n-gram in words
+
+    Returns:
+        Set of 32-bit shingle hashes
+    """
+    words = normalized.split()
+    return {
+        zlib.crc32(" ".join(words[i:i + size]).encode("utf-8"))
+        for size in range(1, max_size + 1)
+        for i in range(len(words) - size + 1)
+    }
+
+
+def jaccard(first: Set[int], second: Set[int]) -> float:
+    """
+    Compute the exact Jaccard similarity of two sets.
+
+    Args:
+        first: A set
+        second: A set
+
+    Returns:
+        Size of the intersection over size of the union (0 if both are empty)
+    """
+    union = len(first | second)
+    return len(first & second) / union if union else 0.0
+
+
+def optimal_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    Choose an LSH (bands, rows) split whose collision threshold is closest to a target.
+
+    Args:
+        num_perm: Number of MinHash permutations
+        threshold: Target Jaccard similarity
+
+    Returns:
+        Tuple of (bands, rows per band)
+    """
+    best = (num_perm, 1)
+    best_error = float("inf")
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        error = abs((1 / bands) ** (1 / rows) - threshold)
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class MinHashLSH:
+    """MinHash signatures with a banded locality-sensitive hashing index."""
+
+    def __init__(self, threshold: float = 0.85, num_perm: int = 128, seed: int = 1, one_permutation: bool = False):
+        """
+        Initialize the LSH index.
+
+        Args:
+            threshold: Estimated Jaccard similarity at which items count as duplicates
+            num_perm: Number of MinHash permutations
+            seed: Seed for the permutation coefficients
+            one_permutation: Use one-permutation hashing, which hashes each
+                shingle once instead of num_perm times
+        """
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.one_permutation = one_permutation
+        self.bands, self.rows = optimal_bands(num_perm, threshold)
+
+        rng = random.Random(seed)
+        self._coefficients = [
+            (rng.randint(1, _MERSENNE_PRIME - 1), rng.randint(0, _MERSENNE_PRIME - 1))
+            for _ in range(num_perm)
+        ]
+        self._buckets: List[Dict[Tuple[int, ...], List[Hashable]]] = [{} for _ in range(self.bands)]
+        self._signatures: Dict[Hashable, Tuple[int, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def signature(self, shingles: Iterable[int]) -> Tuple[int, ...]:
+        """
+        Compute the MinHash signature of a shingle set.
+
+        Args:
+            shingles: Shingle hashes
+
+        Returns:
+            Tuple of num_perm minimum hash values
+        """
+        shingles = list(shingles)
+        if not shingles:
+            return (_MAX_HASH,) * self.num_perm
+        if self.one_permutation:
+            return self._one_permutation_signature(shingles)
+
+        return tuple(
+            min(((a * x + b) % _MERSENNE_PRIME) & _MAX_HASH for x in shingles)
+            for a, b in self._coefficients
+        )
+
+    def _one_permutation_signature(self, shingles: List[int]) -> Tuple[int, ...]:
+        """
+        Compute a densified one-permutation MinHash signature.
+
+        Each shingle is hashed once and assigned to one of num_perm bins,
+        keeping the minimum per bin. Empty bins borrow the value of the next
+        non-empty bin, offset by the distance, so similar sets still agree.
+        """
+        a, b = self._coefficients[0]
+        bins: List[Optional[int]] = [None] * self.num_perm
+        for x in shingles:
+            value, index = divmod((a * x + b) % _MERSENNE_PRIME, self.num_perm)
+            if bins[index] is None or value < bins[index]:
+                bins[index] = value
+
+        signature = list(bins)
+        for i, value in enumerate(bins):
+            if value is None:
+                distance = 1
+                while bins[(i + distance) % self.num_perm] is None:
+                    distance += 1
+                signature[i] = bins[(i + distance) % self.num_perm] + distance * _MERSENNE_PRIME
+        return tuple(signature)
+
+    def similarity(self, first: Tuple[int, ...], second: Tuple[int, ...]) -> float:
+        """
+        Estimate the Jaccard similarity of two signatures.
+
+        Args:
+            first: MinHash signature
+            second: MinHash signature
+
+        Returns:
+            Fraction of matching signature positions
+        """
+        return sum(map(operator.eq, first, second)) / self.num_perm
+
+    def candidates(self, signature: Tuple[int, ...]) -> Set[Hashable]:
+        """
+        Find the indexed items sharing at least one LSH band with a signature.
+
+        Args:
+            signature: MinHash signature to look up
+
+        Returns:
+            Keys of the candidate items
+        """
+        candidates = set()
+        for band, buckets in enumerate(self._buckets):
+            start = band * self.rows
+            candidates.update(buckets.get(signature[start:start + self.rows], ()))
+        return candidates
+
+    def query(self, signature: Tuple[int, ...]) -> Optional[Hashable]:
+        """
+        Find an indexed item whose estimated similarity meets the threshold.
+
+        Args:
+            signature: MinHash signature to look up
+
+        Returns:
+            Key of the most similar matching item, or None
+        """
+        best_key, best_similarity = None, self.threshold
+        for key in self.candidates(signature):
+            similarity = self.similarity(signature, self._signatures[key])
+            if similarity >= best_similarity:
+                best_key, best_similarity = key, similarity
+        return best_key
+
+    def insert(self, key: Hashable, signature: Tuple[int, ...]) -> None:
+        """
+        Add an item to the index.
+
+        Args:
+            key: Identifier of the item
+            signature: MinHash signature of the item
+        """
+        self._signatures[key] = signature
+        for band, buckets in enumerate(self._buckets):
+            start = band * self.rows
+            buckets.setdefault(signature[start:start + self.rows], []).append(key)
+
+
+@dataclass
+class DedupStats:
+    """Counters for a deduplication run."""
+    chunks_seen: int = 0
+    chunks_dropped: int = 0
+    tokens_seen: int = 0
+    tokens_saved: int = 0
+
+
+class ChunkDeduplicator:
+    """
+    Drops chunks that are near-duplicates of chunks already seen.
+
+    The index persists across calls to filter, so a single instance
+    deduplicates across every document in a batch run.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        num_perm: int = 128,
+        shingle_size: int = 5,
+        model: Optional[str] = None
+    ):
+        """
+        Initialize the chunk deduplicator.
+
+        Args:
+            threshold: Estimated Jaccard similarity above which a chunk is dropped
+            num_perm: Number of MinHash permutations
+            shingle_size: Number of words per shingle
+            model: OpenAI model name used to count saved tokens
+        """
+        self.shingle_size = shingle_size
+        self.model = model
+        self.index = MinHashLSH(threshold=threshold, num_perm=num_perm)
+        self.stats = DedupStats()
+
+    def filter(self, chunks: Iterable[str]) -> List[str]:
+        """
+        Return the chunks that are not near-duplicates of earlier chunks.
+
+        Args:
+            chunks: Chunks in document order
+
+        Returns:
+            Chunks to keep, in their original order
+        """
+        kept = []
+        for chunk in chunks:
+            tokens = count_tokens(chunk, self.model)
+            self.stats.chunks_seen += 1
+            self.stats.tokens_seen += tokens
+
+            signature = self.index.signature(shingle(chunk, self.shingle_size))
+            if self.index.query(signature) is not None:
+                self.stats.chunks_dropped += 1
+                self.stats.tokens_saved += tokens
+                continue
+
+            self.index.insert(len(self.index), signature)
+            kept.append(chunk)
+        return kept
+
+
+@dataclass
+class CardDedupStats:
+    """Counters for card deduplication."""
+    cards_seen: int = 0
+    cards_dropped: int = 0
+    cards_seeded: int = 0
+
+
+class CardDeduplicator:
+    """
+    Drops generated cards that nearly repeat an earlier card.
+
+    Questions are normalized with normalize_question and compared as sets
+    of word n-grams, so rephrasings match while swapped or substituted
+    words do not. One-permutation MinHash LSH finds candidate questions,
+    so each check costs about the same however many cards are indexed, and
+    every candidate is confirmed with the exact Jaccard similarity. When
+    both cards have answers, their answer words must overlap too, so two
+    cards asking the same question about different facts are both kept.
+    Cards already stored can be added with seed before generation starts.
+    """
+
+    def __init__(self, threshold: float = 0.75, answer_threshold: float = 0.4, num_perm: int = 32):
+        """
+        Initialize the card deduplicator.
+
+        Args:
+            threshold: Jaccard similarity of question n-grams at or above which cards may be duplicates
+            answer_threshold: Jaccard similarity of answer words a duplicate must also reach
+            num_perm: Number of MinHash permutations
+        """
+        self.threshold = threshold
+        self.answer_threshold = answer_threshold
+        # A lower LSH threshold trades extra candidates for recall; the exact check decides
+        self.index = MinHashLSH(threshold=threshold * 0.8, num_perm=num_perm, one_permutation=True)
+        self.stats = CardDedupStats()
+        self._cards: List[Tuple[Set[int], Set[int]]] = []
+
+    def _add(self, card: Dict) -> bool:
+        """Index a card, returning False if it is a near-duplicate."""
+        shingles = question_shingles(normalize_question(card.get("question") or ""))
+        answer = {zlib.crc32(w.encode("utf-8")) for w in _topic_words(card.get("answer") or "")}
+
+        signature = self.index.signature(shingles)
+        for key in self.index.candidates(signature):
+            other_shingles, other_answer = self._cards[key]
+            if jaccard(shingles, other_shingles) < self.threshold:
+                continue
+            if answer and other_answer and jaccard(answer, other_answer) < self.answer_threshold:
+                continue
+            return False
+
+        self.index.insert(len(self._cards), signature)
+        self._cards.append((shingles, answer))
+        return True
+
+    def seed(self, cards: Iterable[Dict]) -> None:
+        """
+        Index existing cards so new cards repeating them are dropped.
+
+        Args:
+            cards: Stored cards, or any dicts with a "question" and optional "answer" field
+        """
+        for card in cards:
+            if card.get("question") and self._add(card):
+                self.stats.cards_seeded += 1
+
+    def is_duplicate(self, card: Dict) -> bool:
+        """
+        Check a card against the index, indexing it if it is new.
+
+        Args:
+            card: Card with a "question" and optional "answer" field
+
+        Returns:
+            True if the card repeats an indexed card
+        """
+        self.stats.cards_seen += 1
+        if self._add(card):
+            return False
+        self.stats.cards_dropped += 1
+        return True
+
+    def filter(self, cards: Iterable[Dict]) -> List[Dict]:
+        """
+        Return the cards that are not near-duplicates of earlier ones.
+
+        Args:
+            cards: Cards in generation order
+
+        Returns:
+            Cards to keep, in their original order
+        """
+        return [card for card in cards if not self.is_duplicate(card)]
@@ -1,16 +1,27 @@
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Callable, Iterable, Iterator, Tuple, Union, TYPE_CHECKING
 import os
+import hashlib
 import mimetypes
 from pathlib import Path
-import requests
 from dataclasses import dataclass
-import fitz  # PyMuPDF
-import docx
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 import urllib.parse
-import tempfile
-import shutil
+import io
+import time
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import codecs
+
+from src.chunker import ChunkSpans, OffsetChunker
+from src.extraction_cache import ExtractionCache
+
+if TYPE_CHECKING:
+    import requests
+    from src.url_fetcher import ConditionalCache, FetchResult
+
+
+# Bump whenever extractor or chunker output changes so cached results are invalidated
+EXTRACTOR_VERSION = "2"
 
 
 @dataclass
@@ -23,17 +34,74 @@ class UploadedDocument:
     chunks: List[str] = None
 
 
+@dataclass
+class IngestResult:
+    """Outcome of ingesting a single file as part of a batch."""
+    file_path: str
+    size_bytes: int = 0
+    document: Optional[UploadedDocument] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the file was ingested successfully."""
+        return self.error is None
+
+
+@dataclass
+class IngestStats:
+    """Throughput counters for a batch ingestion run."""
+    files: int = 0
+    failed: int = 0
+    size_bytes: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def files_per_second(self) -> float:
+        """Files processed per second."""
+        return self.files / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        """Megabytes processed per second."""
+        if not self.elapsed_seconds:
+            return 0.0
+        return self.size_bytes / (1024 * 1024) / self.elapsed_seconds
+
+
 class DocumentUploader:
     """Handles document uploads from various sources and formats."""
 
-    def __init__(self, max_file_size_mb: int = 10):
+    def __init__(
+        self,
+        max_file_size_mb: int = 10,
+        pdf_workers: Optional[int] = 1,
+        cache: Optional[ExtractionCache] = None,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        session: Optional["requests.Session"] = None,
+        download_timeout: Optional[tuple] = (10, 60)
+    ):
         """
         Initialize the document uploader.
 
         Args:
             max_file_size_mb: Maximum allowed file size in megabytes
+            pdf_workers: Number of worker processes used to extract PDF pages
+                (None uses all available CPUs)
+            cache: Optional cache of extracted text and chunks keyed by file contents
+            chunk_size: Maximum size of each chunk
+            chunk_overlap: Overlap between consecutive chunks
+            session: HTTP session used for URL downloads (defaults to plain requests)
+            download_timeout: (connect, read) timeout in seconds for URL downloads
         """
         self.max_file_size_mb = max_file_size_mb
+        self.session = session
+        self.download_timeout = download_timeout
+        self.cache = cache
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.last_batch_stats = IngestStats()
         self._supported_formats = {
             "pdf": "application/pdf",
             "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
@@ -43,7 +111,7 @@ class DocumentUploader:
             "pptx": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
             "ppt": "application/vnd.ms-powerpoint"
         }
-        self.processor = DocumentProcessor()
+        self.processor = DocumentProcessor(pdf_workers=pdf_workers)
 
     def upload_from_file(self, file_path: str) -> UploadedDocument:
         """
@@ -75,8 +143,27 @@ class DocumentUploader:
         if file_extension not in self._supported_formats:
             raise ValueError(f"Unsupported file format: {file_extension}. Supported formats: {', '.join(self._supported_formats.keys())}")
 
+        # Serve previously extracted content without opening the document
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.key_for_file(str(file_path), **self._cache_params(file_extension))
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                content, chunks = cached
+                return UploadedDocument(
+                    file_name=file_path.name,
+                    file_type=file_extension,
+                    upload_date=datetime.now(),
+                    content=content,
+                    chunks=chunks
+                )
+
         # Process the document to extract text content
         content = self.processor.process_document(str(file_path))
+        chunks = self.processor.chunk_text(content, chunk_size=self.chunk_size, overlap=self.chunk_overlap)
+
+        if cache_key is not None:
+            self.cache.put(cache_key, content, chunks)
 
         # Create and return the uploaded document
         return UploadedDocument(
@@ -84,16 +171,51 @@ class DocumentUploader:
             file_type=file_extension,
             upload_date=datetime.now(),
             content=content,
-            chunks=self.processor.chunk_text(content)
+            chunks=chunks
         )
 
+    def iter_chunks(self, file_path: str, chunk_size: int = 1000, overlap: int = 200) -> Iterator[str]:
+        """
+        Stream overlapping text chunks from a local file.
+
+        Unlike upload_from_file, the document is never held in memory as a
+        whole, so the max_file_size_mb limit does not apply.
+
+        Args:
+            file_path: Path to the local file
+            chunk_size: Maximum size of each chunk
+            overlap: Overlap between consecutive chunks
+
+        Returns:
+            Iterator over text chunks in document order
+
+        Raises:
+            ValueError: If file format is not supported
+            FileNotFoundError: If file does not exist
+        """
+        file_path = Path(file_path)
+
+        # Check if file exists
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        # Check file format
+        file_extension = file_path.suffix.lower().lstrip('.')
+        if file_extension not in self._supported_formats:
+            raise ValueError(f"Unsupported file format: {file_extension}. Supported formats: {', '.join(self._supported_formats.keys())}")
+
+        return self.processor.iter_chunks(str(file_path), chunk_size=chunk_size, overlap=overlap)
+
     def upload_from_url(self, url: str, download_dir: Optional[str] = None) -> UploadedDocument:
         """
         Download, upload and extract text from a document URL.
 
+        The response body is buffered in memory and handed straight to the
+        extractors; nothing is written to disk unless download_dir is given.
+
         Args:
             url: URL to the document
-            download_dir: Directory to save the downloaded file (optional)
+            download_dir: Directory to also save the downloaded file to (optional)
 
         Returns:
             UploadedDocument with extracted content
@@ -116,61 +238,255 @@ class DocumentUploader:
         if not file_name:
             file_name = "downloaded_document"
 
-        # Create a temporary directory if download_dir is not provided
-        temp_dir = None
-        if not download_dir:
-            temp_dir = tempfile.mkdtemp()
-            download_dir = temp_dir
+        # Download the file with a streaming request to check size during download
+        if self.session is not None:
+            http = self.session
         else:
+            import requests as http
+        response = http.get(url, stream=True, timeout=self.download_timeout)
+        try:
+            if response.status_code != 200:
+                raise ConnectionError(f"Failed to download file from {url}. Status code: {response.status_code}")
+
+            data, file_extension = self.read_response(response, file_name)
+        finally:
+            response.close()
+
+        if download_dir:
             os.makedirs(download_dir, exist_ok=True)
+            with open(os.path.join(download_dir, file_name), 'wb') as f:
+                f.write(data)
+
+        return self.upload_from_bytes(data, file_name, file_extension)
+
+    def upload_from_urls(
+        self,
+        urls: Iterable[str],
+        max_workers: int = 8,
+        per_host_limit: int = 4,
+        conditional_cache_path: Optional[str] = None
+    ) -> Iterator["FetchResult"]:
+        """
+        Download and extract many document URLs concurrently.
+
+        Args:
+            urls: URLs to the documents
+            max_workers: Maximum number of URLs fetched at once
+            per_host_limit: Maximum number of concurrent requests to one host
+            conditional_cache_path: Optional SQLite file holding ETag/Last-Modified
+                validators so unchanged documents are not downloaded again; the
+                documents themselves are served from this uploader's extraction cache
+
+        Returns:
+            Iterator over a FetchResult for each URL, in completion order
+
+        Raises:
+            ValueError: If conditional_cache_path is given but this uploader has
+                no extraction cache to serve unchanged documents from
+        """
+        from src.url_fetcher import ConditionalCache
+
+        if conditional_cache_path is not None and self.cache is None:
+            raise ValueError("conditional_cache_path requires an uploader with an extraction cache")
+
+        cache = ConditionalCache(conditional_cache_path) if conditional_cache_path is not None else None
+        return self._fetch_urls(urls, max_workers, per_host_limit, cache)
 
-        download_path = os.path.join(download_dir, file_name)
+    def _fetch_urls(
+        self,
+        urls: Iterable[str],
+        max_workers: int,
+        per_host_limit: int,
+        cache: Optional["ConditionalCache"]
+    ) -> Iterator["FetchResult"]:
+        """Fetch URLs for upload_from_urls, closing the conditional cache when done."""
+        from src.url_fetcher import URLFetcher
 
         try:
-            # Download the file with a streaming request to check size during download
-            response = requests.get(url, stream=True)
-            if response.status_code != 200:
-                raise ConnectionError(f"Failed to download file from {url}. Status code: {response.status_code}")
+            with URLFetcher(
+                self,
+                max_workers=max_workers,
+                per_host_limit=per_host_limit,
+                timeout=self.download_timeout,
+                cache=cache
+            ) as fetcher:
+                yield from fetcher.fetch_many(urls)
+        finally:
+            if cache is not None:
+                cache.close()
+
+    def upload_from_bytes(
+        self,
+        data: Union[bytes, memoryview],
+        file_name: str,
+        file_type: Optional[str] = None
+    ) -> UploadedDocument:
+        """
+        Extract text from a document held in memory.
 
-            # Check content type
-            content_type = response.headers.get('content-type', '').lower()
-            file_extension = mimetypes.guess_extension(content_type)
+        Args:
+            data: Raw file contents
+            file_name: Name to assign to the document
+            file_type: File extension of the document (defaults to file_name's extension)
 
-            if not file_extension:
-                # Try to get extension from URL if content-type doesn't help
-                file_extension = os.path.splitext(file_name)[1].lower()
+        Returns:
+            UploadedDocument with extracted content
 
-            if file_extension.startswith('.'):
-                file_extension = file_extension[1:]
+        Raises:
+            ValueError: If file format is not supported or file size exceeds limit
+        """
+        return self.upload_from_bytes_with_hash(data, file_name, file_type)[0]
+
+    def upload_from_bytes_with_hash(
+        self,
+        data: Union[bytes, memoryview],
+        file_name: str,
+        file_type: Optional[str] = None
+    ) -> Tuple[UploadedDocument, Optional[str]]:
+        """
+        Extract text from a document held in memory and report the hash it was cached under.
 
-            if file_extension not in self._supported_formats:
-                raise ValueError(f"Unsupported file format: {file_extension or 'unknown'}. Supported formats: {', '.join(self._supported_formats.keys())}")
+        Args:
+            data: Raw file contents
+            file_name: Name to assign to the document
+            file_type: File extension of the document (defaults to file_name's extension)
 
-            # Check file size from headers
-            content_length = response.headers.get('content-length')
-            if content_length and int(content_length) / (1024 * 1024) > self.max_file_size_mb:
+        Returns:
+            Tuple of the UploadedDocument and the SHA-256 hex digest of data, or
+            None for the digest when there is no extraction cache
+
+        Raises:
+            ValueError: If file format is not supported or file size exceeds limit
+        """
+        file_extension = (file_type or Path(file_name).suffix).lower().lstrip('.')
+        if file_extension not in self._supported_formats:
+            raise ValueError(f"Unsupported file format: {file_extension or 'unknown'}. Supported formats: {', '.join(self._supported_formats.keys())}")
+
+        file_size_mb = len(data) / (1024 * 1024)
+        if file_size_mb > self.max_file_size_mb:
+            raise ValueError(f"File size ({file_size_mb:.2f} MB) exceeds the maximum allowed size ({self.max_file_size_mb} MB)")
+
+        # Serve previously extracted content without opening the document
+        cache_key = None
+        content_hash = None
+        if self.cache is not None:
+            content_hash = hashlib.sha256(data).hexdigest()
+            cache_key = self.cache.key_for_hash(content_hash, **self._cache_params(file_extension))
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                content, chunks = cached
+                return UploadedDocument(
+                    file_name=file_name,
+                    file_type=file_extension,
+                    upload_date=datetime.now(),
+                    content=content,
+                    chunks=chunks
+                ), content_hash
+
+        content = self.processor.process_bytes(data, file_extension)
+        chunks = self.processor.chunk_text(content, chunk_size=self.chunk_size, overlap=self.chunk_overlap)
+
+        if cache_key is not None:
+            self.cache.put(cache_key, content, chunks)
+
+        return UploadedDocument(
+            file_name=file_name,
+            file_type=file_extension,
+            upload_date=datetime.now(),
+            content=content,
+            chunks=chunks
+        ), content_hash
+
+    def cached_upload(self, content_hash: str, file_name: str, file_type: str) -> Optional[UploadedDocument]:
+        """
+        Return a previously extracted document by the SHA-256 of its bytes.
+
+        Args:
+            content_hash: SHA-256 hex digest of the file contents
+            file_name: Name to assign to the document
+            file_type: File extension of the document
+
+        Returns:
+            UploadedDocument from the extraction cache, or None if there is no
+            cache or the entry is missing
+        """
+        if self.cache is None:
+            return None
+
+        cached = self.cache.get(self.cache.key_for_hash(content_hash, **self._cache_params(file_type)))
+        if cached is None:
+            return None
+
+        content, chunks = cached
+        return UploadedDocument(
+            file_name=file_name,
+            file_type=file_type,
+            upload_date=datetime.now(),
+            content=content,
+            chunks=chunks
+        )
+
+    def read_response(self, response: "requests.Response", file_name: str) -> Tuple[memoryview, str]:
+        """
+        Read a streamed document download into memory, enforcing the size limit.
+
+        Args:
+            response: Successful streaming HTTP response for the document
+            file_name: File name taken from the URL
+
+        Returns:
+            Tuple of (view of the file contents, file extension); the view
+            shares the download buffer rather than copying it
+
+        Raises:
+            ValueError: If file format is not supported or file size exceeds limit
+        """
+        file_extension = self._extension_from_response(response, file_name)
+
+        # Check file size from headers
+        max_bytes = self.max_file_size_mb * 1024 * 1024
+        content_length = response.headers.get('content-length')
+        if content_length and int(content_length) > max_bytes:
+            raise ValueError(f"File size exceeds the maximum allowed size ({self.max_file_size_mb} MB)")
+
+        # Accumulate the body in memory, enforcing the size limit as it arrives
+        buffer = bytearray()
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            buffer += chunk
+            if len(buffer) > max_bytes:
                 raise ValueError(f"File size exceeds the maximum allowed size ({self.max_file_size_mb} MB)")
 
-            # Download the file
-            with open(download_path, 'wb') as f:
-                downloaded_size = 0
-                for chunk in response.iter_content(chunk_size=8192):
-                    downloaded_size += len(chunk)
-                    if downloaded_size / (1024 * 1024) > self.max_file_size_mb:
-                        raise ValueError(f"File size exceeds the maximum allowed size ({self.max_file_size_mb} MB)")
-                    f.write(chunk)
+        return memoryview(buffer), file_extension
+
+    def _extension_from_response(self, response: "requests.Response", file_name: str) -> str:
+        """
+        Determine a downloaded document's format from its content type or name.
 
-            # Process the downloaded file
-            result = self.upload_from_file(download_path)
+        Args:
+            response: HTTP response for the document
+            file_name: File name taken from the URL
 
-            return result
+        Returns:
+            Supported file extension without the leading dot
 
-        except Exception as e:
-            raise e
-        finally:
-            # Clean up temporary directory if it was created
-            if temp_dir:
-                shutil.rmtree(temp_dir, ignore_errors=True)
+        Raises:
+            ValueError: If the format is not supported
+        """
+        # Check content type
+        content_type = response.headers.get('content-type', '').split(';')[0].strip().lower()
+        file_extension = mimetypes.guess_extension(content_type) if content_type else None
+
+        if not file_extension:
+            # Try to get extension from URL if content-type doesn't help
+            file_extension = os.path.splitext(file_name)[1].lower()
+
+        if file_extension.startswith('.'):
+            file_extension = file_extension[1:]
+
+        if file_extension not in self._supported_formats:
+            raise ValueError(f"Unsupported file format: {file_extension or 'unknown'}. Supported formats: {', '.join(self._supported_formats.keys())}")
+
+        return file_extension
 
     def upload_from_text(self, text: str, file_name: str = "pasted_text.txt") -> UploadedDocument:
         """
@@ -192,11 +508,154 @@ class DocumentUploader:
             file_type="txt",
             upload_date=datetime.now(),
             content=text,
-            chunks=self.processor.chunk_text(text)
+            chunks=self.processor.chunk_text(text, chunk_size=self.chunk_size, overlap=self.chunk_overlap)
         )
 
         return document
 
+    def upload_from_directory(
+        self,
+        directory: str,
+        recursive: bool = True,
+        workers: Optional[int] = None
+    ) -> Iterator[IngestResult]:
+        """
+        Ingest every supported document in a directory using a process pool.
+
+        Args:
+            directory: Directory to scan for documents
+            recursive: Whether to descend into subdirectories
+            workers: Number of worker processes (None uses all available CPUs)
+
+        Returns:
+            Iterator over IngestResults in completion order
+
+        Raises:
+            FileNotFoundError: If the directory does not exist
+        """
+        directory = Path(directory)
+        if not directory.is_dir():
+            raise FileNotFoundError(f"Directory not found: {directory}")
+
+        pattern = "**/*" if recursive else "*"
+        paths = sorted(
+            str(path) for path in directory.glob(pattern)
+            if path.is_file() and path.suffix.lower().lstrip('.') in self._supported_formats
+        )
+        return self.upload_many(paths, workers=workers)
+
+    def upload_from_manifest(self, manifest_path: str, workers: Optional[int] = None) -> Iterator[IngestResult]:
+        """
+        Ingest the documents listed in a manifest file using a process pool.
+
+        The manifest is either a JSON list of paths or a text file with one
+        path per line. Relative paths are resolved against the manifest's
+        directory.
+
+        Args:
+            manifest_path: Path to the manifest file
+            workers: Number of worker processes (None uses all available CPUs)
+
+        Returns:
+            Iterator over IngestResults in completion order
+
+        Raises:
+            FileNotFoundError: If the manifest does not exist
+            ValueError: If the manifest is not a list of paths
+        """
+        manifest_path = Path(manifest_path)
+        if not manifest_path.exists():
+            raise FileNotFoundError(f"Manifest not found: {manifest_path}")
+
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            raw = f.read()
+
+        if manifest_path.suffix.lower() == ".json":
+            try:
+                entries = json.loads(raw)
+            except json.JSONDecodeError:
+                raise ValueError(f"Invalid JSON in manifest: {manifest_path}")
+            if not isinstance(entries, list):
+                raise ValueError("Manifest must be a list of paths")
+        else:
+            entries = [line.strip() for line in raw.splitlines()]
+            entries = [line for line in entries if line and not line.startswith("#")]
+
+        paths = [str(manifest_path.parent / entry) for entry in entries]
+        return self.upload_many(paths, workers=workers)
+
+    def upload_many(self, file_paths: Iterable[str], workers: Optional[int] = None) -> Iterator[IngestResult]:
+        """
+        Ingest many local files in parallel, yielding results as they complete.
+
+        A failure in one file is reported on its IngestResult and does not
+        stop the batch. Throughput counters are kept up to date in
+        last_batch_stats while the batch runs.
+
+        Args:
+            file_paths: Paths of the files to ingest
+            workers: Number of worker processes (None uses all available CPUs)
+
+        Yields:
+            IngestResult for each file, in completion order
+        """
+        workers = workers or os.cpu_count() or 1
+        stats = IngestStats()
+        self.last_batch_stats = stats
+        start = time.perf_counter()
+
+        config = {
+            "max_file_size_mb": self.max_file_size_mb,
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap,
+            "cache_dir": str(self.cache.cache_dir) if self.cache is not None else None,
+            "cache_max_size_mb": self.cache.max_size_bytes / (1024 * 1024) if self.cache is not None else None,
+        }
+
+        # Keep a bounded number of files in flight so huge batches stay lean
+        max_in_flight = workers * 4
+        paths = iter(file_paths)
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_ingest_worker, initargs=(config,)) as executor:
+            in_flight = set()
+            for path in paths:
+                in_flight.add(executor.submit(_ingest_file, path))
+                if len(in_flight) < max_in_flight:
+                    continue
+                for future in as_completed(in_flight):
+                    in_flight.remove(future)
+                    yield self._record_ingest(future.result(), stats, start)
+                    break
+
+            for future in as_completed(in_flight):
+                yield self._record_ingest(future.result(), stats, start)
+
+    def _record_ingest(self, result: IngestResult, stats: IngestStats, start: float) -> IngestResult:
+        """Update batch counters with a completed IngestResult and return it."""
+        stats.files += 1
+        stats.size_bytes += result.size_bytes
+        if not result.ok:
+            stats.failed += 1
+        stats.elapsed_seconds = time.perf_counter() - start
+        return result
+
+    def _cache_params(self, file_type: str) -> Dict[str, Any]:
+        """
+        Return the parameters that cached extraction results depend on.
+
+        Args:
+            file_type: File extension of the document
+
+        Returns:
+            Dict of parameters to mix into the cache key
+        """
+        return {
+            "extractor_version": EXTRACTOR_VERSION,
+            "file_type": file_type,
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap,
+        }
+
     def get_supported_formats(self) -> List[str]:
         """
         Return list of supported file formats.
@@ -207,20 +666,46 @@ class DocumentUploader:
         return list(self._supported_formats.keys())
 
 
+# Registry of extractor factories by file extension. Factories receive the
+# DocumentProcessor and are only called the first time a format is used, so
+# format libraries (PyMuPDF, python-docx, python-pptx) are imported on demand.
+_EXTRACTOR_REGISTRY: Dict[str, Callable[["DocumentProcessor"], Any]] = {
+    "pdf": lambda processor: PDFExtractor(workers=processor.pdf_workers),
+    "docx": lambda processor: DocxExtractor(),
+    "doc": lambda processor: DocxExtractor(),  # Use the same extractor for .doc files
+    "txt": lambda processor: TextExtractor(),
+    "md": lambda processor: TextExtractor(),   # Use the same extractor for markdown files
+    "pptx": lambda processor: PPTExtractor(),
+    "ppt": lambda processor: PPTExtractor(),   # Use the same extractor for .ppt files
+}
+
+
+def register_extractor(file_type: str, factory: Callable[["DocumentProcessor"], Any]) -> None:
+    """
+    Register an extractor factory for a file extension.
+
+    Args:
+        file_type: File extension handled by the extractor
+        factory: Callable taking a DocumentProcessor and returning an extractor
+            with extract, extract_bytes and iter_text methods
+    """
+    _EXTRACTOR_REGISTRY[file_type.lower().lstrip('.')] = factory
+
+
 class DocumentProcessor:
     """Processes uploaded documents and extracts text content."""
 
-    def __init__(self):
-        """Initialize the document processor."""
-        self._extractors = {
-            "pdf": PDFExtractor(),
-            "docx": DocxExtractor(),
-            "doc": DocxExtractor(),  # Use the same extractor for .doc files
-            "txt": TextExtractor(),
-            "md": TextExtractor(),   # Use the same extractor for markdown files
-            "pptx": PPTExtractor(),
-            "ppt": PPTExtractor()    # Use the same extractor for .ppt files
-        }
+    def __init__(self, pdf_workers: Optional[int] = 1):
+        """
+        Initialize the document processor.
+
+        Args:
+            pdf_workers: Number of worker processes used to extract PDF pages
+                (None uses all available CPUs)
+        """
+        self.pdf_workers = pdf_workers
+        self._extractors: Dict[str, Any] = {}
+        self._chunkers: Dict[tuple, OffsetChunker] = {}
 
     def process_document(self, file_path: str) -> str:
         """
@@ -245,14 +730,51 @@ class DocumentProcessor:
         # Get file extension
         file_extension = file_path.suffix.lower().lstrip('.')
 
-        # Check if the format is supported
-        if file_extension not in self._extractors:
-            raise ValueError(f"Unsupported document format: {file_extension}")
-
         # Extract text using the appropriate extractor
-        extractor = self._extractors[file_extension]
+        extractor = self._get_extractor(file_extension)
         return extractor.extract(str(file_path))
 
+    def process_bytes(self, data: Union[bytes, memoryview], file_type: str) -> str:
+        """
+        Extract text from an in-memory document based on its format.
+
+        Args:
+            data: Raw file contents
+            file_type: File extension of the document
+
+        Returns:
+            Extracted text content as string
+
+        Raises:
+            ValueError: If file format is not supported
+        """
+        file_extension = file_type.lower().lstrip('.')
+
+        return self._get_extractor(file_extension).extract_bytes(data)
+
+    def _get_extractor(self, file_extension: str) -> Any:
+        """
+        Return the extractor for a format, creating it on first use.
+
+        Args:
+            file_extension: File extension without the leading dot
+
+        Returns:
+            Extractor instance for the format
+
+        Raises:
+            ValueError: If file format is not supported
+        """
+        extractor = self._extractors.get(file_extension)
+        if extractor is None:
+            # Check if the format is supported
+            factory = _EXTRACTOR_REGISTRY.get(file_extension)
+            if factory is None:
+                raise ValueError(f"Unsupported document format: {file_extension}")
+            extractor = factory(self)
+            self._extractors[file_extension] = extractor
+        return extractor
+
     def chunk_text(self, text: str, chunk_size: int = 1000, overlap: int = 200) -> List[str]:
         """
         Split extracted text into manageable chunks for processing.
@@ -268,15 +790,142 @@ class DocumentProcessor:
         if not text:
             return []
 
-        # Use langchain's text splitter to split the text into chunks
-        splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=overlap,
-            separators=["\n\n", "\n", " ", ""]
-        )
+        return list(self.chunk_spans(text, chunk_size=chunk_size, overlap=overlap))
 
-        chunks = splitter.split_text(text)
-        return chunks
+    def chunk_spans(self, text: str, chunk_size: int = 1000, overlap: int = 200) -> ChunkSpans:
+        """
+        Split text into chunks represented as offsets into the text.
+
+        Chunk strings are only materialized when the returned spans are
+        indexed or iterated.
+
+        Args:
+            text: The text to split
+            chunk_size: Maximum size of each chunk
+            overlap: Overlap between consecutive chunks
+
+        Returns:
+            ChunkSpans over the text
+        """
+        return self._chunker(chunk_size, overlap).split(text)
+
+    def _chunker(self, chunk_size: int, overlap: int) -> OffsetChunker:
+        """Return the chunker for a chunk size and overlap, creating it on first use."""
+        key = (chunk_size, overlap)
+        chunker = self._chunkers.get(key)
+        if chunker is None:
+            chunker = OffsetChunker(chunk_size=chunk_size, overlap=overlap)
+            self._chunkers[key] = chunker
+        return chunker
+
+    def iter_text(self, file_path: str) -> Iterator[str]:
+        """
+        Stream text fragments from the document based on its format.
+
+        Args:
+            file_path: Path to the document
+
+        Returns:
+            Text fragments whose concatenation equals process_document's output
+
+        Raises:
+            ValueError: If file format is not supported
+            FileNotFoundError: If file does not exist
+        """
+        file_path = Path(file_path)
+
+        # Check if file exists
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        # Get file extension
+        file_extension = file_path.suffix.lower().lstrip('.')
+
+        return self._get_extractor(file_extension).iter_text(str(file_path))
+
+    def iter_chunks(self, file_path: str, chunk_size: int = 1000, overlap: int = 200) -> Iterator[str]:
+        """
+        Extract and chunk a document as a stream.
+
+        Args:
+            file_path: Path to the document
+            chunk_size: Maximum size of each chunk
+            overlap: Overlap between consecutive chunks
+
+        Returns:
+            Iterator over text chunks in document order
+        """
+        return self.stream_chunks(self.iter_text(file_path), chunk_size=chunk_size, overlap=overlap)
+
+    def stream_chunks(
+        self,
+        fragments: Iterable[str],
+        chunk_size: int = 1000,
+        overlap: int = 200
+    ) -> Iterator[str]:
+        """
+        Chunk a stream of text fragments into the same chunks as chunk_text.
+
+        Text is only held until the next paragraph break ("\n\n"), where
+        chunk_text would also cut it, so memory is bounded by the longest
+        paragraph rather than the whole document.
+
+        Args:
+            fragments: Text fragments in document order
+            chunk_size: Maximum size of each chunk
+            overlap: Overlap between consecutive chunks
+
+        Returns:
+            Iterator over text chunks in document order
+        """
+        return self._chunker(chunk_size, overlap).split_stream(fragments)
+
+
+# Batch ingestion workers
+
+_worker_uploader: Optional[DocumentUploader] = None
+
+
+def _init_ingest_worker(config: Dict[str, Any]) -> None:
+    """
+    Create the DocumentUploader used by a batch ingestion worker process.
+
+    Args:
+        config: Settings copied from the parent DocumentUploader
+    """
+    global _worker_uploader
+    cache = None
+    if config["cache_dir"]:
+        cache = ExtractionCache(cache_dir=config["cache_dir"], max_size_mb=config["cache_max_size_mb"])
+
+    _worker_uploader = DocumentUploader(
+        max_file_size_mb=config["max_file_size_mb"],
+        cache=cache,
+        chunk_size=config["chunk_size"],
+        chunk_overlap=config["chunk_overlap"]
+    )
+
+
+def _ingest_file(file_path: str) -> IngestResult:
+    """
+    Ingest a single file in a worker process, capturing any failure.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        IngestResult with either the document or the error message
+    """
+    try:
+        size_bytes = os.path.getsize(file_path)
+    except OSError:
+        size_bytes = 0
+
+    try:
+        document = _worker_uploader.upload_from_file(file_path)
+        return IngestResult(file_path=file_path, size_bytes=size_bytes, document=document)
+    except Exception as e:
+        return IngestResult(file_path=file_path, size_bytes=size_bytes, error=str(e))
 
 
 # Format-specific extractors
@@ -284,6 +933,19 @@ class DocumentProcessor:
 class PDFExtractor:
     """Extracts text from PDF documents."""
 
+    def __init__(self, workers: Optional[int] = 1, min_pages_per_worker: int = 8):
+        """
+        Initialize the PDF extractor.
+
+        Args:
+            workers: Number of worker processes used to extract pages
+                (1 extracts serially, None uses all available CPUs)
+            min_pages_per_worker: Minimum number of pages given to each worker;
+                smaller documents are extracted serially
+        """
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.min_pages_per_worker = max(1, min_pages_per_worker)
+
     def extract(self, file_path: str) -> str:
         """
         Extract text from a PDF file.
@@ -295,31 +957,215 @@ class PDFExtractor:
             Extracted text
         """
         try:
+            import fitz  # PyMuPDF
+
             # Open the PDF file
             doc = fitz.open(file_path)
 
-            # Extract text from each page and join with double newlines
-            text = "\n\n".join(page.get_text("text") for page in doc)
+            page_ranges = self._page_ranges(doc.page_count)
+            if len(page_ranges) <= 1:
+                # Extract text from each page and join with double newlines
+                text = "\n\n".join(page.get_text("text") for page in doc)
+                doc.close()
+                return text
 
-            return text
+            doc.close()
+            return self._extract_parallel(file_path, page_ranges)
+        except Exception as e:
+            raise ValueError(f"Failed to extract text from PDF: {str(e)}")
+
+    def extract_bytes(self, data: Union[bytes, memoryview]) -> str:
+        """
+        Extract text from an in-memory PDF.
+
+        Documents large enough to split across workers are handed to each
+        worker once, when its process starts, and opened there in memory;
+        nothing is written to disk.
+
+        Args:
+            data: Raw PDF contents
+
+        Returns:
+            Extracted text
+        """
+        try:
+            import fitz  # PyMuPDF
+
+            doc = fitz.open(stream=data, filetype="pdf")
+            try:
+                page_ranges = self._page_ranges(doc.page_count)
+                if len(page_ranges) <= 1:
+                    return "\n\n".join(page.get_text("text") for page in doc)
+            finally:
+                doc.close()
+
+            return self._extract_parallel(None, page_ranges, data=data)
+        except Exception as e:
+            raise ValueError(f"Failed to extract text from PDF: {str(e)}")
+
+    def _extract_parallel(self, file_path: Optional[str], page_ranges: List[tuple],
+                          data: Optional[Union[bytes, memoryview]] = None) -> str:
+        """
+        Extract page ranges of a PDF in worker processes.
+
+        Args:
+            file_path: Path to the PDF file, or None when data is given
+            page_ranges: Half-open page ranges from _page_ranges, one per worker
+            data: Raw PDF contents to extract instead of a file
+
+        Returns:
+            Extracted text
+        """
+        starts = [start for start, _ in page_ranges]
+        ends = [end for _, end in page_ranges]
+        # Each worker opens its own handle and returns its pages in order
+        if data is None:
+            executor = ProcessPoolExecutor(max_workers=len(page_ranges))
+            task, args = _extract_page_range, ([file_path] * len(page_ranges), starts, ends)
+        else:
+            executor = ProcessPoolExecutor(max_workers=len(page_ranges),
+                                           initializer=_open_worker_pdf, initargs=(bytes(data),))
+            task, args = _extract_worker_page_range, (starts, ends)
+        with executor:
+            pages = [page for shard in executor.map(task, *args) for page in shard]
+
+        return "\n\n".join(pages)
+
+    def _page_ranges(self, page_count: int) -> List[tuple]:
+        """
+        Split the pages of a document into contiguous (start, end) ranges.
+
+        Args:
+            page_count: Number of pages in the document
+
+        Returns:
+            List of half-open page ranges, one per worker
+        """
+        workers = min(self.workers, page_count // self.min_pages_per_worker)
+        if workers <= 1:
+            return [(0, page_count)]
+
+        step, remainder = divmod(page_count, workers)
+        ranges = []
+        start = 0
+        for i in range(workers):
+            end = start + step + (1 if i < remainder else 0)
+            ranges.append((start, end))
+            start = end
+        return ranges
+
+    def iter_text(self, file_path: str) -> Iterator[str]:
+        """
+        Stream text from a PDF file one page at a time.
+
+        Args:
+            file_path: Path to the PDF file
+
+        Yields:
+            Page texts, separated by double newlines
+        """
+        try:
+            import fitz  # PyMuPDF
+
+            doc = fitz.open(file_path)
         except Exception as e:
             raise ValueError(f"Failed to extract text from PDF: {str(e)}")
 
+        try:
+            for i, page in enumerate(doc):
+                if i:
+                    yield "\n\n"
+                yield page.get_text("text")
+        finally:
+            doc.close()
+
+
+def _extract_page_range(file_path: str, start: int, end: int) -> List[str]:
+    """
+    Extract the text of pages [start, end) from a PDF in a worker process.
+
+    Args:
+        file_path: Path to the PDF file
+        start: Index of the first page to extract
+        end: Index one past the last page to extract
+
+    Returns:
+        List of page texts in page order
+    """
+    import fitz  # PyMuPDF
+
+    doc = fitz.open(file_path)
+    try:
+        return [doc[i].get_text("text") for i in range(start, end)]
+    finally:
+        doc.close()
+
+
+# The PDF a worker process opened from bytes in _open_worker_pdf
+_worker_pdf = None
+
+
+def _open_worker_pdf(data: bytes) -> None:
+    """
+    Open an in-memory PDF once when a worker process starts.
+
+    Args:
+        data: Raw PDF contents
+    """
+    global _worker_pdf
+    import fitz  # PyMuPDF
+
+    _worker_pdf = fitz.open(stream=data, filetype="pdf")
+
+
+def _extract_worker_page_range(start: int, end: int) -> List[str]:
+    """
+    Extract the text of pages [start, end) from the PDF opened by _open_worker_pdf.
+
+    Args:
+        start: Index of the first page to extract
+        end: Index one past the last page to extract
+
+    Returns:
+        List of page texts in page order
+    """
+    return [_worker_pdf[i].get_text("text") for i in range(start, end)]
+
+
+_WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+
 
 class DocxExtractor:
     """Extracts text from DOCX documents."""
 
+    def __init__(self, streaming: bool = True):
+        """
+        Initialize the DOCX extractor.
+
+        Args:
+            streaming: Parse word/document.xml incrementally, emitting paragraph
+                and table-cell text in document order. When False, load the
+                python-docx object model and read body paragraphs only.
+        """
+        self.streaming = streaming
+
     def extract(self, file_path: str) -> str:
         """
         Extract text from a DOCX file.
 
         Args:
-            file_path: Path to the DOCX file
+            file_path: Path to the DOCX file (or a binary file object)
 
         Returns:
             Extracted text
         """
         try:
+            if self.streaming:
+                return "\n\n".join(self._iter_blocks(file_path))
+
+            import docx
+
             # Load the DOCX document
             doc = docx.Document(file_path)
 
@@ -333,6 +1179,125 @@ class DocxExtractor:
         except Exception as e:
             raise ValueError(f"Failed to extract text from DOCX: {str(e)}")
 
+    def extract_bytes(self, data: Union[bytes, memoryview]) -> str:
+        """
+        Extract text from an in-memory DOCX file.
+
+        Args:
+            data: Raw DOCX contents
+
+        Returns:
+            Extracted text
+        """
+        return self.extract(io.BytesIO(data))
+
+    def iter_text(self, file_path: str) -> Iterator[str]:
+        """
+        Stream text from a DOCX file one paragraph at a time.
+
+        Args:
+            file_path: Path to the DOCX file
+
+        Yields:
+            Paragraph (and, when streaming, table-cell) texts, separated by
+            double newlines
+        """
+        try:
+            if self.streaming:
+                blocks = self._iter_blocks(file_path)
+                first = next(blocks, None)
+            else:
+                import docx
+
+                blocks = (p.text for p in docx.Document(file_path).paragraphs)
+                first = next(blocks, None)
+        except Exception as e:
+            raise ValueError(f"Failed to extract text from DOCX: {str(e)}")
+
+        if first is None:
+            return
+        yield first
+        for block in blocks:
+            yield "\n\n"
+            yield block
+
+    def _iter_blocks(self, source: Any) -> Iterator[str]:
+        """
+        Incrementally parse word/document.xml and yield text blocks in document order.
+
+        Body paragraphs are yielded one by one. Each table cell is yielded as a
+        single block with its paragraphs joined by newlines. Parsed elements
+        are discarded as soon as they are consumed, so memory stays flat
+        regardless of document size.
+
+        Args:
+            source: Path to the DOCX file or a binary file object
+
+        Yields:
+            Text of each paragraph or table cell
+        """
+        import zipfile
+        from xml.etree.ElementTree import iterparse
+
+        paragraph_tag = f"{_WORD_NS}p"
+        cell_tag = f"{_WORD_NS}tc"
+        text_tag = f"{_WORD_NS}t"
+        body_tag = f"{_WORD_NS}body"
+        tab_tag = f"{_WORD_NS}tab"
+        break_tags = {f"{_WORD_NS}br", f"{_WORD_NS}cr"}
+
+        with zipfile.ZipFile(source) as archive, archive.open("word/document.xml") as xml_file:
+            body = None
+            depth = 0
+            fallback_depth = 0
+            paragraphs: List[List[str]] = []
+            cells: List[List[str]] = []
+
+            for event, elem in iterparse(xml_file, events=("start", "end")):
+                tag = elem.tag
+                if event == "start":
+                    depth += 1
+                    if tag == _MC_FALLBACK:
+                        # Fallback content duplicates the preferred alternative
+                        fallback_depth += 1
+                    elif fallback_depth:
+                        pass
+                    elif tag == paragraph_tag:
+                        paragraphs.append([])
+                    elif tag == cell_tag:
+                        cells.append([])
+                    elif tag == body_tag:
+                        body = elem
+                    continue
+
+                depth -= 1
+                if tag == _MC_FALLBACK:
+                    fallback_depth -= 1
+                elif fallback_depth:
+                    pass
+                elif tag == text_tag and paragraphs:
+                    paragraphs[-1].append(elem.text or "")
+                elif tag == tab_tag and paragraphs:
+                    paragraphs[-1].append("\t")
+                elif tag in break_tags and paragraphs:
+                    paragraphs[-1].append("\n")
+                elif tag == paragraph_tag:
+                    text = "".join(paragraphs.pop())
+                    if cells:
+                        cells[-1].append(text)
+                    else:
+                        yield text
+                elif tag == cell_tag:
+                    text = "\n".join(cells.pop())
+                    if cells:
+                        cells[-1].append(text)
+                    else:
+                        yield text
+
+                # Drop finished top-level blocks so the tree never grows
+                if body is not None and depth == 2:
+                    body.clear()
+
 
 class TextExtractor:
     """Extracts text from plain text documents."""
@@ -364,6 +1329,67 @@ class TextExtractor:
         except Exception as e:
             raise ValueError(f"Failed to extract text from text file: {str(e)}")
 
+    def extract_bytes(self, data: Union[bytes, memoryview]) -> str:
+        """
+        Decode an in-memory plain text file.
+
+        Args:
+            data: Raw file contents
+
+        Returns:
+            Decoded text
+        """
+        try:
+            return str(data, 'utf-8')
+        except UnicodeDecodeError:
+            # Try with a different encoding if UTF-8 fails
+            return str(data, 'latin-1')
+
+    def iter_text(self, file_path: str, block_size: int = 64 * 1024) -> Iterator[str]:
+        """
+        Stream text from a plain text file in fixed-size blocks.
+
+        Args:
+            file_path: Path to the text file
+            block_size: Number of characters to read per block
+
+        Yields:
+            Consecutive blocks of the file's text
+        """
+        try:
+            encoding = self._detect_encoding(file_path, block_size)
+            with open(file_path, 'r', encoding=encoding) as f:
+                while True:
+                    block = f.read(block_size)
+                    if not block:
+                        break
+                    yield block
+        except Exception as e:
+            raise ValueError(f"Failed to extract text from text file: {str(e)}")
+
+    def _detect_encoding(self, file_path: str, block_size: int) -> str:
+        """
+        Check whether the file decodes as UTF-8 without loading it whole.
+
+        Args:
+            file_path: Path to the text file
+            block_size: Number of bytes to read per block
+
+        Returns:
+            "utf-8" if the whole file decodes cleanly, otherwise "latin-1"
+        """
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        try:
+            with open(file_path, 'rb') as f:
+                while True:
+                    block = f.read(block_size)
+                    decoder.decode(block, final=not block)
+                    if not block:
+                        break
+        except UnicodeDecodeError:
+            return 'latin-1'
+        return 'utf-8'
+
 
 class PPTExtractor:
     """Extracts text from PowerPoint presentations."""
@@ -406,3 +1432,44 @@ class PPTExtractor:
             raise ValueError("python-pptx package is required to extract text from PowerPoint files. Please install it with 'pip install python-pptx'")
         except Exception as e:
             raise ValueError(f"Failed to extract text from PowerPoint file: {str(e)}")
+
+    def extract_bytes(self, data: Union[bytes, memoryview]) -> str:
+        """
+        Extract text from an in-memory PPT/PPTX file.
+
+        Args:
+            data: Raw presentation contents
+
+        Returns:
+            Extracted text
+        """
+        return self.extract(io.BytesIO(data))
+
+    def iter_text(self, file_path: str) -> Iterator[str]:
+        """
+        Stream text from a PPT/PPTX file one slide at a time.
+
+        Args:
+            file_path: Path to the presentation file
+
+        Yields:
+            Slide texts, separated by double newlines
+        """
+        try:
+            from pptx import Presentation
+
+            presentation = Presentation(file_path)
+        except ImportError:
+            raise ValueError("python-pptx package is required to extract text from PowerPoint files. Please install it with 'pip install python-pptx'")
+        except Exception as e:
+            raise ValueError(f"Failed to extract text from PowerPoint file: {str(e)}")
+
+        for i, slide in enumerate(presentation.slides):
+            slide_text = [f"Slide {i+1}:"]
+            for shape in slide.shapes:
+                if hasattr(shape, "text") and shape.text:
+                    slide_text.append(shape.text)
+
+            if i:
+                yield "\n\n"
+            yield "\n".join(slide_text)
@@ -0,0 +1,189 @@
+"""
+Content-addressed on-disk cache for extracted document text and chunks.
+Entries are keyed by a hash of the file bytes, the extractor version and the
+chunking parameters, stored as gzip-compressed JSON and evicted in LRU order
+once the cache grows past its size limit.
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+
+class ExtractionCache:
+    """Size-bounded LRU cache of extraction results on local disk."""
+
+    def __init__(self, cache_dir: str = ".cache/extraction", max_size_mb: float = 512):
+        """
+        Initialize the extraction cache.
+
+        Args:
+            cache_dir: Directory where cache entries are stored
+            max_size_mb: Maximum total size of the cache in megabytes
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._size_bytes = sum(path.stat().st_size for path in self._entries())
+
+    def key_for_file(self, file_path: str, **params: Any) -> str:
+        """
+        Build a cache key from a file's bytes and the extraction parameters.
+
+        Args:
+            file_path: Path to the file
+            **params: Extractor version, chunking parameters and anything else
+                the cached result depends on
+
+        Returns:
+            Hex digest identifying the cache entry
+        """
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return self._key(digest.hexdigest(), params)
+
+    def key_for_bytes(self, data: bytes, **params: Any) -> str:
+        """
+        Build a cache key from in-memory file bytes and the extraction parameters.
+
+        Args:
+            data: File contents
+            **params: Extractor version, chunking parameters and anything else
+                the cached result depends on
+
+        Returns:
+            Hex digest identifying the cache entry
+        """
+        return self._key(hashlib.sha256(data).hexdigest(), params)
+
+    def key_for_hash(self, content_hash: str, **params: Any) -> str:
+        """
+        Build a cache key from the SHA-256 hex digest of a file's bytes.
+
+        Lets callers that kept only the hash of a document find its
+        extraction result without the bytes.
+
+        Args:
+            content_hash: SHA-256 hex digest of the file contents
+            **params: Extractor version, chunking parameters and anything else
+                the cached result depends on
+
+        Returns:
+            Hex digest identifying the cache entry
+        """
+        return self._key(content_hash, params)
+
+    def get(self, key: str) -> Optional[Tuple[str, List[str]]]:
+        """
+        Look up a cached extraction result.
+
+        Args:
+            key: Cache key from key_for_file or key_for_bytes
+
+        Returns:
+            Tuple of (content, chunks) if cached, None otherwise
+        """
+        path = self._path(key)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                entry = json.load(f)
+            # Touch the entry so it becomes the most recently used
+            os.utime(path)
+        except (FileNotFoundError, OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return entry['content'], entry['chunks']
+
+    def put(self, key: str, content: str, chunks: List[str]) -> None:
+        """
+        Store an extraction result and evict old entries if over the size limit.
+
+        Args:
+            key: Cache key from key_for_file or key_for_bytes
+            content: Extracted text
+            chunks: Chunks of the extracted text
+        """
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump({'content': content, 'chunks': chunks}, f, separators=(',', ':'))
+
+        previous_size = path.stat().st_size if path.exists() else 0
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._size_bytes += path.stat().st_size - previous_size
+            if self._size_bytes > self.max_size_bytes:
+                self._evict()
+
+    def clear(self) -> None:
+        """Remove every cache entry."""
+        with self._lock:
+            for path in self._entries():
+                path.unlink(missing_ok=True)
+            self._size_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return cache counters.
+
+        Returns:
+            Dict with hits, misses, evictions, hit_rate and size_bytes
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size_bytes': self._size_bytes,
+            }
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the cache fits its limit."""
+        entries = []
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        entries.sort()
+        self._size_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self._size_bytes <= self.max_size_bytes:
+                break
+            path.unlink(missing_ok=True)
+            self._size_bytes -= size
+            self.evictions += 1
+
+    def _entries(self) -> List[Path]:
+        """Return the paths of all cache entries."""
+        return list(self.cache_dir.glob('*/*.json.gz'))
+
+    def _path(self, key: str) -> Path:
+        """Return the on-disk path for a cache key."""
+        return self.cache_dir / key[:2] / f"{key}.json.gz"
+
+    @staticmethod
+    def _key(content_hash: str, params: Dict[str, Any]) -> str:
+        """Combine a content hash with the extraction parameters."""
+        payload = json.dumps({'content': content_hash, 'params': params}, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
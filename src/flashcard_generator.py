@@ -1,17 +1,101 @@
 import json
-from .model import OpenAIClient
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Iterator
+from .card_schema import extract_cards, validate_card
+from .dedup import CardDeduplicator
+from .json_stream import JSONArrayStream
+from .metrics import MetricsRegistry
+from .model import OpenAIClient, resolve_model
+from .rate_limit import RateLimiter
+from .tokens import count_tokens
+
+CHUNK_SEPARATOR = "\n\n---\n\n"
+
+
+@dataclass
+class CoverageStats:
+    """How much of a document was sent to the model by the last generate call."""
+    chunks_total: int = 0
+    chunks_covered: int = 0
+    tokens_total: int = 0
+    tokens_covered: int = 0
+    calls: int = 0
+
+    @property
+    def coverage(self) -> float:
+        """Fraction of the document's tokens that produced cards."""
+        return self.tokens_covered / self.tokens_total if self.tokens_total else 1.0
+
+
+@dataclass
+class ParseStats:
+    """Cumulative counts of model responses and the cards parsed from them."""
+    responses: int = 0
+    parse_failures: int = 0
+    retries: int = 0
+    batches_failed: int = 0
+    cards_accepted: int = 0
+    cards_repaired: int = 0
+    cards_rejected: int = 0
+
+    @property
+    def failure_rate(self) -> float:
+        """Fraction of responses that yielded no usable cards."""
+        return self.parse_failures / self.responses if self.responses else 0.0
+
 
 class FlashcardGenerator:
     """
     High-level class to chunk text, call OpenAI, and parse cards.
+
+    With max_concurrency > 1, batches are sent to OpenAI from a thread pool
+    while a token-bucket limiter keeps requests and tokens per minute within
+    budget. generate returns cards in batch order; iter_generate streams
+    completions and yields each card as soon as it has been parsed.
+
+    Each card is validated on its own: repairable cards are fixed, broken
+    ones are dropped, and only a response with no usable cards counts as a
+    parse failure, which re-requests that batch up to parse_retries times.
+
+    With a card_deduplicator, cards repeating an earlier question (in this
+    run, in earlier runs of the same generator, or seeded from the database)
+    are dropped.
     """
-    def __init__(self):
-        self.openai = OpenAIClient()
+    # Tokens reserved per request for the model's reply when budgeting TPM
+    completion_token_estimate = 1000
+
+    def __init__(
+        self,
+        max_concurrency: int = 1,
+        requests_per_minute: float = None,
+        tokens_per_minute: float = None,
+        context_token_budget: int = 4000,
+        openai_client: OpenAIClient = None,
+        parse_retries: int = 1,
+        card_deduplicator: CardDeduplicator = None,
+        metrics: MetricsRegistry = None
+    ):
+        # A preconfigured client can be passed in, e.g. one with a response cache
+        self.openai = openai_client if openai_client is not None else OpenAIClient()
         self.level = "intermediate"  # Default level
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        # Maximum tokens of chunk text packed into a single prompt
+        self.context_token_budget = context_token_budget
+        self.last_coverage = CoverageStats()
+        self.parse_retries = parse_retries
+        self.parse_stats = ParseStats()
+        self.card_deduplicator = card_deduplicator
+        # Parse failures are also counted here, labeled by model and level
+        self.metrics = metrics
+        self._stats_lock = threading.Lock()
 
     def build_prompt(self, chunks: list[str]) -> str:
-        # Join first 3 chunks with context marker
-        combined_text = "\n\n---\n\n".join(chunks[:3])
+        # Join the packed chunks with context marker
+        combined_text = CHUNK_SEPARATOR.join(chunks)
         return f"""
         You are a data science, AI, and ML tutor generating flashcards for a {self.level} student.
 
@@ -35,45 +119,226 @@ class FlashcardGenerator:
         """
 
     def parse_response(self, text: str) -> list[dict]:
+        # Accepts a bare array or a structured-output {"cards": [...]} object.
+        # Cards are returned unvalidated; raises ValueError if none are found.
         try:
-            return json.loads(text)
+            cards = extract_cards(json.loads(text))
         except json.JSONDecodeError:
-            # Try to extract JSON from the text using regex
-            import re
-            json_match = re.search(r'\[\s*{.*}\s*\]', text, re.DOTALL)
-            if json_match:
-                try:
-                    return json.loads(json_match.group(0))
-                except json.JSONDecodeError:
-                    pass
-
-            # Fallback to a default structure
-            print("Warning: Could not parse JSON response")
-            return [{
-                "question": "Error parsing response",
-                "answer": "There was an error parsing the model's response. Please try again.",
-                "tags": ["error"]
-            }]
+            # Pull the card objects out of any surrounding prose or fences
+            cards = JSONArrayStream().feed(text) or None
+
+        if cards is None:
+            raise ValueError("Could not parse flashcards from the model response")
+        return cards
+
+    def pack_chunks(self, chunks: list[str], token_counts: list[int] = None) -> list[list[int]]:
+        # Greedily fill each prompt up to the token budget, keeping document
+        # order. Next-fit is optimal for contiguous batches, so this also
+        # minimises the number of calls. A chunk larger than the budget gets
+        # a batch of its own.
+        model = resolve_model()
+        if token_counts is None:
+            token_counts = [count_tokens(chunk, model) for chunk in chunks]
+        separator_tokens = count_tokens(CHUNK_SEPARATOR, model)
+
+        batches = []
+        current = []
+        current_tokens = 0
+        for i, tokens in enumerate(token_counts):
+            needed = tokens + (separator_tokens if current else 0)
+            if current and current_tokens + needed > self.context_token_budget:
+                batches.append(current)
+                current, current_tokens, needed = [], 0, tokens
+            current.append(i)
+            current_tokens += needed
+
+        if current:
+            batches.append(current)
+        return batches
+
+    def _batches(self, chunks: list[str]) -> tuple[list[list[str]], list[int]]:
+        # Pack every chunk into as few prompts as the context budget allows
+        model = resolve_model()
+        token_counts = [count_tokens(chunk, model) for chunk in chunks]
+        batches = [[chunks[i] for i in batch] for batch in self.pack_chunks(chunks, token_counts)]
+        return batches, token_counts
+
+    def _coverage(self, batches: list[list[str]], token_counts: list[int], ok: list[bool]) -> CoverageStats:
+        coverage = CoverageStats(chunks_total=len(token_counts), tokens_total=sum(token_counts), calls=len(batches))
+        position = 0
+        for batch_chunks, batch_ok in zip(batches, ok):
+            if batch_ok:
+                coverage.chunks_covered += len(batch_chunks)
+                coverage.tokens_covered += sum(token_counts[position:position + len(batch_chunks)])
+            position += len(batch_chunks)
+        return coverage
 
     def generate(self, chunks: list[str]) -> list[dict]:
-        # Process chunks in batches of 3 to avoid overloading the context
         all_cards = []
-        batch_size = 3
+        batches, token_counts = self._batches(chunks)
 
-        for i in range(0, min(len(chunks), 15), batch_size):
-            batch_chunks = chunks[i:i+batch_size]
-            prompt = self.build_prompt(batch_chunks)
-            raw = self.openai.generate_flashcards(prompt)
+        if self.max_concurrency == 1 or len(batches) <= 1:
+            results = [self._generate_batch(i, batch_chunks) for i, batch_chunks in enumerate(batches)]
+        else:
+            # map yields results in submission order, keeping card order deterministic
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as executor:
+                results = list(executor.map(self._generate_batch, range(len(batches)), batches))
 
-            try:
-                cards = self.parse_response(raw)
-                # Add default metadata
-                for c in cards:
-                    c.setdefault("tags", [])
-                    c.setdefault("level", self.level)
+        for cards, _ in results:
+            all_cards.extend(cards)
+        if self.card_deduplicator is not None:
+            all_cards = self.card_deduplicator.filter(all_cards)
+
+        self.last_coverage = self._coverage(batches, token_counts, [ok for _, ok in results])
+        return all_cards
 
-                all_cards.extend(cards)
+    def iter_generate(self, chunks: list[str]) -> Iterator[dict]:
+        # Streams each completion and yields cards as their closing brace
+        # arrives. With concurrency, cards from different batches interleave
+        # in arrival order. last_coverage is set once the iterator is exhausted.
+        batches, token_counts = self._batches(chunks)
+        ok = [False] * len(batches)
+
+        for card in self._iter_batches(batches, ok):
+            # Deduplicate in the caller's thread, so the index needs no lock
+            if self.card_deduplicator is None or not self.card_deduplicator.is_duplicate(card):
+                yield card
+
+        self.last_coverage = self._coverage(batches, token_counts, ok)
+
+    def _iter_batches(self, batches: list[list[str]], ok: list[bool]) -> Iterator[dict]:
+        if self.max_concurrency == 1 or len(batches) <= 1:
+            for i, batch_chunks in enumerate(batches):
+                ok[i] = yield from self._stream_batch(i, batch_chunks)
+        else:
+            yield from self._iter_concurrent(batches, ok)
+
+    def _iter_concurrent(self, batches: list[list[str]], ok: list[bool]) -> Iterator[dict]:
+        # Workers push ("card", card), ("done", index, ok) or ("error", exc)
+        # onto a shared queue; the caller's thread yields cards from it
+        output = queue.Queue()
+
+        def run(index: int, batch_chunks: list[str]) -> None:
+            stream = self._stream_batch(index, batch_chunks)
+            try:
+                while True:
+                    output.put(("card", next(stream)))
+            except StopIteration as stop:
+                output.put(("done", index, stop.value))
             except Exception as e:
-                print(f"Error processing batch {i//batch_size}: {str(e)}")
+                output.put(("error", e))
 
-        return all_cards
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as executor:
+            for i, batch_chunks in enumerate(batches):
+                executor.submit(run, i, batch_chunks)
+
+            remaining = len(batches)
+            while remaining:
+                item = output.get()
+                if item[0] == "card":
+                    yield item[1]
+                elif item[0] == "done":
+                    ok[item[1]] = item[2]
+                    remaining -= 1
+                else:
+                    raise item[1]
+
+    def _stream_batch(self, index: int, batch_chunks: list[str]) -> Iterator[dict]:
+        # Yields the batch's cards as they stream in and returns whether the
+        # response could be parsed
+        prompt = self.build_prompt(batch_chunks)
+        model = self.openai.request_body(prompt)["model"]
+        for attempt in range(self.parse_retries + 1):
+            self.rate_limiter.acquire(count_tokens(prompt, model) + self.completion_token_estimate)
+            if attempt:
+                self._count(retries=1)
+
+            parser = JSONArrayStream()
+            pieces = []
+            decoded = 0
+            emitted = 0
+            for piece in self.openai.stream_flashcards(prompt, refresh=attempt > 0, level=self.level):
+                pieces.append(piece)
+                for raw_card in parser.feed(piece):
+                    decoded += 1
+                    card = self._accept(raw_card)
+                    if card is not None:
+                        yield card
+                        emitted += 1
+
+            if decoded:
+                # Cards already went through _accept; objects the parser could
+                # not decode count as rejected cards
+                self._count(responses=1, cards_rejected=parser.errors)
+                if emitted:
+                    return True
+                self._count(model, parse_failures=1)
+                print(f"Warning: batch {index}: every card failed validation")
+            else:
+                # The parser found no cards; fall back to whole-response parsing
+                cards, ok = self.parse_batch(index, "".join(pieces), model)
+                if ok:
+                    yield from cards
+                    return True
+            self.openai.evict(prompt)
+
+        self._count(batches_failed=1)
+        return False
+
+    def _count(self, model: str = None, **increments: int) -> None:
+        # model labels parse failure metrics; pass the model from the request body
+        with self._stats_lock:
+            for name, amount in increments.items():
+                setattr(self.parse_stats, name, getattr(self.parse_stats, name) + amount)
+        if self.metrics is not None and increments.get("parse_failures"):
+            self.metrics.inc("llm_parse_failures_total", increments["parse_failures"],
+                             model=model, level=self.level)
+
+    def _accept(self, raw_card) -> dict:
+        # Returns the validated card with default metadata, or None if rejected
+        card, repaired = validate_card(raw_card)
+        if card is None:
+            self._count(cards_rejected=1)
+            return None
+
+        self._count(cards_accepted=1, cards_repaired=int(repaired))
+        card.setdefault("level", self.level)
+        return card
+
+    def _generate_batch(self, index: int, batch_chunks: list[str]) -> tuple[list[dict], bool]:
+        prompt = self.build_prompt(batch_chunks)
+        model = self.openai.request_body(prompt)["model"]
+        for attempt in range(self.parse_retries + 1):
+            self.rate_limiter.acquire(count_tokens(prompt, model) + self.completion_token_estimate)
+            if attempt:
+                self._count(retries=1)
+            # A retry must not be answered from the response cache
+            raw = self.openai.generate_flashcards(prompt, refresh=attempt > 0, level=self.level)
+            cards, ok = self.parse_batch(index, raw, model)
+            if ok:
+                return cards, True
+            # Don't replay a response that could not be parsed on the next run
+            self.openai.evict(prompt)
+
+        self._count(batches_failed=1)
+        return [], False
+
+    def parse_batch(self, index: int, raw: str, model: str = None) -> tuple[list[dict], bool]:
+        # Parses and validates one response; batch jobs use it for their
+        # results too. A response counts as failed if it has no cards list,
+        # or has cards but none of them survive validation. model is the
+        # request's model, used to label failures.
+        self._count(responses=1)
+        try:
+            raw_cards = self.parse_response(raw or "")
+        except ValueError as e:
+            self._count(model, parse_failures=1)
+            print(f"Warning: batch {index}: {str(e)}")
+            return [], False
+
+        cards = [card for card in map(self._accept, raw_cards) if card is not None]
+        if raw_cards and not cards:
+            self._count(model, parse_failures=1)
+            print(f"Warning: batch {index}: every card failed validation")
+            return [], False
+        return cards, True
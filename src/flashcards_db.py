@@ -3,12 +3,20 @@ Flashcards database operations for StudyWise AI.
 This module provides functions to create, retrieve, and manage flashcards in Supabase.
 """
 import json
-from typing import Dict, Any, List, Optional, Union
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple, Union
 import uuid
 from datetime import datetime
 
+from src.json_stream import JSONArrayStream
+from src.retry import RetryPolicy
 from src.supabase_client import get_supabase_client
 
+# Bytes read from a flashcard file at a time
+READ_CHUNK_SIZE = 1 << 16
+
 
 def upsert_flashcards_from_json(filepath: str) -> List[str]:
     """
@@ -51,47 +59,349 @@ def upsert_flashcards_from_json(filepath: str) -> List[str]:
     return [card['id'] for card in flashcards]
 
 
+def iter_flashcards_file(filepath: str, stats: Optional["BulkUpsertStats"] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Stream flashcards from a JSON array or JSONL file without loading it whole.
+
+    Files ending in .jsonl or .ndjson are read one card per line; anything
+    else must hold a JSON array of cards. Entries that are not valid JSON
+    objects are skipped and counted in stats.invalid.
+
+    Args:
+        filepath: Path to the flashcard file
+        stats: Optional stats whose invalid count is updated
+
+    Yields:
+        Each flashcard in file order
+
+    Raises:
+        FileNotFoundError: If the specified file does not exist
+        ValueError: If a JSON file does not hold an array, or the array is never closed
+    """
+    stats = stats if stats is not None else BulkUpsertStats()
+    try:
+        f = open(filepath, 'r', encoding='utf-8')
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Flashcard file not found: {filepath}")
+
+    with f:
+        if filepath.endswith(('.jsonl', '.ndjson')):
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    card = json.loads(line)
+                except json.JSONDecodeError:
+                    card = None
+                if isinstance(card, dict):
+                    yield card
+                else:
+                    stats.invalid += 1
+            return
+
+        parser = JSONArrayStream()
+        checked = False
+        while not parser.done:
+            text = f.read(READ_CHUNK_SIZE)
+            if not text:
+                raise ValueError(f"Invalid JSON in file: {filepath}")
+            if not checked and text.strip():
+                if not text.lstrip().startswith('['):
+                    raise ValueError("Flashcards data must be a list")
+                checked = True
+            yield from parser.feed(text)
+            stats.invalid = parser.errors
+
+
+@dataclass
+class BulkUpsertStats:
+    """Progress of a bulk upsert."""
+    rows: int = 0
+    pages: int = 0
+    failed_pages: int = 0
+    failed_rows: int = 0
+    retries: int = 0
+    invalid: int = 0
+    seconds: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def _pages(cards: Iterator[Dict[str, Any]], page_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Group cards into pages, adding IDs and timestamps as upsert_flashcards_from_json does."""
+    page = []
+    for card in cards:
+        if 'id' not in card:
+            card['id'] = str(uuid.uuid4())
+        card['created_at'] = datetime.utcnow().isoformat()
+        page.append(card)
+        if len(page) == page_size:
+            yield page
+            page = []
+    if page:
+        yield page
+
+
+def bulk_upsert_flashcards(
+    filepath: str,
+    page_size: int = 500,
+    max_workers: int = 4,
+    max_retries: int = 3,
+    retry_policy: Optional[RetryPolicy] = None
+) -> BulkUpsertStats:
+    """
+    Stream flashcards from a JSON or JSONL file and upsert them page by page.
+
+    Pages are sent over a small thread pool with at most two pages per
+    worker held in memory, so memory use does not grow with the file. Each
+    request is bounded by the retry policy's timeout, and a page failing with
+    a transient error (see is_transient_error) is retried on its own; a page
+    that still fails is recorded in the stats and the remaining pages are
+    uploaded. Card IDs are assigned before
+    the first attempt, so a retried page upserts the same rows.
+
+    Args:
+        filepath: Path to the JSON or JSONL file containing flashcards
+        page_size: Rows per upsert request
+        max_workers: Concurrent upsert requests
+        max_retries: Retries per page (ignored when retry_policy is given)
+        retry_policy: Policy used to retry failed pages
+
+    Returns:
+        BulkUpsertStats with row, page and failure counts and throughput
+
+    Raises:
+        FileNotFoundError: If the specified file does not exist
+        ValueError: If page_size or max_workers is not positive, or the file is not a JSON array
+    """
+    if page_size <= 0 or max_workers <= 0:
+        raise ValueError("page_size and max_workers must be positive")
+
+    policy = retry_policy if retry_policy is not None else RetryPolicy(max_retries=max_retries)
+    supabase = get_supabase_client()
+    stats = BulkUpsertStats()
+
+    def upsert(page: List[Dict[str, Any]]) -> int:
+        policy.call(lambda timeout: _send(supabase.table('flashcards').upsert(page), timeout),
+                    retryable=is_transient_error)
+        return len(page)
+
+    def finish(done) -> None:
+        for future, page_rows in done:
+            try:
+                stats.rows += future.result()
+                stats.pages += 1
+            except Exception as e:
+                stats.failed_pages += 1
+                stats.failed_rows += page_rows
+                stats.errors.append(str(e))
+
+    start = time.perf_counter()
+    retries_before = policy.retries
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="upsert") as executor:
+        pending = {}
+        try:
+            for page in _pages(iter_flashcards_file(filepath, stats), page_size):
+                if len(pending) >= 2 * max_workers:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    finish((future, pending.pop(future)) for future in done)
+                pending[executor.submit(upsert, page)] = len(page)
+        finally:
+            done, _ = wait(pending)
+            finish((future, pending[future]) for future in done)
+    stats.retries = policy.retries - retries_before
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """
+    Decide whether a failed Supabase request is worth retrying.
+
+    Args:
+        exc: Error raised by the request
+
+    Returns:
+        True for connection errors, timeouts, 408/429 and 5xx responses
+    """
+    import httpx
+
+    if isinstance(exc, (httpx.TransportError, ConnectionError, TimeoutError)):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return status in (408, 429) or status >= 500
+    return False
+
+
+def _send(query: Any, timeout: float) -> Any:
+    """
+    Send a PostgREST query over the shared connection pool with a timeout.
+
+    The query builders' execute has no per-request timeout, so the built
+    request is sent directly on the client's session.
+
+    Args:
+        query: Request builder, e.g. from table(...).upsert(rows)
+        timeout: Timeout for the request in seconds
+
+    Returns:
+        The HTTP response
+
+    Raises:
+        httpx.HTTPStatusError: If the server answers with an error status
+    """
+    import httpx
+
+    request = query.request
+    response = request.session.request(
+        request.http_method,
+        str(request.path),
+        json=request.json,
+        params=request.params,
+        headers=request.headers,
+        auth=request.auth,
+        timeout=timeout,
+    )
+    if not response.is_success:
+        raise httpx.HTTPStatusError(
+            f"Supabase returned {response.status_code}: {response.text[:200]}",
+            request=response.request,
+            response=response,
+        )
+    return response
+
+
+def _quote(value: str) -> str:
+    """Quote a value for a PostgREST logic tree, where commas and parentheses are reserved."""
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def page_cursor(cards: List[Dict[str, Any]]) -> Optional[Tuple[str, str]]:
+    """
+    Return the cursor for the page after a page of flashcards.
+
+    Args:
+        cards: A page returned by get_flashcards
+
+    Returns:
+        (created_at, id) of the last card, or None for an empty page
+    """
+    if not cards:
+        return None
+    return cards[-1]['created_at'], cards[-1]['id']
+
+
 def get_flashcards(
     limit: int = 100,
     offset: int = 0,
     tags: Optional[List[str]] = None,
-    level: Optional[str] = None
+    level: Optional[str] = None,
+    after: Optional[Tuple[str, str]] = None,
+    match_all_tags: bool = False,
+    columns: Optional[List[str]] = None
 ) -> List[Dict[str, Any]]:
     """
     Retrieve flashcards from the database with optional filtering.
 
+    Cards are ordered by (created_at, id). Filters run on the server, where
+    the tag filter is a JSONB containment query served by the GIN index on
+    tags. Pass the cursor of the previous page as after rather than an
+    offset: the server seeks straight to it, so deep pages cost the same as
+    the first.
+
     Args:
         limit: Maximum number of flashcards to retrieve
-        offset: Number of flashcards to skip
-        tags: List of tags to filter by
+        offset: Number of flashcards to skip (prefer after for deep pages)
+        tags: List of tags to filter by; cards with any of them match
         level: Difficulty level to filter by
+        after: (created_at, id) cursor from page_cursor; only later cards are returned
+        match_all_tags: Only return cards that have every tag in tags
+        columns: Columns to return (defaults to all)
 
     Returns:
         List[Dict[str, Any]]: List of flashcard objects
     """
     supabase = get_supabase_client()
-    query = supabase.table('flashcards').select('*')
+    query = supabase.table('flashcards').select(','.join(columns) if columns else '*')
 
     # Apply filters if provided
     if level:
         query = query.eq('level', level)
 
+    if tags:
+        if match_all_tags:
+            query = query.contains('tags', json.dumps(tags))
+        else:
+            query = query.or_(','.join(f"tags.cs.{_quote(json.dumps([tag]))}" for tag in tags))
+
+    if after is not None:
+        created_at, card_id = _quote(after[0]), _quote(after[1])
+        query = query.or_(f"created_at.gt.{created_at},and(created_at.eq.{created_at},id.gt.{card_id})")
+
+    query = query.order('created_at').order('id')
+
     # Apply pagination
-    query = query.range(offset, offset + limit - 1)
+    if offset:
+        query = query.range(offset, offset + limit - 1)
+    else:
+        query = query.limit(limit)
 
     # Execute query
     result = query.execute()
+    return result.data
 
-    # Post-process for tag filtering if needed
-    # (This is done in Python because JSONB array filtering is complex)
-    data = result.data
-    if tags:
-        data = [
-            card for card in data
-            if any(tag in card.get('tags', []) for tag in tags)
-        ]
 
-    return data
+def iter_flashcards(
+    filters: Optional[Dict[str, Any]] = None,
+    columns: Optional[List[str]] = None,
+    page_size: int = 1000
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream every flashcard matching the filters, page by page.
+
+    Pages are fetched with a (created_at, id) cursor, so each request costs
+    the same however deep into the table it is. While the caller works
+    through one page, the next is fetched on a background thread. The
+    cursor columns are always selected, so rows include created_at and id
+    even if columns leaves them out.
+
+    Args:
+        filters: Filters accepted by get_flashcards: tags, level and match_all_tags
+        columns: Columns to return (defaults to all)
+        page_size: Rows per request
+
+    Yields:
+        Each matching flashcard in (created_at, id) order
+
+    Raises:
+        ValueError: If page_size is not positive or filters has an unknown key
+    """
+    filters = dict(filters or {})
+    unknown = set(filters) - {'tags', 'level', 'match_all_tags'}
+    if unknown:
+        raise ValueError(f"Unknown flashcard filters: {', '.join(sorted(unknown))}")
+    if page_size <= 0:
+        raise ValueError("page_size must be positive")
+    if columns:
+        columns = list(columns) + [column for column in ('created_at', 'id') if column not in columns]
+
+    def fetch(after: Optional[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        return get_flashcards(limit=page_size, after=after, columns=columns, **filters)
+
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="flashcards-prefetch")
+    try:
+        page = fetch(None)
+        while page:
+            # Start on the next page before handing this one to the caller
+            upcoming = executor.submit(fetch, page_cursor(page)) if len(page) == page_size else None
+            yield from page
+            page = upcoming.result() if upcoming is not None else []
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
 
 
 def get_flashcard_by_id(flashcard_id: str) -> Optional[Dict[str, Any]]:
@@ -113,6 +423,49 @@ def get_flashcard_by_id(flashcard_id: str) -> Optional[Dict[str, Any]]:
     return result.data[0]
 
 
+def record_reviews(batch: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Record many review answers in a single request.
+
+    Answers are applied by the record_flashcard_reviews database function
+    (see init_supabase.py), which inserts or increments each
+    (flashcard_id, user_id) stats row atomically, so concurrent answers for
+    the same card are never lost. Use this to sync an offline study session.
+
+    Args:
+        batch: Answers, each with flashcard_id, user_id, is_correct and an
+            optional studied_at (datetime or ISO 8601 string; defaults to now)
+
+    Returns:
+        List[Dict[str, Any]]: Updated stats record for each (flashcard_id, user_id) pair
+
+    Raises:
+        ValueError: If an answer is missing a field or is_correct is not a bool
+    """
+    reviews = []
+    for review in batch:
+        missing = [key for key in ('flashcard_id', 'user_id', 'is_correct') if review.get(key) is None]
+        if missing:
+            raise ValueError(f"Review is missing {', '.join(missing)}: {review}")
+        if not isinstance(review['is_correct'], bool):
+            raise ValueError(f"is_correct must be a bool: {review}")
+
+        studied_at = review.get('studied_at')
+        reviews.append({
+            'flashcard_id': str(review['flashcard_id']),
+            'user_id': str(review['user_id']),
+            'is_correct': review['is_correct'],
+            'studied_at': studied_at.isoformat() if isinstance(studied_at, datetime) else studied_at,
+        })
+
+    if not reviews:
+        return []
+
+    supabase = get_supabase_client()
+    result = supabase.rpc('record_flashcard_reviews', {'reviews': reviews}).execute()
+    return result.data
+
+
 def update_flashcard_stats(
     flashcard_id: str,
     user_id: str,
@@ -121,6 +474,8 @@ def update_flashcard_stats(
     """
     Update user-specific statistics for a flashcard.
 
+    The stats row is created or incremented in one atomic round trip.
+
     Args:
         flashcard_id: UUID of the flashcard
         user_id: UUID of the user
@@ -129,39 +484,6 @@ def update_flashcard_stats(
     Returns:
         Dict[str, Any]: Updated stats record
     """
-    supabase = get_supabase_client()
-
-    # Check if stats record exists
-    result = supabase.table('user_flashcard_stats').select('*').eq(
-        'flashcard_id', flashcard_id
-    ).eq('user_id', user_id).execute()
-
-    now = datetime.utcnow().isoformat()
-
-    if not result.data:
-        # Create new stats record
-        stats = {
-            'id': str(uuid.uuid4()),
-            'flashcard_id': flashcard_id,
-            'user_id': user_id,
-            'last_studied_at': now,
-            'next_review_at': now,  # Simple implementation - would calculate based on SRS in production
-            'correct_count': 1 if is_correct else 0,
-            'incorrect_count': 0 if is_correct else 1,
-            'easiness_factor': 2.5  # Default easiness factor for SM-2 algorithm
-        }
-        result = supabase.table('user_flashcard_stats').insert(stats).execute()
-    else:
-        # Update existing stats record
-        existing = result.data[0]
-        stats = {
-            'last_studied_at': now,
-            'next_review_at': now,  # Simple implementation - would calculate based on SRS in production
-            'correct_count': existing['correct_count'] + (1 if is_correct else 0),
-            'incorrect_count': existing['incorrect_count'] + (0 if is_correct else 1),
-        }
-        result = supabase.table('user_flashcard_stats').update(stats).eq(
-            'id', existing['id']
-        ).execute()
-
-    return result.data[0]
+    return record_reviews([
+        {'flashcard_id': flashcard_id, 'user_id': user_id, 'is_correct': is_correct}
+    ])[0]
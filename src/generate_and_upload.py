@@ -1,14 +1,177 @@
 """
-Script to generate flashcards from a PDF and upload them to Supabase.
+Script to generate flashcards from a PDF (or a folder of documents) and upload them to Supabase.
 """
 import os
 import json
 import argparse
 from pathlib import Path
+from typing import Iterator
 
+from src.batch_jobs import BatchJob, LocalBatchBackend, OpenAIBatchBackend, respond_with
+from src.dedup import CardDeduplicator, ChunkDeduplicator
 from src.document import DocumentUploader
 from src.flashcard_generator import FlashcardGenerator
-from src.cli import upload_flashcards
+from src.llm_backends import FakeLLMBackend, OpenAIBackend
+from src.llm_cache import ResponseCache
+from src.metrics import MetricsRegistry
+from src.model import OpenAIClient
+from src.retry import RetryPolicy
+from src.cli import bulk_upload_flashcards, upload_flashcards
+from src.flashcards_db import iter_flashcards
+
+
+def build_generator(args: argparse.Namespace) -> FlashcardGenerator:
+    """
+    Create a flashcard generator from the command-line options.
+
+    Args:
+        args: Parsed command-line arguments
+
+    Returns:
+        Configured FlashcardGenerator
+    """
+    cache = None if args.no_llm_cache else ResponseCache(args.llm_cache, ttl_seconds=args.llm_cache_ttl * 86400)
+    metrics = MetricsRegistry()
+    card_deduplicator = CardDeduplicator(threshold=args.card_dedup_threshold) if args.card_dedup else None
+    if card_deduplicator and args.seed_existing_cards:
+        card_deduplicator.seed(load_existing_cards())
+        print(f"Indexed {card_deduplicator.stats.cards_seeded} existing cards for deduplication")
+    if args.llm_backend == "fake":
+        backend = FakeLLMBackend(latency=args.fake_latency, latency_sigma=args.fake_latency_sigma,
+                                 error_rate=args.fake_error_rate)
+    else:
+        backend = OpenAIBackend()
+    generator = FlashcardGenerator(
+        max_concurrency=args.concurrency,
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm,
+        context_token_budget=args.context_tokens,
+        openai_client=OpenAIClient(
+            cache=cache,
+            bypass_cache=args.refresh_llm_cache,
+            structured_output=args.structured_output,
+            retry_policy=RetryPolicy(
+                max_retries=args.max_retries,
+                timeout=args.request_timeout,
+                deadline=args.deadline
+            ),
+            hedge=args.hedge,
+            metrics=metrics,
+            backend=backend,
+            max_concurrency=args.concurrency
+        ),
+        parse_retries=args.parse_retries,
+        card_deduplicator=card_deduplicator,
+        metrics=metrics
+    )
+    generator.level = args.level
+    return generator
+
+
+def load_existing_cards(page_size: int = 1000) -> Iterator[dict]:
+    """
+    Stream the question and answer of every stored flashcard, one page at a time.
+
+    Args:
+        page_size: Number of cards fetched per request
+
+    Returns:
+        Iterator over card dicts with "question" and "answer" fields
+    """
+    return iter_flashcards(columns=["question", "answer"], page_size=page_size)
+
+
+def generate_from_directory(
+    directory: Path,
+    generator: FlashcardGenerator,
+    workers: int = None,
+    deduplicator: ChunkDeduplicator = None
+) -> list:
+    """
+    Ingest every document in a directory and generate flashcards for each.
+
+    Args:
+        directory: Directory containing the documents
+        generator: Flashcard generator to use
+        workers: Number of worker processes for ingestion
+        deduplicator: Optional deduplicator shared across all documents
+
+    Returns:
+        List of generated flashcards across all documents
+    """
+    print(f"Processing documents in: {directory}")
+    uploader = DocumentUploader()
+    flashcards = []
+
+    for result in uploader.upload_from_directory(str(directory), workers=workers):
+        if not result.ok:
+            print(f"Error processing {result.file_path}: {result.error}")
+            continue
+
+        document = result.document
+        print(f"Processed {document.file_name} with {len(document.chunks)} chunks")
+        chunks = deduplicator.filter(document.chunks) if deduplicator else document.chunks
+        cards = generator.generate(chunks)
+        coverage = generator.last_coverage
+        print(f"Generated {len(cards)} flashcards from {document.file_name} "
+              f"({coverage.calls} calls, {coverage.coverage:.0%} of tokens covered)")
+        flashcards.extend(cards)
+
+    stats = uploader.last_batch_stats
+    print(f"Ingested {stats.files - stats.failed}/{stats.files} files "
+          f"({stats.files_per_second:.1f} files/s, {stats.mb_per_second:.2f} MB/s)")
+    print(f"Generated {len(flashcards)} flashcards")
+    return flashcards
+
+
+def generate_with_batch_job(
+    path: Path,
+    generator: FlashcardGenerator,
+    job_dir: str,
+    backend_name: str = "openai",
+    poll_interval: float = 30.0,
+    deduplicator: ChunkDeduplicator = None
+) -> list:
+    """
+    Generate flashcards for a document or directory through a resumable batch job.
+
+    Args:
+        path: Document, or directory of documents
+        generator: Flashcard generator whose prompts and parsing the job uses
+        job_dir: Directory holding the job's state; rerun with the same one to resume
+        backend_name: "openai" for the Batch API, "local" to answer through the generator's LLM backend
+        poll_interval: Seconds between status polls
+        deduplicator: Optional deduplicator shared across all documents
+
+    Returns:
+        List of generated flashcards across all documents
+    """
+    uploader = DocumentUploader()
+    if path.is_dir():
+        # Uploads finish in any order; sort so the job's requests and dedup are deterministic
+        results = sorted((r for r in uploader.upload_from_directory(str(path)) if r.ok),
+                         key=lambda r: r.file_path)
+        documents = {r.file_path: r.document.chunks for r in results}
+    else:
+        documents = {str(path): uploader.upload_from_file(str(path)).chunks}
+    if deduplicator:
+        documents = {name: deduplicator.filter(chunks) for name, chunks in documents.items()}
+
+    if backend_name == "local":
+        backend = LocalBatchBackend(os.path.join(job_dir, "local_backend"),
+                                    respond=respond_with(generator.openai.backend))
+    else:
+        backend = OpenAIBatchBackend(generator.openai.client)
+
+    job = BatchJob(generator, backend, job_dir, poll_interval=poll_interval)
+    requests = job.prepare(documents)
+    print(f"Batch job in {job_dir}: {requests} requests for {len(documents)} documents")
+    print(f"Batch job {job.submit()} finished with status: {job.wait()}")
+
+    results = job.collect()
+    for document, chunks, error in results.failed:
+        print(f"Batch request for {document} chunks {chunks[0]}-{chunks[-1]} failed: {error}")
+    return [card for cards in results.cards.values() for card in cards]
 
 
 def main():
@@ -16,13 +179,77 @@ def main():
     Main function to process a PDF, generate flashcards, and upload them to Supabase.
     """
     parser = argparse.ArgumentParser(description="Generate flashcards from PDF and upload to Supabase")
-    parser.add_argument("pdf_path", help="Path to the PDF file")
+    parser.add_argument("pdf_path", help="Path to the PDF file, or a directory of documents")
     parser.add_argument("--output", "-o", default="flashcards_output.json",
                         help="Output JSON file path (default: flashcards_output.json)")
     parser.add_argument("--level", "-l", default="intermediate",
                         choices=["beginner", "intermediate", "advanced"],
                         help="Difficulty level for flashcards")
+    parser.add_argument("--workers", "-w", type=int, default=None,
+                        help="Worker processes for directory ingestion (default: all CPUs)")
+    parser.add_argument("--dedup-threshold", type=float, default=0.85,
+                        help="Similarity above which near-duplicate chunks are skipped (default: 0.85)")
+    parser.add_argument("--no-dedup", action="store_true",
+                        help="Send every chunk to the model, including near-duplicates")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Maximum number of OpenAI requests in flight (default: 1)")
+    parser.add_argument("--rpm", type=float, default=None,
+                        help="OpenAI requests-per-minute limit (default: unlimited)")
+    parser.add_argument("--tpm", type=float, default=None,
+                        help="OpenAI tokens-per-minute limit (default: unlimited)")
+    parser.add_argument("--context-tokens", type=int, default=4000,
+                        help="Maximum tokens of document text per prompt (default: 4000)")
+    parser.add_argument("--llm-cache", default=".cache/llm_responses.sqlite3",
+                        help="SQLite file caching model responses (default: .cache/llm_responses.sqlite3)")
+    parser.add_argument("--llm-cache-ttl", type=float, default=30,
+                        help="Days before cached model responses expire (default: 30)")
+    parser.add_argument("--no-llm-cache", action="store_true",
+                        help="Do not read or write the model response cache")
+    parser.add_argument("--refresh-llm-cache", action="store_true",
+                        help="Ignore cached model responses but store the fresh ones")
+    parser.add_argument("--structured-output", action="store_true",
+                        help="Constrain model responses to the flashcard JSON schema")
+    parser.add_argument("--parse-retries", type=int, default=1,
+                        help="Times to re-request a batch whose response has no usable cards (default: 1)")
+    parser.add_argument("--max-retries", type=int, default=3,
+                        help="Retries for transient OpenAI errors (default: 3)")
+    parser.add_argument("--request-timeout", type=float, default=60.0,
+                        help="Timeout for a single OpenAI request in seconds (default: 60)")
+    parser.add_argument("--deadline", type=float, default=None,
+                        help="Total seconds allowed per OpenAI call including retries (default: none)")
+    parser.add_argument("--hedge", action="store_true",
+                        help="Send a duplicate request when a call runs past the p95 latency")
+    parser.add_argument("--card-dedup", action="store_true",
+                        help="Drop generated cards that repeat an earlier card's question and answer")
+    parser.add_argument("--card-dedup-threshold", type=float, default=0.75,
+                        help="Question similarity at or above which cards are duplicates (default: 0.75)")
+    parser.add_argument("--seed-existing-cards", action="store_true",
+                        help="With --card-dedup, also drop cards repeating cards already stored in Supabase")
+    parser.add_argument("--metrics-out", default=None, metavar="PATH",
+                        help="Write LLM call metrics to PATH at the end of the run")
+    parser.add_argument("--metrics-format", default="json", choices=["json", "prometheus"],
+                        help="Format of --metrics-out (default: json)")
+    parser.add_argument("--batch-job", default=None, metavar="DIR",
+                        help="Generate offline through a batch job kept in DIR (rerun to resume)")
+    parser.add_argument("--batch-backend", default="openai", choices=["openai", "local"],
+                        help="Batch API, or the LLM backend as a local stand-in (default: openai)")
+    parser.add_argument("--poll-interval", type=float, default=30.0,
+                        help="Seconds between batch status polls (default: 30)")
+    parser.add_argument("--upload-page-size", type=int, default=None,
+                        help="Upload in pages of this many rows over concurrent requests (default: one request)")
+    parser.add_argument("--upload-workers", type=int, default=4,
+                        help="Concurrent upsert requests for paged uploads (default: 4)")
+    parser.add_argument("--llm-backend", default="openai", choices=["openai", "fake"],
+                        help="Send requests to the OpenAI API, or answer with in-process fake cards for load tests")
+    parser.add_argument("--fake-latency", type=float, default=0.5,
+                        help="Median response latency in seconds of the fake backend (default: 0.5)")
+    parser.add_argument("--fake-latency-sigma", type=float, default=0.5,
+                        help="Lognormal spread of the fake backend's latency; 0 for fixed (default: 0.5)")
+    parser.add_argument("--fake-error-rate", type=float, default=0.0,
+                        help="Fraction of fake backend calls that fail with a 429 (default: 0)")
     args = parser.parse_args()
+    if args.batch_job and args.batch_backend == "openai" and args.llm_backend == "fake":
+        parser.error("--llm-backend fake has no OpenAI client for batch jobs; use --batch-backend local")
 
     # Check if the PDF file exists
     pdf_path = Path(args.pdf_path)
@@ -30,22 +257,68 @@ def main():
         print(f"Error: PDF file not found: {pdf_path}")
         return 1
 
-    # Process the PDF
-    print(f"Processing PDF: {pdf_path}")
+    deduplicator = None if args.no_dedup else ChunkDeduplicator(threshold=args.dedup_threshold)
+
+    generator = build_generator(args)
     try:
-        uploader = DocumentUploader()
-        document = uploader.upload_from_file(str(pdf_path))
-        print(f"Successfully processed PDF with {len(document.chunks)} chunks")
-    except Exception as e:
-        print(f"Error processing PDF: {str(e)}")
-        return 1
+        if args.batch_job:
+            flashcards = generate_with_batch_job(pdf_path, generator, args.batch_job, args.batch_backend,
+                                                 args.poll_interval, deduplicator)
+            print(f"Generated {len(flashcards)} flashcards")
+        elif pdf_path.is_dir():
+            flashcards = generate_from_directory(pdf_path, generator, args.workers, deduplicator)
+        else:
+            # Process the PDF
+            print(f"Processing PDF: {pdf_path}")
+            try:
+                uploader = DocumentUploader()
+                document = uploader.upload_from_file(str(pdf_path))
+                print(f"Successfully processed PDF with {len(document.chunks)} chunks")
+            except Exception as e:
+                print(f"Error processing PDF: {str(e)}")
+                return 1
 
-    # Generate flashcards
-    print("Generating flashcards...")
-    generator = FlashcardGenerator()
-    generator.level = args.level
-    flashcards = generator.generate(document.chunks)
-    print(f"Generated {len(flashcards)} flashcards")
+            # Generate flashcards
+            print("Generating flashcards...")
+            chunks = deduplicator.filter(document.chunks) if deduplicator else document.chunks
+            flashcards = generator.generate(chunks)
+            coverage = generator.last_coverage
+            print(f"Generated {len(flashcards)} flashcards "
+                  f"({coverage.calls} calls, {coverage.chunks_covered}/{coverage.chunks_total} chunks, "
+                  f"{coverage.coverage:.0%} of tokens covered)")
+    finally:
+        generator.openai.close()
+
+    parse_stats = generator.parse_stats
+    print(f"Parsed {parse_stats.responses} responses: {parse_stats.parse_failures} failed "
+          f"({parse_stats.failure_rate:.0%}), {parse_stats.retries} retried, "
+          f"{parse_stats.cards_repaired} cards repaired, {parse_stats.cards_rejected} rejected")
+
+    if generator.metrics is not None:
+        summary = generator.metrics.summary()
+        calls = sum(entry["value"] for entry in summary.get("llm_requests_total", []))
+        tokens = sum(entry["value"] for name in ("llm_prompt_tokens_total", "llm_completion_tokens_total")
+                     for entry in summary.get(name, []))
+        cost = sum(entry["value"] for entry in summary.get("llm_cost_usd_total", []))
+        print(f"LLM calls: {calls:.0f}, {tokens:.0f} tokens, ~${cost:.2f} estimated cost")
+        if args.metrics_out:
+            generator.metrics.write(args.metrics_out, args.metrics_format)
+            print(f"Saved LLM metrics to {args.metrics_out}")
+
+    cache = generator.openai.cache
+    if cache is not None:
+        cache_stats = cache.stats()
+        print(f"LLM response cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+              f"({cache_stats['hit_rate']:.0%} hit rate)")
+
+    if generator.card_deduplicator:
+        card_stats = generator.card_deduplicator.stats
+        print(f"Dropped {card_stats.cards_dropped}/{card_stats.cards_seen} cards repeating an earlier question")
+
+    if deduplicator:
+        stats = deduplicator.stats
+        print(f"Skipped {stats.chunks_dropped}/{stats.chunks_seen} near-duplicate chunks "
+              f"(~{stats.tokens_saved} of {stats.tokens_seen} tokens saved)")
 
     # Save flashcards to JSON
     output_path = args.output
@@ -60,7 +333,10 @@ def main():
     # Upload flashcards to Supabase
     print("Uploading flashcards to Supabase...")
     try:
-        upload_flashcards(output_path)
+        if args.upload_page_size:
+            bulk_upload_flashcards(output_path, args.upload_page_size, args.upload_workers)
+        else:
+            upload_flashcards(output_path)
     except Exception as e:
         print(f"Error uploading flashcards to Supabase: {str(e)}")
         return 1
@@ -29,6 +29,9 @@ CREATE INDEX IF NOT EXISTS idx_flashcards_tags ON flashcards USING GIN (tags);
 
 -- Create index on level for faster filtering
 CREATE INDEX IF NOT EXISTS idx_flashcards_level ON flashcards (level);
+
+-- Create index on (created_at, id) for keyset pagination
+CREATE INDEX IF NOT EXISTS idx_flashcards_created_at_id ON flashcards (created_at, id);
 """
 
 CREATE_USER_FLASHCARD_STATS_TABLE = """
@@ -53,6 +56,42 @@ CREATE INDEX IF NOT EXISTS idx_next_review ON user_flashcard_stats (next_review_
 CREATE INDEX IF NOT EXISTS idx_user_stats ON user_flashcard_stats (user_id);
 """
 
+# Records many review answers in one statement. Answers for the same
+# (flashcard_id, user_id) pair are summed first, because ON CONFLICT can
+# update a row only once per statement; the upsert then increments the
+# counts atomically, so concurrent answers are neither lost nor duplicated.
+CREATE_RECORD_REVIEWS_FUNCTION = """
+CREATE OR REPLACE FUNCTION record_flashcard_reviews(reviews JSONB)
+RETURNS SETOF user_flashcard_stats
+LANGUAGE sql
+AS $$
+    INSERT INTO user_flashcard_stats AS stats (
+        id, flashcard_id, user_id, last_studied_at, next_review_at,
+        correct_count, incorrect_count, easiness_factor
+    )
+    SELECT gen_random_uuid(), flashcard_id, user_id, studied_at, studied_at, correct, incorrect, 2.5
+    FROM (
+        SELECT
+            (review->>'flashcard_id')::UUID AS flashcard_id,
+            (review->>'user_id')::UUID AS user_id,
+            MAX(COALESCE((review->>'studied_at')::TIMESTAMPTZ, NOW())) AS studied_at,
+            COUNT(*) FILTER (WHERE (review->>'is_correct')::BOOLEAN) AS correct,
+            COUNT(*) FILTER (WHERE NOT (review->>'is_correct')::BOOLEAN) AS incorrect
+        FROM jsonb_array_elements(reviews) AS review
+        GROUP BY 1, 2
+        -- Lock rows in key order so concurrent batches can't deadlock
+        ORDER BY 1, 2
+    ) AS answers
+    ON CONFLICT (flashcard_id, user_id) DO UPDATE SET
+        correct_count = stats.correct_count + EXCLUDED.correct_count,
+        incorrect_count = stats.incorrect_count + EXCLUDED.incorrect_count,
+        -- Simple implementation - would calculate based on SRS in production
+        last_studied_at = GREATEST(stats.last_studied_at, EXCLUDED.last_studied_at),
+        next_review_at = GREATEST(stats.next_review_at, EXCLUDED.next_review_at)
+    RETURNING stats.*;
+$$;
+"""
+
 def initialize_tables() -> List[str]:
     """
     Initialize the Supabase tables for the StudyWise AI application.
@@ -72,6 +111,8 @@ def initialize_tables() -> List[str]:
     messages.append(CREATE_FLASHCARDS_TABLE)
     messages.append("\n--- USER FLASHCARD STATS TABLE ---\n")
     messages.append(CREATE_USER_FLASHCARD_STATS_TABLE)
+    messages.append("\n--- REVIEW RECORDING FUNCTION ---\n")
+    messages.append(CREATE_RECORD_REVIEWS_FUNCTION)
 
     return messages
 
@@ -0,0 +1,129 @@
+"""
+Incremental JSON array parsing for StudyWise AI.
+This module extracts the objects of a JSON array from text that arrives in
+pieces, such as a streamed chat completion, yielding each object as soon as
+its closing brace has been received.
+"""
+import json
+import re
+from typing import Any, Iterable, Iterator, List
+
+# Characters that change the parser's state outside and inside strings
+_STRUCTURAL_RE = re.compile(r'[\[\]{}"]')
+_STRING_RE = re.compile(r'["\\]')
+
+
+class JSONArrayStream:
+    """
+    Incremental parser for the objects of the first JSON array in a text.
+
+    Anything before the opening bracket, such as prose or a markdown fence,
+    is ignored, as is anything after the closing bracket. Elements that are
+    not objects are skipped, and an object that fails to decode is dropped
+    without affecting its neighbours. Each character is scanned once, so
+    feeding a response piece by piece costs linear time overall.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._object_start = -1
+        self._started = False
+        self.done = False
+        self.errors = 0
+
+    def feed(self, text: str) -> List[Any]:
+        """
+        Add text to the stream.
+
+        Args:
+            text: The next piece of the response
+
+        Returns:
+            Objects completed by this piece, in order
+        """
+        if self.done or not text:
+            return []
+
+        self._buffer += text
+        completed = []
+        buffer = self._buffer
+        pos = self._pos
+
+        while not self.done:
+            if self._in_string:
+                match = _STRING_RE.search(buffer, pos)
+                if match is None:
+                    pos = len(buffer)
+                    break
+                if match.group() == "\\":
+                    if match.end() >= len(buffer):
+                        # Wait for the escaped character before moving on
+                        pos = match.start()
+                        break
+                    pos = match.end() + 1
+                    continue
+                self._in_string = False
+                pos = match.end()
+                continue
+
+            if not self._started:
+                start = buffer.find("[", pos)
+                if start < 0:
+                    pos = len(buffer)
+                    break
+                self._started = True
+                self._stack.append("[")
+                pos = start + 1
+                continue
+
+            match = _STRUCTURAL_RE.search(buffer, pos)
+            if match is None:
+                pos = len(buffer)
+                break
+            char = match.group()
+            pos = match.end()
+
+            if char == '"':
+                self._in_string = True
+            elif char in "[{":
+                self._stack.append(char)
+                if char == "{" and len(self._stack) == 2:
+                    self._object_start = match.start()
+            else:
+                self._stack.pop()
+                if char == "}" and len(self._stack) == 1 and self._object_start >= 0:
+                    try:
+                        completed.append(json.loads(buffer[self._object_start:pos]))
+                    except json.JSONDecodeError:
+                        self.errors += 1
+                    self._object_start = -1
+                elif not self._stack:
+                    self.done = True
+
+        # Keep only the text the parser may still need
+        keep_from = self._object_start if self._object_start >= 0 else pos
+        self._buffer = buffer[keep_from:]
+        self._pos = pos - keep_from
+        if self._object_start >= 0:
+            self._object_start = 0
+        return completed
+
+
+def iter_array_objects(pieces: Iterable[str]) -> Iterator[Any]:
+    """
+    Yield the objects of the first JSON array spread across pieces of text.
+
+    Args:
+        pieces: Text fragments in arrival order
+
+    Yields:
+        Each array object as soon as it is complete
+    """
+    parser = JSONArrayStream()
+    for piece in pieces:
+        yield from parser.feed(piece)
+        if parser.done:
+            break
@@ -0,0 +1,308 @@
+"""
+LLM backends for StudyWise AI.
+OpenAIClient sends chat completion requests through a backend: OpenAIBackend
+wraps the OpenAI SDK, and FakeLLMBackend answers in-process with valid
+flashcard JSON after a configurable latency, error rate and response size,
+so the ingest, generate and upload pipeline can be load-tested offline.
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional, Protocol
+
+from src.config import settings
+from src.tokens import count_tokens
+
+
+@dataclass
+class Usage:
+    """Token usage of one completion."""
+    prompt_tokens: int
+    completion_tokens: int
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+@dataclass
+class Completion:
+    """Text and token usage of a finished completion."""
+    content: Optional[str]
+    usage: Optional[Usage] = None
+
+
+@dataclass
+class StreamEvent:
+    """One event of a streamed completion: a piece of text, the usage, or both."""
+    content: Optional[str] = None
+    usage: Optional[Usage] = None
+
+
+def _usage(usage: Any) -> Optional[Usage]:
+    """Convert an SDK usage object, ignoring missing or malformed counts."""
+    prompt_tokens = getattr(usage, "prompt_tokens", None)
+    completion_tokens = getattr(usage, "completion_tokens", None)
+    if not isinstance(prompt_tokens, int) or not isinstance(completion_tokens, int):
+        return None
+    return Usage(prompt_tokens, completion_tokens)
+
+
+class LLMBackend(Protocol):
+    """What OpenAIClient needs from a backend; OpenAIBackend and FakeLLMBackend implement it."""
+
+    def complete(self, timeout: Optional[float] = None, **request: Any) -> Completion:
+        ...
+
+    def stream(self, timeout: Optional[float] = None, **request: Any) -> Iterator[StreamEvent]:
+        ...
+
+    def is_transient(self, exc: BaseException) -> bool:
+        ...
+
+
+class OpenAIBackend:
+    """Sends chat completions to the OpenAI API (or a compatible server)."""
+
+    def __init__(self, client: Any = None):
+        """
+        Initialize the backend.
+
+        Args:
+            client: OpenAI SDK client (defaults to one built from settings)
+        """
+        if client is None:
+            # Imported here so modules that only reference the backend start quickly
+            from openai import OpenAI
+
+            # Retries are left to OpenAIClient's retry policy
+            client = OpenAI(api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL, max_retries=0)
+        self.client = client
+
+    def complete(self, timeout: Optional[float] = None, **request: Any) -> Completion:
+        """
+        Run a chat completion.
+
+        Args:
+            timeout: Request timeout in seconds
+            **request: Chat completion parameters (model, messages, ...)
+
+        Returns:
+            The completion
+        """
+        response = self.client.chat.completions.create(timeout=timeout, **request)
+        return Completion(response.choices[0].message.content, _usage(getattr(response, "usage", None)))
+
+    def stream(self, timeout: Optional[float] = None, **request: Any) -> Iterator[StreamEvent]:
+        """
+        Open a streamed chat completion.
+
+        The request is sent before this returns, so errors opening the
+        stream are raised here rather than on first iteration.
+
+        Args:
+            timeout: Request timeout in seconds
+            **request: Chat completion parameters (model, messages, ...)
+
+        Returns:
+            Iterator of stream events; the last one carries the usage
+        """
+        events = self.client.chat.completions.create(
+            timeout=timeout, stream=True, stream_options={"include_usage": True}, **request
+        )
+        return (
+            StreamEvent(
+                content=event.choices[0].delta.content if event.choices else None,
+                usage=_usage(getattr(event, "usage", None)),
+            )
+            for event in events
+        )
+
+    def is_transient(self, exc: BaseException) -> bool:
+        """
+        Decide whether an error is worth retrying.
+
+        Uses the same conditions as the OpenAI SDK's own retry logic.
+
+        Args:
+            exc: Error raised by complete or stream
+
+        Returns:
+            True for connection errors, timeouts, 408/409/429 and 5xx responses
+        """
+        import openai
+
+        if isinstance(exc, openai.APIConnectionError):
+            return True
+        if isinstance(exc, openai.APIStatusError):
+            return exc.status_code in (408, 409, 429) or exc.status_code >= 500
+        return False
+
+
+class FakeLLMError(Exception):
+    """Error injected by FakeLLMBackend, shaped like an HTTP error response."""
+
+    def __init__(self, status_code: int, retry_after: Optional[float] = None):
+        super().__init__(f"Fake LLM error {status_code}")
+        self.status_code = status_code
+        headers = {"retry-after": str(retry_after)} if retry_after is not None else {}
+        self.response = type("FakeResponse", (), {"headers": headers, "status_code": status_code})()
+
+
+class FakeLLMTimeout(TimeoutError):
+    """Raised by FakeLLMBackend when a sampled latency exceeds the request timeout."""
+
+
+class FakeLLMBackend:
+    """
+    In-process stand-in for a chat completion API.
+
+    Responses are valid flashcard JSON derived from a hash of the prompt, so
+    the same prompt always gets the same cards. Latency is drawn from a
+    lognormal distribution with the given median and spread (fixed when
+    latency_sigma is 0), a fraction of calls fail with error_status, and
+    token usage is counted from the prompt and the generated JSON.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        latency_sigma: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 429,
+        retry_after: Optional[float] = None,
+        cards_per_response: int = 5,
+        answer_words: int = 30,
+        stream_piece_chars: int = 32,
+        seed: int = 0
+    ):
+        """
+        Initialize the fake backend.
+
+        Args:
+            latency: Median response latency in seconds
+            latency_sigma: Lognormal shape parameter; larger values give a longer tail
+            error_rate: Fraction of calls that raise FakeLLMError
+            error_status: HTTP status of injected errors
+            retry_after: Retry-After hint sent with injected errors
+            cards_per_response: Number of cards in each response
+            answer_words: Words per answer, controlling completion tokens
+            stream_piece_chars: Characters per streamed event
+            seed: Seed for latency and error draws
+        """
+        self.latency = latency
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.cards_per_response = cards_per_response
+        self.answer_words = answer_words
+        self.stream_piece_chars = stream_piece_chars
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+
+    def _draw(self) -> tuple:
+        """Draw (latency, fails) for one call."""
+        with self._lock:
+            self.calls += 1
+            fails = self._random.random() < self.error_rate
+            if fails:
+                self.errors += 1
+            if self.latency <= 0:
+                return 0.0, fails
+            if self.latency_sigma <= 0:
+                return self.latency, fails
+            return self._random.lognormvariate(0.0, self.latency_sigma) * self.latency, fails
+
+    def _wait(self, timeout: Optional[float]) -> None:
+        """Sleep for a sampled latency, then raise any injected failure."""
+        latency, fails = self._draw()
+        if timeout is not None and latency > timeout:
+            time.sleep(timeout)
+            raise FakeLLMTimeout(f"Fake LLM call exceeded {timeout}s")
+        time.sleep(latency)
+        if fails:
+            raise FakeLLMError(self.error_status, self.retry_after)
+
+    def _content(self, request: Dict[str, Any]) -> str:
+        """Build the response text for a request."""
+        prompt = request["messages"][-1]["content"]
+        topic = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+        filler = " ".join(f"detail{i}" for i in range(self.answer_words))
+        cards = [
+            {
+                "question": f"What is concept {i} of section {topic}?",
+                "answer": f"Concept {i} of section {topic}: {filler}",
+                "tags": ["fake", topic],
+            }
+            for i in range(self.cards_per_response)
+        ]
+        return json.dumps({"cards": cards} if "response_format" in request else cards)
+
+    def _usage(self, request: Dict[str, Any], content: str) -> Usage:
+        """Count tokens for a request and its response."""
+        model = request.get("model")
+        prompt_tokens = sum(count_tokens(m["content"], model) for m in request["messages"])
+        return Usage(prompt_tokens, count_tokens(content, model))
+
+    def complete(self, timeout: Optional[float] = None, **request: Any) -> Completion:
+        """
+        Answer a chat completion after the sampled latency.
+
+        Args:
+            timeout: Request timeout in seconds
+            **request: Chat completion parameters (model, messages, ...)
+
+        Returns:
+            The completion
+
+        Raises:
+            FakeLLMError: For injected errors
+            FakeLLMTimeout: If the sampled latency exceeds the timeout
+        """
+        self._wait(timeout)
+        content = self._content(request)
+        return Completion(content, self._usage(request, content))
+
+    def stream(self, timeout: Optional[float] = None, **request: Any) -> Iterator[StreamEvent]:
+        """
+        Answer a streamed chat completion; the sampled latency is the time to first event.
+
+        Args:
+            timeout: Request timeout in seconds
+            **request: Chat completion parameters (model, messages, ...)
+
+        Returns:
+            Iterator of stream events; the last one carries the usage
+
+        Raises:
+            FakeLLMError: For injected errors
+            FakeLLMTimeout: If the sampled latency exceeds the timeout
+        """
+        self._wait(timeout)
+        content = self._content(request)
+        size = self.stream_piece_chars
+        events = [StreamEvent(content=content[i:i + size]) for i in range(0, len(content), size)]
+        events.append(StreamEvent(usage=self._usage(request, content)))
+        return iter(events)
+
+    def is_transient(self, exc: BaseException) -> bool:
+        """
+        Decide whether an error is worth retrying.
+
+        Args:
+            exc: Error raised by complete or stream
+
+        Returns:
+            True for timeouts and injected 408/409/429/5xx errors
+        """
+        if isinstance(exc, FakeLLMTimeout):
+            return True
+        if isinstance(exc, FakeLLMError):
+            return exc.status_code in (408, 409, 429) or exc.status_code >= 500
+        return False
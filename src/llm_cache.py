@@ -0,0 +1,170 @@
+"""
+Persistent cache of LLM responses for StudyWise AI.
+Responses are stored in SQLite keyed by a hash of the model, messages and
+temperature, with a TTL and least-recently-used eviction once the cache
+holds more than max_entries responses.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+class ResponseCache:
+    """SQLite-backed cache of chat completion responses."""
+
+    def __init__(
+        self,
+        path: str = ".cache/llm_responses.sqlite3",
+        ttl_seconds: Optional[float] = 30 * 24 * 3600,
+        max_entries: int = 50000
+    ):
+        """
+        Initialize the response cache.
+
+        Args:
+            path: SQLite database file (":memory:" for a process-local cache)
+            ttl_seconds: Age after which cached responses expire (None never expires)
+            max_entries: Maximum number of cached responses
+        """
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def key(model: str, messages: List[Dict[str, Any]], temperature: float, **params: Any) -> str:
+        """
+        Build the cache key for a chat completion request.
+
+        Args:
+            model: Model name
+            messages: Chat messages sent to the model
+            temperature: Sampling temperature
+            **params: Any other request parameters that affect the response
+
+        Returns:
+            Hex digest identifying the request
+        """
+        payload = json.dumps(
+            {"model": model, "messages": messages, "temperature": temperature, "params": params},
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Cache key from ResponseCache.key
+
+        Returns:
+            The cached response text, or None if missing or expired
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or (self.ttl_seconds is not None and now - row[1] > self.ttl_seconds):
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, response: str) -> None:
+        """
+        Store a response and evict the least recently used entries if over the limit.
+
+        Args:
+            key: Cache key from ResponseCache.key
+            response: Response text to cache
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, response, now, now),
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if count > self.max_entries:
+                excess = count - self.max_entries
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)",
+                    (excess,),
+                )
+                self.evictions += excess
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        """
+        Remove a cached response, e.g. one that turned out to be unusable.
+
+        Args:
+            key: Cache key from ResponseCache.key
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Remove every cached response."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return cache counters.
+
+        Returns:
+            Dict with hits, misses, evictions, hit_rate and entries
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": entries,
+            }
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
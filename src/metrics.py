@@ -0,0 +1,300 @@
+"""
+Metrics for LLM calls in StudyWise AI.
+This module provides a small thread-safe registry of labeled counters and
+latency histograms, with export to the Prometheus text format or a JSON
+summary.
+"""
+import json
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Latency bucket upper bounds in seconds
+DEFAULT_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+# USD per million (prompt, completion) tokens; override via MetricsRegistry(prices=...)
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4": (30.0, 60.0),
+    "gpt-4-turbo": (10.0, 30.0),
+    "gpt-4o": (2.5, 10.0),
+    "gpt-4o-mini": (0.15, 0.6),
+}
+
+METRIC_HELP = {
+    "llm_requests_total": ("counter", "LLM calls by outcome (ok, error or cache_hit)"),
+    "llm_request_duration_seconds": ("histogram", "LLM call latency including retries"),
+    "llm_prompt_tokens_total": ("counter", "Prompt tokens reported by the API"),
+    "llm_completion_tokens_total": ("counter", "Completion tokens reported by the API"),
+    "llm_cost_usd_total": ("counter", "Estimated spend from token usage and MODEL_PRICES"),
+    "llm_retries_total": ("counter", "Retried LLM attempts by error type"),
+    "llm_parse_failures_total": ("counter", "Responses from which no usable cards could be parsed"),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram."""
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        """
+        Initialize the histogram.
+
+        Args:
+            buckets: Increasing bucket upper bounds
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        Record one observation.
+
+        Args:
+            value: Observed value
+        """
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile as the upper bound of the bucket containing it.
+
+        Args:
+            q: Quantile between 0 and 1
+
+        Returns:
+            Estimated value (inf if it lies past the last bucket), or None when empty
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    """Turn keyword labels into a hashable, ordered key."""
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the Prometheus text format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels, extra: Labels = ()) -> str:
+    """Render labels in the Prometheus text format."""
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value in the Prometheus text format."""
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _json_number(value: Optional[float]) -> Any:
+    """Return value, with inf rendered as the string "+Inf"."""
+    return "+Inf" if value == float("inf") else value
+
+
+class MetricsRegistry:
+    """Thread-safe registry of labeled counters and histograms."""
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS, prices: Optional[Dict[str, Tuple[float, float]]] = None):
+        """
+        Initialize the registry.
+
+        Args:
+            buckets: Bucket upper bounds for new histograms
+            prices: USD per million (prompt, completion) tokens by model (defaults to MODEL_PRICES)
+        """
+        self.buckets = tuple(buckets)
+        self.prices = MODEL_PRICES if prices is None else prices
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, amount: float = 1.0, **labels: Any) -> None:
+        """
+        Increase a counter.
+
+        Args:
+            name: Metric name
+            amount: Amount to add
+            **labels: Label values
+        """
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + amount
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """
+        Record an observation in a histogram.
+
+        Args:
+            name: Metric name
+            value: Observed value
+            **labels: Label values
+        """
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram(self.buckets)
+            series[key].observe(value)
+
+    def counter(self, name: str, **labels: Any) -> float:
+        """
+        Return a counter's value.
+
+        Args:
+            name: Metric name
+            **labels: Label values
+
+        Returns:
+            Current value (0 if never increased)
+        """
+        with self._lock:
+            return self._counters.get(name, {}).get(_labels(labels), 0.0)
+
+    def histogram(self, name: str, **labels: Any) -> Optional[Histogram]:
+        """
+        Return a histogram.
+
+        Args:
+            name: Metric name
+            **labels: Label values
+
+        Returns:
+            The histogram, or None if nothing was observed
+        """
+        with self._lock:
+            return self._histograms.get(name, {}).get(_labels(labels))
+
+    def record_llm_call(
+        self,
+        model: str,
+        level: str,
+        seconds: float,
+        prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None,
+        outcome: str = "ok"
+    ) -> None:
+        """
+        Record one LLM call: outcome, latency, token usage and estimated cost.
+
+        Args:
+            model: Model name
+            level: Flashcard difficulty level
+            seconds: Call duration
+            prompt_tokens: Prompt tokens from the response's usage, if known
+            completion_tokens: Completion tokens from the response's usage, if known
+            outcome: "ok", "error" or "cache_hit"
+        """
+        labels = {"model": model, "level": level}
+        self.inc("llm_requests_total", outcome=outcome, **labels)
+        if outcome == "cache_hit":
+            return
+
+        self.observe("llm_request_duration_seconds", seconds, **labels)
+        if prompt_tokens is not None:
+            self.inc("llm_prompt_tokens_total", prompt_tokens, **labels)
+        if completion_tokens is not None:
+            self.inc("llm_completion_tokens_total", completion_tokens, **labels)
+
+        price = self.prices.get(model)
+        if price is not None and (prompt_tokens or completion_tokens):
+            cost = ((prompt_tokens or 0) * price[0] + (completion_tokens or 0) * price[1]) / 1_000_000
+            self.inc("llm_cost_usd_total", cost, **labels)
+
+    def to_prometheus(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Returns:
+            Exposition text
+        """
+        lines = []
+        with self._lock:
+            for name in sorted(set(self._counters) | set(self._histograms)):
+                kind, help_text = METRIC_HELP.get(name, ("histogram" if name in self._histograms else "counter", name))
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+
+                for labels, value in sorted(self._counters.get(name, {}).items()):
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+                for labels, histogram in sorted(self._histograms.get(name, {}).items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+                        cumulative += count
+                        le = (("le", _format_value(bound)),)
+                        lines.append(f"{name}_bucket{_format_labels(labels, le)} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarize every metric as JSON-serializable data.
+
+        Returns:
+            Dict of metric name to a list of {"labels": ..., value fields} entries
+        """
+        result: Dict[str, Any] = {}
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                result[name] = [{"labels": dict(labels), "value": value} for labels, value in sorted(series.items())]
+            for name, series in sorted(self._histograms.items()):
+                result[name] = [
+                    {
+                        "labels": dict(labels),
+                        "count": histogram.count,
+                        "sum": histogram.sum,
+                        "mean": histogram.sum / histogram.count,
+                        # Quantiles past the last bucket are inf, which JSON cannot hold
+                        "p50": _json_number(histogram.quantile(0.5)),
+                        "p95": _json_number(histogram.quantile(0.95)),
+                    }
+                    for labels, histogram in sorted(series.items())
+                ]
+        return result
+
+    def write(self, path: str, format: str = "json") -> None:
+        """
+        Write the metrics to a file.
+
+        Args:
+            path: Output file path
+            format: "prometheus" for the text exposition format, "json" for the summary
+
+        Raises:
+            ValueError: If the format is not supported
+        """
+        if format == "prometheus":
+            text = self.to_prometheus()
+        elif format == "json":
+            text = json.dumps(self.summary(), indent=2)
+        else:
+            raise ValueError(f"Unsupported metrics format: {format}")
+
+        with open(path, "w") as f:
+            f.write(text)
@@ -1,25 +1,178 @@
 import os
-from openai import OpenAI
+import time
+from typing import TYPE_CHECKING, Iterator, Optional
+
 from .config import settings
+from .llm_backends import LLMBackend, OpenAIBackend
+from .retry import Hedger, RetryPolicy
+
+if TYPE_CHECKING:
+    from .llm_cache import ResponseCache
+    from .metrics import MetricsRegistry
+
+def resolve_model(model: str = None) -> str:
+    # The model used when a call does not name one
+    return model or settings.OPENAI_MODEL or "gpt-4"
 
 class OpenAIClient:
     """
     Wrapper around OpenAI API for generating flashcards.
+
+    Requests go through backend, which defaults to an OpenAIBackend built
+    from settings; a FakeLLMBackend answers in-process for load tests.
+
+    When a ResponseCache is given, responses are looked up by a hash of the
+    model, messages and temperature before calling the API. With
+    bypass_cache set the cache is not read, but fresh responses still
+    replace the cached ones.
+
+    With structured_output the model is constrained to the flashcard JSON
+    schema, so responses are a {"cards": [...]} object.
+
+    Transient failures (connection errors, timeouts, 408/409/429 and 5xx)
+    are retried by retry_policy rather than the SDK. With hedge set, a
+    non-streaming call that runs past the recent p95 latency is sent a
+    second time and the first response wins.
+
+    With a MetricsRegistry, every call records its outcome, latency, token
+    usage, estimated cost and retries, labeled by model and by the level
+    passed in by the caller.
     """
-    def __init__(self):
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
-
-    def generate_flashcards(self, prompt: str, model: str=None):
-        if model is None:
-            model = settings.OPENAI_MODEL or "gpt-4"
-
-        response = self.client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": "You are a data-science tutor generating flashcards."},
-                {"role": "user",   "content": prompt}
-            ],
-            temperature=0.2,
+    def __init__(
+        self,
+        cache: Optional["ResponseCache"] = None,
+        bypass_cache: bool = False,
+        structured_output: bool = False,
+        retry_policy: Optional[RetryPolicy] = None,
+        hedge: bool = False,
+        metrics: Optional["MetricsRegistry"] = None,
+        backend: Optional[LLMBackend] = None,
+        max_concurrency: int = 1
+    ):
+        # Retries are handled by retry_policy so backoff and deadlines are ours
+        self.backend = backend if backend is not None else OpenAIBackend()
+        # The SDK client, when there is one; batch jobs use it directly
+        self.client = getattr(self.backend, "client", None)
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        # max_concurrency is the number of threads sharing this client; it sizes the hedger's pools
+        self.hedger = Hedger(max_concurrency=max_concurrency) if hedge else None
+        self.cache = cache
+        self.bypass_cache = bypass_cache
+        self.temperature = 0.2
+        self.structured_output = structured_output
+        self.metrics = metrics
+
+    def _messages(self, prompt: str) -> list:
+        return [
+            {"role": "system", "content": "You are a data-science tutor generating flashcards."},
+            {"role": "user",   "content": prompt}
+        ]
+
+    def _request_options(self) -> dict:
+        if not self.structured_output:
+            return {}
+        from .card_schema import RESPONSE_FORMAT
+        return {"response_format": RESPONSE_FORMAT}
+
+    def request_body(self, prompt: str, model: str=None) -> dict:
+        # Chat completion parameters for a prompt; also used for batch job files
+        return {
+            "model": resolve_model(model),
+            "messages": self._messages(prompt),
+            "temperature": self.temperature,
+            **self._request_options(),
+        }
+
+    def _cached(self, body: dict, refresh: bool) -> tuple:
+        # Returns (cache key or None, cached response or None)
+        if self.cache is None:
+            return None, None
+        key = self.cache.key(**body)
+        return key, None if self.bypass_cache or refresh else self.cache.get(key)
+
+    def evict(self, prompt: str, model: str=None) -> None:
+        # Drops the cached response for a prompt, e.g. one that failed to parse,
+        # so a rerun asks the model again instead of replaying it
+        if self.cache is not None:
+            self.cache.delete(self.cache.key(**self.request_body(prompt, model)))
+
+    def _create(self, level: str = None, hedge: bool = True, stream: bool = False, **kwargs):
+        send = self.backend.stream if stream else self.backend.complete
+
+        def attempt(timeout: float):
+            request = lambda: send(timeout=timeout, **kwargs)
+            if hedge and self.hedger is not None:
+                return self.hedger.call(request)
+            return request()
+
+        on_retry = None
+        if self.metrics is not None:
+            on_retry = lambda exc, delay: self.metrics.inc(
+                "llm_retries_total", model=kwargs["model"], level=level, reason=type(exc).__name__
+            )
+        return self.retry_policy.call(attempt, self.backend.is_transient, on_retry)
+
+    def _record(self, body: dict, level: str, start: float, usage=None, outcome: str = "ok") -> None:
+        if self.metrics is None:
+            return
+        self.metrics.record_llm_call(
+            body["model"], level, time.perf_counter() - start,
+            usage.prompt_tokens if usage is not None else None,
+            usage.completion_tokens if usage is not None else None,
+            outcome,
         )
-        # Extract the content from the response
-        return response.choices[0].message.content
+
+    def generate_flashcards(self, prompt: str, model: str=None, refresh: bool=False, level: str=None):
+        # refresh skips the cached response, e.g. when retrying one that failed to parse;
+        # level only labels the call's metrics
+        start = time.perf_counter()
+        body = self.request_body(prompt, model)
+        key, cached = self._cached(body, refresh)
+        if cached is not None:
+            self._record(body, level, start, outcome="cache_hit")
+            return cached
+
+        try:
+            response = self._create(level, **body)
+        except Exception:
+            self._record(body, level, start, outcome="error")
+            raise
+        self._record(body, level, start, response.usage)
+        content = response.content
+        if key is not None and content is not None:
+            self.cache.put(key, content)
+        return content
+
+    def stream_flashcards(self, prompt: str, model: str=None, refresh: bool=False, level: str=None) -> Iterator[str]:
+        # Yields the completion text piece by piece as it is generated. A
+        # cached response is yielded whole; a completed stream is cached.
+        start = time.perf_counter()
+        body = self.request_body(prompt, model)
+        key, cached = self._cached(body, refresh)
+        if cached is not None:
+            self._record(body, level, start, outcome="cache_hit")
+            yield cached
+            return
+
+        pieces = []
+        usage = None
+        try:
+            # Only opening the stream is retried; hedging a stream would not help.
+            # The final event carries the token usage.
+            for event in self._create(level, hedge=False, stream=True, **body):
+                usage = event.usage or usage
+                if event.content:
+                    pieces.append(event.content)
+                    yield event.content
+        except Exception:
+            self._record(body, level, start, outcome="error")
+            raise
+        self._record(body, level, start, usage)
+
+        if key is not None:
+            self.cache.put(key, "".join(pieces))
+
+    def close(self) -> None:
+        # Stops the hedger's threads; in-flight requests finish in the background
+        if self.hedger is not None:
+            self.hedger.close()
@@ -0,0 +1,94 @@
+"""
+Client-side rate limiting for OpenAI calls.
+This module provides a thread-safe token bucket and a limiter that enforces
+requests-per-minute and tokens-per-minute budgets together.
+"""
+import threading
+import time
+from typing import Callable, Optional
+
+
+class TokenBucket:
+    """Thread-safe token bucket that blocks callers until capacity is available."""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the token bucket.
+
+        Args:
+            rate_per_minute: Number of units added to the bucket per minute
+            capacity: Maximum burst size (defaults to one minute's worth)
+            clock: Monotonic clock function, overridable for tests
+        """
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._clock = clock
+        self._available = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1) -> float:
+        """
+        Take units from the bucket, waiting until enough have accumulated.
+
+        Requests larger than the bucket's capacity are clamped to the capacity
+        so they can eventually proceed.
+
+        Args:
+            amount: Number of units to take
+
+        Returns:
+            Number of seconds spent waiting
+        """
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._available >= amount:
+                    self._available -= amount
+                    return waited
+                delay = (amount - self._available) / self.rate_per_second
+            time.sleep(delay)
+            waited += delay
+
+    def _refill(self) -> None:
+        """Add the units accumulated since the last update."""
+        now = self._clock()
+        self._available = min(self.capacity, self._available + (now - self._updated) * self.rate_per_second)
+        self._updated = now
+
+
+class RateLimiter:
+    """Enforces requests-per-minute and tokens-per-minute limits together."""
+
+    def __init__(self, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            requests_per_minute: Maximum requests per minute (None for unlimited)
+            tokens_per_minute: Maximum tokens per minute (None for unlimited)
+        """
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+    def acquire(self, tokens: int = 0) -> float:
+        """
+        Wait until one request using the given number of tokens may be sent.
+
+        Args:
+            tokens: Estimated tokens the request will consume
+
+        Returns:
+            Number of seconds spent waiting
+        """
+        waited = 0.0
+        if self.requests is not None:
+            waited += self.requests.acquire(1)
+        if self.tokens is not None and tokens:
+            waited += self.tokens.acquire(tokens)
+        return waited
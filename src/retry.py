@@ -0,0 +1,292 @@
+"""
+Retries, deadlines and hedged requests for StudyWise AI.
+This module provides a retry policy with jittered exponential backoff that
+honours Retry-After hints and an overall per-call deadline, and a hedger
+that sends a duplicate request once a call runs past the recent p95
+latency, returning whichever response arrives first.
+"""
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Optional
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a call and its retries do not finish within the deadline."""
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """
+    Read a Retry-After hint from an HTTP error.
+
+    Supports retry-after-ms, and Retry-After given in seconds or as an HTTP date.
+
+    Args:
+        exc: Exception with an optional response carrying headers
+
+    Returns:
+        Seconds to wait, or None if the error carries no usable hint
+    """
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value is not None:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """
+    Retries transient failures with full-jitter exponential backoff.
+
+    Each attempt is given the smaller of the per-attempt timeout and the
+    time left before the deadline. A Retry-After hint from the server
+    replaces the computed backoff, but never pushes a retry past the deadline.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 20.0,
+        timeout: float = 60.0,
+        deadline: Optional[float] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Optional[random.Random] = None
+    ):
+        """
+        Initialize the retry policy.
+
+        Args:
+            max_retries: Maximum number of retries after the first attempt
+            base_delay: Backoff ceiling for the first retry in seconds
+            max_delay: Maximum backoff between attempts in seconds
+            timeout: Timeout for a single attempt in seconds
+            deadline: Total seconds allowed for a call including retries (None for no limit)
+            sleep: Sleep function, overridable for tests
+            clock: Monotonic clock function, overridable for tests
+            rng: Random number generator used for jitter
+        """
+        if max_retries < 0:
+            raise ValueError("max_retries must not be negative")
+
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.deadline = deadline
+        self._sleep = sleep
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self.attempts = 0
+        self.retries = 0
+
+    def backoff(self, retry: int, retry_after: Optional[float] = None) -> float:
+        """
+        Compute the delay before a retry.
+
+        Args:
+            retry: Zero-based retry number
+            retry_after: Server-provided Retry-After hint in seconds
+
+        Returns:
+            Seconds to wait
+        """
+        if retry_after is not None:
+            return retry_after
+        return self._rng.uniform(0, min(self.max_delay, self.base_delay * (2 ** retry)))
+
+    def call(
+        self,
+        fn: Callable[[float], Any],
+        retryable: Callable[[BaseException], bool] = lambda exc: True,
+        on_retry: Optional[Callable[[BaseException, float], None]] = None
+    ) -> Any:
+        """
+        Call fn until it succeeds, a non-retryable error occurs, or retries run out.
+
+        Args:
+            fn: Function taking the timeout for this attempt in seconds
+            retryable: Predicate deciding whether an exception is transient
+            on_retry: Called with the error and the delay before each retry
+
+        Returns:
+            The result of the first successful attempt
+
+        Raises:
+            DeadlineExceeded: If the deadline passes before an attempt succeeds
+            Exception: The last error if it is not retryable or retries are exhausted
+        """
+        expires = self._clock() + self.deadline if self.deadline is not None else None
+        retry = 0
+        while True:
+            timeout = self.timeout
+            if expires is not None:
+                remaining = expires - self._clock()
+                if remaining <= 0:
+                    raise DeadlineExceeded(f"Call did not complete within {self.deadline}s")
+                timeout = min(timeout, remaining)
+
+            with self._lock:
+                self.attempts += 1
+            try:
+                return fn(timeout)
+            except Exception as exc:
+                if retry >= self.max_retries or not retryable(exc):
+                    raise
+
+                delay = self.backoff(retry, retry_after_seconds(exc))
+                if expires is not None and self._clock() + delay >= expires:
+                    raise DeadlineExceeded(f"Call did not complete within {self.deadline}s") from exc
+
+                with self._lock:
+                    self.retries += 1
+                if on_retry is not None:
+                    on_retry(exc, delay)
+                self._sleep(delay)
+                retry += 1
+
+
+class LatencyTracker:
+    """Thread-safe rolling window of call latencies."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        """
+        Initialize the latency tracker.
+
+        Args:
+            window: Number of recent latencies kept
+            min_samples: Samples required before percentiles are reported
+        """
+        self.min_samples = min_samples
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        """
+        Record the latency of a completed call.
+
+        Args:
+            seconds: Call duration in seconds
+        """
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def percentile(self, quantile: float) -> Optional[float]:
+        """
+        Return a latency percentile over the window.
+
+        Args:
+            quantile: Quantile between 0 and 1, e.g. 0.95
+
+        Returns:
+            Latency in seconds, or None until min_samples calls have been recorded
+        """
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+
+class Hedger:
+    """
+    Sends a second copy of a slow call and returns whichever finishes first.
+
+    A call is hedged once it has run longer than the tracked latency quantile.
+    Until the tracker has enough samples, calls are not hedged and run on
+    the caller's thread. After that, primaries and hedges run on two separate
+    pools, each sized for max_concurrency callers. The losing request is left
+    to finish in the background and keeps its worker until then, so a later
+    primary may wait behind a straggling one; its hedge still starts on the
+    other pool after the usual delay rather than queueing behind it.
+    """
+
+    def __init__(self, quantile: float = 0.95, tracker: Optional[LatencyTracker] = None, max_concurrency: int = 1):
+        """
+        Initialize the hedger.
+
+        Args:
+            quantile: Latency quantile after which a duplicate request is sent
+            tracker: Latency tracker shared by hedged calls
+            max_concurrency: Number of callers that may call the hedger at once
+        """
+        self.quantile = quantile
+        self.tracker = tracker or LatencyTracker()
+        # Hedges get their own pool so they never queue behind straggling primaries
+        workers = max(1, max_concurrency)
+        self._primaries = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="primary")
+        self._hedges = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hedge")
+        self._lock = threading.Lock()
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def _timed(self, fn: Callable[[], Any]) -> Any:
+        """Run fn and record its latency if it succeeds."""
+        start = time.perf_counter()
+        result = fn()
+        self.tracker.record(time.perf_counter() - start)
+        return result
+
+    def call(self, fn: Callable[[], Any]) -> Any:
+        """
+        Call fn, hedging it with a duplicate if it runs past the latency quantile.
+
+        Args:
+            fn: Function performing the request
+
+        Returns:
+            The result of the first request to succeed
+
+        Raises:
+            Exception: The primary request's error if every request fails
+        """
+        hedge_after = self.tracker.percentile(self.quantile)
+        if hedge_after is None:
+            return self._timed(fn)
+
+        primary = self._primaries.submit(self._timed, fn)
+        done, _ = wait([primary], timeout=hedge_after)
+        if done:
+            return primary.result()
+
+        with self._lock:
+            self.hedged += 1
+        hedge = self._hedges.submit(self._timed, fn)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return future.result()
+        return primary.result()
+
+    def close(self) -> None:
+        """Stop the hedger's threads once in-flight requests finish."""
+        self._primaries.shutdown(wait=False)
+        self._hedges.shutdown(wait=False)
@@ -1,11 +1,19 @@
 """
 Supabase client configuration and utilities for the StudyWise AI application.
 This module provides functions to connect to Supabase and perform database operations.
+
+The client is created once per process and shared, so requests reuse
+pooled keep-alive connections instead of opening (and TLS-handshaking) a
+new one each time. A child process started with fork builds its own client
+on first use rather than sharing the parent's sockets.
 """
 import os
-from typing import Dict, Any, List, Optional
+import threading
+from typing import Dict, Any, List, Optional, TYPE_CHECKING
 from dotenv import load_dotenv
-from supabase import create_client, Client
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 # Load environment variables
 load_dotenv()
@@ -14,10 +22,36 @@ load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
+# Connection pool and timeout configuration
+SUPABASE_MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "20"))
+SUPABASE_MAX_KEEPALIVE = int(os.getenv("SUPABASE_MAX_KEEPALIVE", "10"))
+SUPABASE_KEEPALIVE_EXPIRY = float(os.getenv("SUPABASE_KEEPALIVE_EXPIRY", "30"))
+SUPABASE_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", "30"))
+SUPABASE_CONNECT_TIMEOUT = float(os.getenv("SUPABASE_CONNECT_TIMEOUT", "5"))
+
+_client: Optional["Client"] = None
+_http_client = None
+_client_pid: Optional[int] = None
+_lock = threading.Lock()
 
-def get_supabase_client() -> Client:
+
+def create_supabase_client(
+    max_connections: Optional[int] = None,
+    max_keepalive: Optional[int] = None,
+    timeout: Optional[float] = None,
+    connect_timeout: Optional[float] = None
+) -> "Client":
     """
-    Initialize and return a Supabase client.
+    Create a new Supabase client with its own connection pool.
+
+    Most callers should use get_supabase_client, which shares one client
+    per process; this is for code that needs a separately configured pool.
+
+    Args:
+        max_connections: Maximum open connections (defaults to SUPABASE_MAX_CONNECTIONS)
+        max_keepalive: Idle connections kept open for reuse (defaults to SUPABASE_MAX_KEEPALIVE)
+        timeout: Read, write and pool timeout in seconds (defaults to SUPABASE_TIMEOUT)
+        connect_timeout: Connection timeout in seconds (defaults to SUPABASE_CONNECT_TIMEOUT)
 
     Returns:
         Client: Authenticated Supabase client
@@ -30,4 +64,82 @@ def get_supabase_client() -> Client:
             "SUPABASE_URL and SUPABASE_KEY must be set in the .env file"
         )
 
-    return create_client(SUPABASE_URL, SUPABASE_KEY)
+    # Imported here so the CLI doesn't pay for the Supabase SDK until it connects
+    import httpx
+    from supabase import ClientOptions, create_client
+
+    http_client = httpx.Client(
+        limits=httpx.Limits(
+            max_connections=max_connections or SUPABASE_MAX_CONNECTIONS,
+            max_keepalive_connections=max_keepalive or SUPABASE_MAX_KEEPALIVE,
+            keepalive_expiry=SUPABASE_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(
+            timeout or SUPABASE_TIMEOUT,
+            connect=connect_timeout or SUPABASE_CONNECT_TIMEOUT,
+        ),
+    )
+    return create_client(SUPABASE_URL, SUPABASE_KEY, options=ClientOptions(httpx_client=http_client))
+
+
+def get_supabase_client() -> "Client":
+    """
+    Return the process-wide Supabase client, creating it on first use.
+
+    Returns:
+        Client: Authenticated Supabase client
+
+    Raises:
+        ValueError: If SUPABASE_URL or SUPABASE_KEY environment variables are not set
+    """
+    global _client, _http_client, _client_pid
+
+    client = _client
+    if client is not None and _client_pid == os.getpid():
+        return client
+
+    with _lock:
+        if _client is None or _client_pid != os.getpid():
+            # A client inherited through fork shares the parent's sockets; drop it unused
+            _client = create_supabase_client()
+            _http_client = _client.options.httpx_client
+            _client_pid = os.getpid()
+        return _client
+
+
+def close_supabase_client() -> None:
+    """
+    Close the shared client's connections.
+
+    Call at shutdown; the next call to get_supabase_client creates a new client.
+    """
+    global _client, _http_client, _client_pid
+
+    with _lock:
+        http_client, owned = _http_client, _client_pid == os.getpid()
+        _client = _http_client = _client_pid = None
+    if http_client is not None and owned:
+        http_client.close()
+
+
+def reset_supabase_client() -> "Client":
+    """
+    Replace the shared client with a new one, closing the old client's connections.
+
+    Returns:
+        Client: The new shared client
+    """
+    close_supabase_client()
+    return get_supabase_client()
+
+
+def _after_fork_in_child() -> None:
+    """Forget the parent's client, and its lock in case another thread held it at fork time."""
+    global _client, _http_client, _client_pid, _lock
+
+    _client = _http_client = _client_pid = None
+    _lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
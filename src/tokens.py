@@ -0,0 +1,54 @@
+"""
+Token counting helpers for StudyWise AI.
+Uses tiktoken when it is installed and falls back to a character-based
+estimate otherwise.
+"""
+from functools import lru_cache
+from typing import Any, Optional
+
+# Average number of characters per token for English text with OpenAI tokenizers
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: Optional[str]) -> Any:
+    """
+    Return the tiktoken encoding for a model, or None if tiktoken is unavailable.
+
+    Args:
+        model: OpenAI model name (None uses the cl100k_base encoding)
+
+    Returns:
+        tiktoken Encoding, or None
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+
+    if model:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            pass
+    return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Count the tokens in a piece of text.
+
+    Args:
+        text: The text to count
+        model: OpenAI model name used to pick the tokenizer
+
+    Returns:
+        Number of tokens (estimated if tiktoken is not installed)
+    """
+    if not text:
+        return 0
+
+    encoding = _encoding(model)
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
@@ -0,0 +1,288 @@
+"""
+Concurrent URL ingestion for StudyWise AI.
+This module downloads many documents over a pooled HTTP session with bounded
+concurrency and per-host limits, and uses ETag/Last-Modified validators so
+unchanged documents are neither re-downloaded nor re-extracted.
+"""
+import os
+import sqlite3
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.document import DocumentUploader, UploadedDocument
+
+
+@dataclass
+class FetchResult:
+    """Outcome of fetching a single URL as part of a batch."""
+    url: str
+    document: Optional[UploadedDocument] = None
+    not_modified: bool = False
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the URL was ingested successfully."""
+        return self.error is None
+
+
+class ConditionalCache:
+    """
+    Stores the HTTP validators of fetched URLs in SQLite.
+
+    Each entry holds only the ETag, Last-Modified and the SHA-256 of the
+    document bytes; the extracted document itself is served from the
+    uploader's ExtractionCache under that hash. Every put is committed at
+    once, so validators survive an interrupted run, and the least recently
+    used entries are evicted past max_entries.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 100000):
+        """
+        Initialize the conditional request cache.
+
+        Args:
+            path: SQLite database file (None keeps the cache in memory)
+            max_entries: Maximum number of URLs to keep validators for
+        """
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS validators (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT NOT NULL,
+                file_type TEXT NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_validators_accessed ON validators (accessed_at)")
+        self._conn.commit()
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached validators for a URL.
+
+        Args:
+            url: The document URL
+
+        Returns:
+            Dict with etag, last_modified, content_hash and file_type if
+            cached, None otherwise
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, content_hash, file_type FROM validators WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            self._conn.execute("UPDATE validators SET accessed_at = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+
+        etag, last_modified, content_hash, file_type = row
+        return {'etag': etag, 'last_modified': last_modified, 'content_hash': content_hash, 'file_type': file_type}
+
+    def put(
+        self,
+        url: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        content_hash: str,
+        file_type: str
+    ) -> None:
+        """
+        Store the validators for a URL and evict old entries if over the limit.
+
+        Entries without any validator are not stored, since they could never
+        be revalidated.
+
+        Args:
+            url: The document URL
+            etag: ETag response header, if any
+            last_modified: Last-Modified response header, if any
+            content_hash: SHA-256 hex digest of the downloaded bytes
+            file_type: File extension of the document
+        """
+        if not etag and not last_modified:
+            return
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO validators (url, etag, last_modified, content_hash, file_type, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, content_hash, file_type, time.time()),
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM validators").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM validators WHERE url IN "
+                    "(SELECT url FROM validators ORDER BY accessed_at ASC LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class URLFetcher:
+    """Fetches and extracts many document URLs concurrently."""
+
+    def __init__(
+        self,
+        uploader: Optional[DocumentUploader] = None,
+        max_workers: int = 8,
+        per_host_limit: int = 4,
+        timeout: tuple = (10, 60),
+        cache: Optional[ConditionalCache] = None
+    ):
+        """
+        Initialize the URL fetcher.
+
+        Args:
+            uploader: Uploader used for size limits and extraction
+            max_workers: Maximum number of URLs fetched at once
+            per_host_limit: Maximum number of concurrent requests to one host
+            timeout: (connect, read) timeout in seconds for each request
+            cache: Conditional request cache; defaults to an in-memory cache when the
+                uploader has an ExtractionCache to serve unchanged documents, and to
+                no cache otherwise
+
+        Raises:
+            ValueError: If a cache is given but the uploader has no ExtractionCache
+        """
+        self.uploader = uploader or DocumentUploader()
+        if cache is not None and self.uploader.cache is None:
+            raise ValueError("A conditional cache requires an uploader with an extraction cache")
+
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        if cache is None and self.uploader.cache is not None:
+            cache = ConditionalCache()
+        self.cache = cache
+
+        # Share one connection pool per host across all worker threads
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_lock = threading.Lock()
+
+    def fetch(self, url: str) -> FetchResult:
+        """
+        Fetch and extract a single URL, revalidating any cached copy.
+
+        Args:
+            url: URL to the document
+
+        Returns:
+            FetchResult with the document, flagged not_modified on a 304
+
+        Raises:
+            ValueError: If URL format is invalid, file format is not supported,
+                        or file size exceeds limit
+            ConnectionError: If download fails
+        """
+        parsed_url = urllib.parse.urlparse(url)
+        if not parsed_url.scheme or not parsed_url.netloc:
+            raise ValueError(f"Invalid URL: {url}")
+
+        file_name = os.path.basename(parsed_url.path) or "downloaded_document"
+
+        # Revalidate only when the extracted document can still be served from the extraction cache
+        entry = self.cache.get(url) if self.cache is not None else None
+        cached = self.uploader.cached_upload(entry['content_hash'], file_name, entry['file_type']) if entry else None
+        headers = {}
+        if cached is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        with self._host_slot(parsed_url.netloc):
+            response = self.session.get(url, stream=True, timeout=self.timeout, headers=headers)
+            try:
+                if response.status_code == 304 and cached is not None:
+                    return FetchResult(url=url, document=cached, not_modified=True)
+
+                if response.status_code != 200:
+                    raise ConnectionError(f"Failed to download file from {url}. Status code: {response.status_code}")
+
+                data, file_extension = self.uploader.read_response(response, file_name)
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+            finally:
+                response.close()
+
+        # Extract outside the host slot so slow parsing doesn't block downloads
+        document, content_hash = self.uploader.upload_from_bytes_with_hash(data, file_name, file_extension)
+        if self.cache is not None:
+            self.cache.put(url, etag, last_modified, content_hash, file_extension)
+        return FetchResult(url=url, document=document)
+
+    def fetch_many(self, urls: Iterable[str]) -> Iterator[FetchResult]:
+        """
+        Fetch many URLs concurrently, yielding results as they complete.
+
+        A failure for one URL is reported on its FetchResult and does not
+        stop the batch.
+
+        Args:
+            urls: URLs to fetch
+
+        Yields:
+            FetchResult for each URL, in completion order
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.fetch, url): url for url in urls}
+            for future in as_completed(futures):
+                try:
+                    yield future.result()
+                except Exception as e:
+                    yield FetchResult(url=futures[future], error=str(e))
+
+    def close(self) -> None:
+        """Close the pooled HTTP session."""
+        self.session.close()
+
+    def __enter__(self) -> "URLFetcher":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @contextmanager
+    def _host_slot(self, host: str):
+        """Hold one of the per-host concurrency slots for the duration of a request."""
+        with self._host_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.per_host_limit)
+                self._host_slots[host] = slot
+
+        with slot:
+            yield
@@ -0,0 +1,146 @@
+"""
+Unit tests for offline batch generation.
+These tests use the local batch backend and mock the OpenAI client.
+"""
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.batch_jobs import BatchJob, LocalBatchBackend, OpenAIBatchBackend
+from src.flashcard_generator import FlashcardGenerator
+
+DOCUMENTS = {
+    "a.pdf": [f"Chunk a{i}: gradient descent notes." for i in range(3)],
+    "b.pdf": [f"Chunk b{i}: attention notes." for i in range(2)],
+}
+
+
+@pytest.fixture
+def generator():
+    """Provide a generator packing one chunk per prompt with a JSON-serializable request body."""
+    with patch('src.flashcard_generator.OpenAIClient') as mock_client_cls:
+        mock_client_cls.return_value.request_body.side_effect = lambda prompt: {
+            "model": "stub", "messages": [{"role": "user", "content": prompt}],
+        }
+        with patch('src.flashcard_generator.count_tokens', return_value=10):
+            yield FlashcardGenerator(context_token_budget=15)
+
+
+def _respond(body: dict) -> dict:
+    """Answer a request with one card naming its chunk."""
+    marker = body["messages"][-1]["content"].split("Chunk ")[1].split(":")[0]
+    if marker == "b1":
+        raise RuntimeError("model overloaded")
+    content = json.dumps([{"question": f"Q{marker}", "answer": f"A{marker}"}])
+    return {"choices": [{"message": {"content": content}}]}
+
+
+def test_prepare_writes_batch_api_job_file(generator, tmp_path):
+    """Test that every packed prompt becomes one Batch API request line."""
+    job = BatchJob(generator, MagicMock(), str(tmp_path / "job"))
+
+    assert job.prepare(DOCUMENTS) == 5
+
+    lines = [json.loads(line) for line in job.requests_path.read_text().splitlines()]
+    assert [line["custom_id"] for line in lines] == [f"request-{i}" for i in range(5)]
+    assert all(line["method"] == "POST" and line["url"] == "/v1/chat/completions" for line in lines)
+    assert "Chunk a0" in lines[0]["body"]["messages"][-1]["content"]
+    manifest = json.loads(job.manifest_path.read_text())
+    assert manifest["request-3"] == {"document": "b.pdf", "chunks": [0]}
+
+
+def test_run_maps_results_back_to_documents(generator, tmp_path):
+    """Test that cards return to their documents in chunk order and failures are reported."""
+    backend = LocalBatchBackend(str(tmp_path / "backend"), respond=_respond, polls_until_complete=2)
+    sleeps = []
+    job = BatchJob(generator, backend, str(tmp_path / "job"), sleep=sleeps.append)
+
+    results = job.run(DOCUMENTS)
+
+    assert results.status == "completed"
+    assert [c["question"] for c in results.cards["a.pdf"]] == ["Qa0", "Qa1", "Qa2"]
+    assert [c["question"] for c in results.cards["b.pdf"]] == ["Qb0"]
+    assert results.chunks_covered["b.pdf"] == [0]
+    assert results.failed[0][:2] == ("b.pdf", [1])
+    assert "model overloaded" in results.failed[0][2]
+    assert len(sleeps) == 1
+
+
+def test_resume_after_crash_does_not_resubmit(generator, tmp_path):
+    """Test that a new job on the same directory picks up the submitted batch."""
+    backend = LocalBatchBackend(str(tmp_path / "backend"), respond=_respond, polls_until_complete=3)
+    first = BatchJob(generator, backend, str(tmp_path / "job"))
+    first.prepare(DOCUMENTS)
+    job_id = first.submit()
+    assert backend.status(job_id) == "in_progress"
+
+    # Simulate a restart: a fresh job object and backend over the same directories
+    backend = LocalBatchBackend(str(tmp_path / "backend"), respond=_respond, polls_until_complete=3)
+    backend.submit = MagicMock(side_effect=AssertionError("resubmitted"))
+    resumed = BatchJob(generator, backend, str(tmp_path / "job"), sleep=lambda s: None)
+    results = resumed.run(DOCUMENTS)
+
+    assert resumed.state["job_id"] == job_id
+    assert len(results.cards["a.pdf"]) == 3
+
+
+def test_job_dir_rejects_different_documents(generator, tmp_path):
+    """Test that a job directory cannot be reused for other inputs."""
+    job = BatchJob(generator, MagicMock(), str(tmp_path / "job"))
+    job.prepare(DOCUMENTS)
+
+    with pytest.raises(ValueError):
+        job.prepare({"c.pdf": ["Chunk c0: other text."]})
+
+
+def test_openai_backend_uses_batch_api(tmp_path):
+    """Test file upload, batch creation and output download through the SDK."""
+    client = MagicMock()
+    client.files.create.return_value.id = "file-in"
+    client.batches.create.return_value.id = "batch-1"
+    client.batches.retrieve.return_value = MagicMock(status="completed", output_file_id="file-out", error_file_id="file-err")
+    client.files.content.side_effect = lambda file_id: MagicMock(content=f'{{"custom_id": "{file_id}"}}'.encode())
+    requests_path = tmp_path / "requests.jsonl"
+    requests_path.write_text("{}\n")
+    backend = OpenAIBatchBackend(client)
+
+    assert backend.submit(requests_path) == "batch-1"
+    client.batches.create.assert_called_once_with(
+        input_file_id="file-in", endpoint="/v1/chat/completions", completion_window="24h"
+    )
+    assert backend.status("batch-1") == "completed"
+
+    destination = tmp_path / "results.jsonl"
+    backend.download("batch-1", destination)
+    assert destination.read_text().splitlines() == ['{"custom_id": "file-out"}', '{"custom_id": "file-err"}']
+
+
+def test_local_backend_answers_through_stub_endpoint(tmp_path):
+    """Test the local backend's default path against the stub chat endpoint."""
+    from benchmarks.stub_openai_server import start_stub_server
+
+    server, url = start_stub_server(latency=0.0)
+    try:
+        with patch.multiple('src.model.settings', OPENAI_BASE_URL=url, OPENAI_API_KEY="stub", OPENAI_MODEL="stub"):
+            generator = FlashcardGenerator()
+            backend = LocalBatchBackend(str(tmp_path / "backend"))
+            results = BatchJob(generator, backend, str(tmp_path / "job")).run({"a.pdf": DOCUMENTS["a.pdf"]})
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert len(results.cards["a.pdf"]) == 5
+    assert results.failed == []
+
+
+def test_fake_llm_backend_requires_local_batch_backend(tmp_path, capsys):
+    """Test that a batch job with the fake LLM backend is rejected unless it uses the local batch backend."""
+    from src import generate_and_upload
+
+    argv = ["generate_and_upload", str(tmp_path), "--batch-job", str(tmp_path / "job"), "--llm-backend", "fake"]
+    with patch("sys.argv", argv), pytest.raises(SystemExit) as exit_info:
+        generate_and_upload.main()
+
+    assert exit_info.value.code == 2
+    assert "--batch-backend local" in capsys.readouterr().err
@@ -0,0 +1,44 @@
+"""
+Unit tests for flashcard validation and repair.
+"""
+import pytest
+
+from src.card_schema import FLASHCARD_SCHEMA, extract_cards, validate_card
+
+
+def test_valid_card_is_unchanged():
+    """Test that a well-formed card passes without repair."""
+    card = {"question": "Q", "answer": "A", "tags": ["x"], "level": "beginner"}
+
+    assert validate_card(card) == (card, False)
+
+
+@pytest.mark.parametrize("card, expected", [
+    ({"question": " Q ", "answer": "A"}, {"question": "Q", "answer": "A", "tags": []}),
+    ({"front": "Q", "back": 42}, {"question": "Q", "answer": "42", "tags": []}),
+    ({"question": "Q", "answer": "A", "tags": "x, y,,x"}, {"question": "Q", "answer": "A", "tags": ["x", "y"]}),
+    ({"question": "Q", "answer": "A", "tags": 3}, {"question": "Q", "answer": "A", "tags": []}),
+    ({"question": "Q", "answer": "A", "tags": [], "id": "model-made"}, {"question": "Q", "answer": "A", "tags": []}),
+])
+def test_repairable_cards(card, expected):
+    """Test that fixable problems are repaired and flagged."""
+    assert validate_card(card) == (expected, True)
+
+
+@pytest.mark.parametrize("card", [
+    "just a string",
+    {"answer": "A"},
+    {"question": "   ", "answer": "A"},
+    {"question": "Q", "answer": ["not", "text"]},
+])
+def test_broken_cards_are_rejected(card):
+    """Test that cards without a usable question and answer are rejected."""
+    assert validate_card(card) == (None, False)
+
+
+def test_extract_cards():
+    """Test unwrapping of bare arrays and structured-output objects."""
+    assert extract_cards([{"question": "Q"}]) == [{"question": "Q"}]
+    assert extract_cards({"cards": []}) == []
+    assert extract_cards({"flashcards": []}) is None
+    assert FLASHCARD_SCHEMA["properties"]["cards"]["type"] == "array"
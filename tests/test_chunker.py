@@ -0,0 +1,56 @@
+"""
+Unit tests for the offset-based chunker.
+"""
+import random
+
+import pytest
+
+from src.chunker import OffsetChunker
+
+
+@pytest.fixture
+def sample_text():
+    """Generate paragraph-structured text with varied line and word lengths."""
+    rng = random.Random(42)
+    words = ["model", "attention", "gradient", "a", "transformer", "loss", "x" * 120]
+    paragraphs = []
+    for _ in range(150):
+        lines = [" ".join(rng.choice(words) for _ in range(rng.randint(1, 40))) for _ in range(rng.randint(1, 5))]
+        paragraphs.append("\n".join(lines))
+    return "\n\n".join(paragraphs)
+
+
+@pytest.mark.parametrize("chunk_size,overlap", [(1000, 200), (300, 50), (50, 0), (20, 20), (1, 0)])
+def test_matches_recursive_character_text_splitter(sample_text, chunk_size, overlap):
+    """Test that chunks are identical to LangChain's recursive splitter."""
+    text_splitters = pytest.importorskip("langchain_text_splitters")
+    splitter = text_splitters.RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=overlap,
+        separators=["\n\n", "\n", " ", ""]
+    )
+    text = sample_text[:5000] if chunk_size < 10 else sample_text
+
+    assert list(OffsetChunker(chunk_size, overlap).split(text)) == splitter.split_text(text)
+
+
+def test_spans_index_into_source_text(sample_text):
+    """Test that spans are offsets into the source text and are materialized on access."""
+    spans = OffsetChunker(chunk_size=200, overlap=40).split(sample_text)
+
+    assert len(spans) > 1
+    for i, (start, end) in enumerate(spans.spans()):
+        assert spans[i] == sample_text[start:end]
+        assert end - start <= 200
+    assert spans[-2:] == [spans[len(spans) - 2], spans[len(spans) - 1]]
+
+
+def test_empty_text():
+    """Test that empty text produces no chunks."""
+    assert len(OffsetChunker().split("")) == 0
+
+
+def test_overlap_larger_than_chunk_size():
+    """Test that an overlap larger than the chunk size raises ValueError."""
+    with pytest.raises(ValueError):
+        OffsetChunker(chunk_size=100, overlap=200)
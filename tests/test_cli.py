@@ -8,6 +8,7 @@ from unittest.mock import patch, MagicMock
 import pytest
 
 from src.cli import (
+    bulk_upload_flashcards,
     upload_flashcards,
     list_flashcards,
     setup_db,
@@ -47,6 +48,24 @@ def test_upload_flashcards_error():
         mock_exit.assert_called_once_with(1)
 
 
+def test_bulk_upload_flashcards_reports_failed_pages():
+    """Test that a paged upload prints its throughput and exits when pages fail."""
+    with patch('src.cli.bulk_upsert_flashcards') as mock_bulk, \
+         patch('src.cli.print') as mock_print, \
+         patch('src.cli.sys.exit') as mock_exit:
+        mock_bulk.return_value = MagicMock(
+            rows=900, pages=9, seconds=2.0, rows_per_second=450.0, retries=1,
+            invalid=0, failed_pages=1, failed_rows=100, errors=['timed out']
+        )
+
+        bulk_upload_flashcards('cards.jsonl', page_size=100, workers=2)
+
+        mock_bulk.assert_called_once_with('cards.jsonl', page_size=100, max_workers=2, max_retries=3)
+        mock_print.assert_any_call('Uploaded 900 flashcards in 9 pages (2.0s, 450 rows/s, 1 retries)')
+        mock_print.assert_any_call('Failed to upload 100 flashcards in 1 pages: timed out')
+        mock_exit.assert_called_once_with(1)
+
+
 def test_list_flashcards_success():
     """Test successful flashcard listing."""
     with patch('src.cli.get_flashcards') as mock_get, \
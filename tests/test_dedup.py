@@ -0,0 +1,140 @@
+"""
+Unit tests for the near-duplicate detection module.
+"""
+import pytest
+
+from src.dedup import (
+    CardDeduplicator, ChunkDeduplicator, MinHashLSH, normalize_question, optimal_bands, question_shingles, shingle
+)
+
+SLIDE = (
+    "Lecture 4: Convolutional Neural Networks. A convolution layer slides a set of learned "
+    "filters over the input and produces feature maps that respond to local patterns such as "
+    "edges, corners and textures in the image."
+)
+
+
+def test_shingle_normalizes_case_and_punctuation():
+    """Test that shingles ignore case and punctuation."""
+    assert shingle("The Transformer, uses attention!", size=2) == shingle("the transformer uses attention", size=2)
+
+
+def test_optimal_bands():
+    """Test that the LSH split uses every permutation and tracks the threshold."""
+    bands, rows = optimal_bands(128, 0.85)
+
+    assert bands * rows == 128
+    assert abs((1 / bands) ** (1 / rows) - 0.85) < 0.1
+
+
+def test_lsh_finds_similar_items():
+    """Test that the index returns near-duplicates but not unrelated items."""
+    index = MinHashLSH(threshold=0.8)
+    index.insert("slide", index.signature(shingle(SLIDE)))
+
+    near = index.signature(shingle(SLIDE.replace("Lecture 4", "Lecture 5")))
+    unrelated = index.signature(shingle("Gradient boosting builds an ensemble of shallow decision trees sequentially."))
+
+    assert index.query(near) == "slide"
+    assert index.query(unrelated) is None
+
+
+def test_chunk_deduplicator_across_documents():
+    """Test that duplicates are dropped across filter calls and tokens saved are counted."""
+    deduplicator = ChunkDeduplicator(threshold=0.8)
+    other = "Recurrent neural networks process sequences one step at a time while carrying a hidden state."
+
+    first = deduplicator.filter([SLIDE, other])
+    second = deduplicator.filter([SLIDE.replace("Lecture 4", "Lecture 5"), "A completely different topic about SQL joins."])
+
+    assert first == [SLIDE, other]
+    assert second == ["A completely different topic about SQL joins."]
+    assert deduplicator.stats.chunks_seen == 4
+    assert deduplicator.stats.chunks_dropped == 1
+    assert deduplicator.stats.tokens_saved > 0
+
+
+def test_normalize_question_ignores_phrasing():
+    """Test that stopwords, punctuation, case and plurals are normalized away but word order is kept."""
+    assert normalize_question("What is YOLO?") == normalize_question("Define YOLO.") == "yolo"
+    assert normalize_question("How does YOLO divide the image into grids?") == "yolo divide image into grid"
+    assert normalize_question("Why is ReLU preferred over sigmoid?") != \
+        normalize_question("Why is sigmoid preferred over ReLU?")
+    assert normalize_question("What is precision?") != normalize_question("What is recall?")
+
+
+def test_card_deduplicator_drops_rephrased_questions():
+    """Test that rephrased questions are dropped and distinct ones kept."""
+    deduplicator = CardDeduplicator()
+    cards = [
+        {"question": "What is YOLO?"},
+        {"question": "Explain YOLO."},
+        {"question": "How does YOLO divide the image into a grid?"},
+        {"question": "How does YOLO divide an image into grids?"},
+        {"question": "What is precision?"},
+        {"question": "What is recall?"},
+    ]
+
+    kept = deduplicator.filter(cards)
+
+    assert [c["question"] for c in kept] == [
+        "What is YOLO?", "How does YOLO divide the image into a grid?", "What is precision?", "What is recall?",
+    ]
+    assert deduplicator.stats.cards_dropped == 2
+
+
+def test_card_deduplicator_seeded_with_stored_cards():
+    """Test that cards already stored are not generated again."""
+    deduplicator = CardDeduplicator()
+    deduplicator.seed([{"question": "What is YOLO?"}, {"question": None}])
+
+    assert deduplicator.filter([{"question": "What's YOLO?"}, {"question": "What is R-CNN?"}]) == [
+        {"question": "What is R-CNN?"}
+    ]
+    assert deduplicator.stats.cards_seeded == 1
+
+
+@pytest.mark.parametrize("first, second", [
+    ("What is the role of the encoder in a Transformer?", "What is the role of the decoder in a Transformer?"),
+    ("Why is ReLU preferred over sigmoid?", "Why is sigmoid preferred over ReLU?"),
+    ("What is the YOLO Detection System?", "What are the advantages of the YOLO Detection System?"),
+])
+def test_card_deduplicator_keeps_distinct_concepts(first, second):
+    """Test that questions sharing most words but asking about different things are both kept."""
+    cards = [{"question": first}, {"question": second}]
+
+    assert CardDeduplicator().filter(cards) == cards
+
+
+def test_card_deduplicator_keeps_same_question_with_different_answers():
+    """Test that a repeated question is kept when the answers cover different facts."""
+    question = "How does YOLO differ from traditional object detection methods?"
+    cards = [
+        {"question": question,
+         "answer": "YOLO frames detection as a single regression problem solved by one network pass."},
+        {"question": question,
+         "answer": "Traditional methods run a classifier over many region proposals, which is slow."},
+    ]
+
+    assert CardDeduplicator().filter(cards) == cards
+
+
+def test_card_deduplicator_drops_paraphrase():
+    """Test that a paraphrase with the same topic words in the same order is dropped."""
+    deduplicator = CardDeduplicator()
+    cards = [
+        {"question": "What is the role of the loss function in YOLO?", "answer": "It penalizes box and class errors."},
+        {"question": "What role does the loss function play in YOLO?", "answer": "It penalizes box and class errors."},
+    ]
+
+    assert deduplicator.filter(cards) == cards[:1]
+
+
+def test_one_permutation_signature_estimates_similarity():
+    """Test that one-permutation signatures agree on identical sets and differ on disjoint ones."""
+    index = MinHashLSH(num_perm=32, one_permutation=True)
+    first = index.signature(question_shingles("gradient descent optimizer step size"))
+
+    assert index.signature(question_shingles("gradient descent optimizer step size")) == first
+    assert index.similarity(first, index.signature(question_shingles("attention head"))) < 0.2
+    assert index.similarity(first, index.signature(question_shingles("gradient descent optimizer step"))) > 0.4
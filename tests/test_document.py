@@ -2,7 +2,9 @@ import pytest
 from datetime import datetime
 import os
 from pathlib import Path
+import random
 import tempfile
+from unittest.mock import patch
 
 from src.document import (
     DocumentUploader,
@@ -13,7 +15,28 @@ from src.document import (
     TextExtractor,
     PPTExtractor
 )
-
+from src.extraction_cache import ExtractionCache
+
+
+def _random_text(rng: random.Random, length: int) -> str:
+    """Build text of paragraphs, lines, words and the odd unbroken run, as extractors produce."""
+    tokens = []
+    size = 0
+    while size < length:
+        roll = rng.random()
+        if roll < 0.03:
+            token = "\n\n"
+        elif roll < 0.08:
+            token = "\n"
+        elif roll < 0.45:
+            token = " "
+        elif roll < 0.452:
+            token = "x" * rng.randint(100, 1500)
+        else:
+            token = rng.choice(["gradient", "descent", "attention", "layer", "loss", "a", "of"])
+        tokens.append(token)
+        size += len(token)
+    return "".join(tokens)
 
 class TestDocumentUploader:
     """Tests for the DocumentUploader class."""
@@ -63,6 +86,58 @@ class TestDocumentUploader:
         # TODO: Implement test
         pass
 
+    def test_upload_from_url_in_memory(self, uploader, requests_mock, test_files_dir):
+        """Test that a downloaded document is extracted without touching disk."""
+        requests_mock.get(
+            "https://example.com/notes.txt",
+            content=b"Gradient descent notes\n" * 10,
+            headers={"content-type": "text/plain; charset=utf-8"}
+        )
+
+        with patch('src.document.open', create=True) as mock_open:
+            document = uploader.upload_from_url("https://example.com/notes.txt")
+
+        mock_open.assert_not_called()
+        assert document.file_name == "notes.txt"
+        assert document.file_type == "txt"
+        assert document.content.startswith("Gradient descent notes")
+        assert document.chunks
+
+    def test_read_response_shares_buffer(self, uploader, requests_mock):
+        """Test that a streamed download is returned as a view rather than copied to bytes."""
+        import requests
+
+        requests_mock.get("https://example.com/notes.txt", content=b"Backpropagation notes\n" * 10)
+        response = requests.get("https://example.com/notes.txt", stream=True)
+
+        data, file_extension = uploader.read_response(response, "notes.txt")
+
+        assert isinstance(data, memoryview)
+        assert file_extension == "txt"
+        assert bytes(data) == b"Backpropagation notes\n" * 10
+
+    def test_upload_from_url_exceeds_size_limit(self, requests_mock):
+        """Test that an oversized download is rejected while streaming."""
+        uploader = DocumentUploader(max_file_size_mb=1)
+        requests_mock.get("https://example.com/big.txt", content=b"0" * (2 * 1024 * 1024))
+
+        with pytest.raises(ValueError):
+            uploader.upload_from_url("https://example.com/big.txt")
+
+    def test_upload_from_bytes_pdf(self, uploader):
+        """Test extracting an in-memory PDF."""
+        import fitz
+
+        doc = fitz.open()
+        doc.new_page().insert_text((72, 72), "In-memory PDF")
+        data = doc.tobytes()
+        doc.close()
+
+        document = uploader.upload_from_bytes(data, "slides.pdf")
+
+        assert document.file_type == "pdf"
+        assert "In-memory PDF" in document.content
+
     def test_upload_from_url_invalid(self, uploader):
         """Test uploading from an invalid URL raises ValueError."""
         # TODO: Implement test
@@ -83,6 +158,68 @@ class TestDocumentUploader:
         # TODO: Implement test
         pass
 
+    def test_upload_from_file_cached(self, test_files_dir, sample_text_file):
+        """Test that a cached file is served without re-extracting it."""
+        cache = ExtractionCache(cache_dir=str(test_files_dir / "cache"))
+        uploader = DocumentUploader(cache=cache)
+
+        first = uploader.upload_from_file(str(sample_text_file))
+        with patch.object(uploader.processor, 'process_document') as mock_process:
+            second = uploader.upload_from_file(str(sample_text_file))
+
+        mock_process.assert_not_called()
+        assert second.content == first.content
+        assert second.chunks == first.chunks
+        assert cache.stats()["hits"] == 1
+
+    def test_upload_from_directory(self, uploader, test_files_dir):
+        """Test ingesting a directory with per-file failure isolation."""
+        docs_dir = test_files_dir / "course"
+        (docs_dir / "week1").mkdir(parents=True)
+        for i in range(3):
+            (docs_dir / "week1" / f"notes{i}.txt").write_text(f"Lecture notes {i}\n" * 20)
+        (docs_dir / "broken.pdf").write_bytes(b"not a pdf")
+        (docs_dir / "ignored.xyz").write_text("unsupported")
+
+        results = list(uploader.upload_from_directory(str(docs_dir), workers=2))
+
+        assert len(results) == 4
+        failed = [r for r in results if not r.ok]
+        assert [Path(r.file_path).name for r in failed] == ["broken.pdf"]
+        assert all(r.document.chunks for r in results if r.ok)
+
+        stats = uploader.last_batch_stats
+        assert stats.files == 4
+        assert stats.failed == 1
+        assert stats.files_per_second > 0
+
+    def test_upload_from_manifest(self, uploader, test_files_dir, sample_text_file):
+        """Test ingesting the files listed in a manifest."""
+        manifest = test_files_dir / "manifest.txt"
+        manifest.write_text(f"# course files\n{sample_text_file.name}\n")
+
+        results = list(uploader.upload_from_manifest(str(manifest), workers=1))
+
+        assert len(results) == 1
+        assert results[0].ok
+        assert results[0].document.file_name == "sample.txt"
+
+    def test_iter_chunks(self, uploader, test_files_dir):
+        """Test that streaming chunks from a file spanning many paragraphs matches upload_from_file."""
+        file_path = test_files_dir / "long.txt"
+        file_path.write_text(_random_text(random.Random(7), 300000))
+
+        chunks = list(uploader.iter_chunks(str(file_path), chunk_size=uploader.chunk_size,
+                                           overlap=uploader.chunk_overlap))
+
+        assert len(chunks) > 100
+        assert chunks == uploader.upload_from_file(str(file_path)).chunks
+
+    def test_iter_chunks_nonexistent(self, uploader):
+        """Test streaming chunks from a nonexistent file raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            uploader.iter_chunks("nonexistent_file.txt")
+
 
 class TestDocumentProcessor:
     """Tests for the DocumentProcessor class."""
@@ -127,6 +264,26 @@ class TestDocumentProcessor:
         # TODO: Implement test
         pass
 
+    @pytest.mark.parametrize("seed", range(40))
+    def test_stream_chunks_matches_chunk_text(self, processor, seed):
+        """Test that chunking random text streamed in random fragments reproduces chunking it whole."""
+        rng = random.Random(seed)
+        text = _random_text(rng, rng.randint(2000, 20000))
+        chunk_size = rng.choice([100, 300, 1000])
+        overlap = rng.randint(0, chunk_size // 2)
+        cuts = sorted(rng.sample(range(len(text)), rng.randint(1, 60)))
+        fragments = [text[start:end] for start, end in zip([0] + cuts, cuts + [len(text)])]
+
+        streamed = list(processor.stream_chunks(fragments, chunk_size=chunk_size, overlap=overlap))
+
+        assert streamed == processor.chunk_text(text, chunk_size=chunk_size, overlap=overlap)
+
+    def test_iter_text_txt(self, processor, sample_text_file):
+        """Test that streamed text fragments concatenate to the extracted text."""
+        fragments = list(processor.iter_text(str(sample_text_file)))
+
+        assert "".join(fragments) == processor.process_document(str(sample_text_file))
+
 
 class TestPDFExtractor:
     """Tests for the PDFExtractor class."""
@@ -141,6 +298,42 @@ class TestPDFExtractor:
         # TODO: Implement test
         pass
 
+    @pytest.fixture
+    def sample_pdf_file(self, test_files_dir):
+        """Create a multi-page PDF file for testing."""
+        import fitz
+
+        file_path = test_files_dir / "sample.pdf"
+        doc = fitz.open()
+        for i in range(20):
+            page = doc.new_page()
+            page.insert_text((72, 72), f"Page {i + 1} content")
+        doc.save(str(file_path))
+        doc.close()
+        return file_path
+
+    def test_extract_parallel_matches_serial(self, sample_pdf_file):
+        """Test that parallel extraction returns the serial text in page order."""
+        serial = PDFExtractor(workers=1).extract(str(sample_pdf_file))
+        parallel = PDFExtractor(workers=3, min_pages_per_worker=4).extract(str(sample_pdf_file))
+
+        assert parallel == serial
+        assert parallel.index("Page 2 content") < parallel.index("Page 20 content")
+
+    def test_extract_bytes_parallel_matches_serial(self, sample_pdf_file):
+        """Test that an in-memory PDF is split across workers without a temporary file."""
+        data = memoryview(sample_pdf_file.read_bytes())
+        serial = PDFExtractor(workers=1).extract(str(sample_pdf_file))
+
+        assert PDFExtractor(workers=3, min_pages_per_worker=4).extract_bytes(data) == serial
+
+    def test_page_ranges(self):
+        """Test that page ranges cover every page exactly once."""
+        extractor = PDFExtractor(workers=3, min_pages_per_worker=4)
+
+        assert extractor._page_ranges(20) == [(0, 7), (7, 14), (14, 20)]
+        assert extractor._page_ranges(5) == [(0, 5)]
+
 
 class TestDocxExtractor:
     """Tests for the DocxExtractor class."""
@@ -155,6 +348,45 @@ class TestDocxExtractor:
         # TODO: Implement test
         pass
 
+    @pytest.fixture
+    def sample_docx_file(self, test_files_dir):
+        """Create a DOCX file with paragraphs and a table."""
+        import docx
+
+        file_path = test_files_dir / "sample.docx"
+        doc = docx.Document()
+        doc.add_paragraph("Introduction\tto neural networks")
+        table = doc.add_table(rows=1, cols=2)
+        table.cell(0, 0).text = "Activation"
+        table.cell(0, 1).text = "ReLU"
+        doc.add_paragraph("Conclusion")
+        doc.save(str(file_path))
+        return file_path
+
+    def test_extract_streaming_includes_tables(self, extractor, sample_docx_file):
+        """Test that streaming extraction emits paragraphs and table cells in order."""
+        text = extractor.extract(str(sample_docx_file))
+
+        assert text == "Introduction\tto neural networks\n\nActivation\n\nReLU\n\nConclusion"
+
+    def test_extract_streaming_matches_python_docx_paragraphs(self, extractor, test_files_dir):
+        """Test that streaming extraction matches python-docx for paragraph-only documents."""
+        import docx
+
+        file_path = test_files_dir / "paragraphs.docx"
+        doc = docx.Document()
+        for i in range(50):
+            paragraph = doc.add_paragraph(f"Paragraph {i} ")
+            paragraph.add_run("bold").bold = True
+        doc.add_paragraph("")
+        doc.save(str(file_path))
+
+        assert extractor.extract(str(file_path)) == DocxExtractor(streaming=False).extract(str(file_path))
+
+    def test_iter_text_concatenates_to_extract(self, extractor, sample_docx_file):
+        """Test that streamed fragments concatenate to the extracted text."""
+        assert "".join(extractor.iter_text(str(sample_docx_file))) == extractor.extract(str(sample_docx_file))
+
 
 class TestTextExtractor:
     """Tests for the TextExtractor class."""
@@ -0,0 +1,56 @@
+"""
+Unit tests for the extraction cache module.
+"""
+import os
+import time
+
+import pytest
+
+from src.extraction_cache import ExtractionCache
+
+
+@pytest.fixture
+def cache(test_files_dir):
+    """Create an ExtractionCache in a temporary directory."""
+    return ExtractionCache(cache_dir=str(test_files_dir / "cache"), max_size_mb=1)
+
+
+def test_get_miss_then_hit(cache, sample_text_file):
+    """Test that a stored entry is returned and counted as a hit."""
+    key = cache.key_for_file(str(sample_text_file), chunk_size=1000)
+
+    assert cache.get(key) is None
+
+    cache.put(key, "content", ["chunk 1", "chunk 2"])
+
+    assert cache.get(key) == ("content", ["chunk 1", "chunk 2"])
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_key_depends_on_contents_and_params(cache, sample_text_file):
+    """Test that keys change with the file bytes and the extraction parameters."""
+    key = cache.key_for_file(str(sample_text_file), chunk_size=1000)
+
+    assert key == cache.key_for_bytes(sample_text_file.read_bytes(), chunk_size=1000)
+    assert key != cache.key_for_file(str(sample_text_file), chunk_size=500)
+    assert key != cache.key_for_bytes(b"other contents", chunk_size=1000)
+
+
+def test_evicts_least_recently_used(test_files_dir):
+    """Test that the least recently used entry is evicted first."""
+    cache = ExtractionCache(cache_dir=str(test_files_dir / "cache"), max_size_mb=0.03)
+    payload = os.urandom(12 * 1024).hex()
+
+    cache.put("a" * 64, payload, [])
+    time.sleep(0.01)
+    cache.put("b" * 64, payload, [])
+    # Make "a" the most recently used entry
+    time.sleep(0.01)
+    cache.get("a" * 64)
+    cache.put("c" * 64, payload, [])
+
+    assert cache.get("a" * 64) is not None
+    assert cache.get("b" * 64) is None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size_bytes"] <= cache.max_size_bytes
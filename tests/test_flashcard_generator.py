@@ -0,0 +1,274 @@
+"""
+Unit tests for the flashcard generator.
+These tests mock the OpenAI client to avoid actual API calls.
+"""
+import json
+import threading
+import time
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from src.flashcard_generator import FlashcardGenerator
+from src.rate_limit import TokenBucket
+
+
+def _fake_response(prompt: str, **kwargs) -> str:
+    """Return one card naming the first chunk in the prompt."""
+    marker = prompt.split("Chunk ")[1].split(":")[0]
+    return json.dumps([{"question": f"Q{marker}", "answer": f"A{marker}"}])
+
+
+@pytest.fixture
+def chunks():
+    """Provide numbered chunks."""
+    return [f"Chunk {i}: some lecture text." for i in range(15)]
+
+
+@pytest.fixture(autouse=True)
+def fixed_token_counts():
+    """Count every chunk and separator as 10 tokens so packing is predictable."""
+    with patch('src.flashcard_generator.count_tokens', return_value=10):
+        yield
+
+
+def _generator(**kwargs) -> FlashcardGenerator:
+    """Create a generator whose budget fits exactly three chunks per prompt."""
+    return FlashcardGenerator(context_token_budget=50, **kwargs)
+
+
+def test_generate_sequential(chunks):
+    """Test that sequential generation returns one card per batch in order."""
+    with patch('src.flashcard_generator.OpenAIClient') as mock_client_cls:
+        mock_client_cls.return_value.generate_flashcards.side_effect = _fake_response
+
+        generator = _generator()
+        cards = generator.generate(chunks)
+
+    assert [c["question"] for c in cards] == ["Q0", "Q3", "Q6", "Q9", "Q12"]
+    assert all(c["level"] == "intermediate" and c["tags"] == [] for c in cards)
+
+
+def test_generate_concurrent_keeps_order(chunks):
+    """Test that concurrent generation overlaps calls but keeps batch order."""
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def slow_response(prompt, **kwargs):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        # Earlier batches finish last
+        marker = int(prompt.split("Chunk ")[1].split(":")[0])
+        time.sleep(0.05 * (15 - marker) / 15)
+        with lock:
+            in_flight -= 1
+        return _fake_response(prompt)
+
+    with patch('src.flashcard_generator.OpenAIClient') as mock_client_cls:
+        mock_client_cls.return_value.generate_flashcards.side_effect = slow_response
+
+        generator = _generator(max_concurrency=5)
+        cards = generator.generate(chunks)
+
+    assert [c["question"] for c in cards] == ["Q0", "Q3", "Q6", "Q9", "Q12"]
+    assert peak > 1
+
+
+def test_generate_respects_request_rate(chunks):
+    """Test that the requests-per-minute limit spaces out calls."""
+    with patch('src.flashcard_generator.OpenAIClient') as mock_client_cls:
+        mock_client_cls.return_value.generate_flashcards.side_effect = _fake_response
+
+        # 600 rpm without bursting is one request every 0.1s
+        generator = _generator(max_concurrency=5, requests_per_minute=600)
+        generator.rate_limiter.requests = TokenBucket(600, capacity=1)
+
+        start = time.perf_counter()
+        generator.generate(chunks)
+        elapsed = time.perf_counter() - start
+
+    assert elapsed >= 0.35
+
+
+def test_generate_covers_whole_document():
+    """Test that chunks past the old 15-chunk cap still reach the model."""
+    chunks = [f"Chunk {i}: some lecture text." for i in range(40)]
+    with patch('src.flashcard_generator.OpenAIClient') as mock_client_cls:
+        mock_client_cls.return_value.generate_flashcards.side_effect = _fake_response
+
+        generator = _generator()
+        cards = generator.generate(chunks)
+
+    assert cards[-1]["question"] == "Q39"
+    coverage = generator.last_coverage
+    assert coverage.calls == 14
+    assert coverage.chunks_covered == coverage.chunks_total == 40
+    assert coverage.coverage == 1.0
+
+
+def test_pack_chunks():
+    """Test that packing fills prompts up to the budget and isolates oversized chunks."""
+    with patch('src.flashcard_generator.OpenAIClient'):
+        generator = _generator()
+
+    batches = generator.pack_chunks(["a"] * 5, token_counts=[10, 10, 30, 60, 10])
+
+    # 10 + (10 + 10) fits in 50, the 30-token chunk does not; 60 exceeds the budget alone
+    assert batches == [[0, 1], [2], [3], [4]]
+
+
+def test_build_prompt_includes_every_chunk():
+    """Test that the prompt is built from all packed chunks."""
+    with patch('src.flashcard_generator.OpenAIClient'):
+        prompt = FlashcardGenerator().build_prompt(["one", "two", "three", "four"])
+
+    assert "four" in prompt
+
+
+def _fake_stream(prompt: str, **kwargs):
+    """Stream the fake response a few characters at a time."""
+    text = "```json\n" + _fake_response(prompt) + "\n```"
+    for i in range(0, len(text), 4):
+        yield text[i:i + 4]
+
+
+def test_iter_generate_streams_cards(chunks):
+    """Test that iter_generate yields cards from streamed completions."""
+    with patch('src.flashcard_generator.OpenAIClient') as mock_client_cls:
+        mock_client_cls.return_value.stream_flashcards.side_effect = _fake_stream
+
+        generator = _generator()
+        iterator = generator.iter_generate(chunks)
+        first = next(iterator)
+        # Only the first batch has been requested so far
+        assert mock_client_cls.return_value.stream_flashcards.call_count == 1
+        cards = [first] + list(iterator)
+
+    assert [c["question"] for c in cards] == ["Q0", "Q3", "Q6", "Q9", "Q12"]
+    assert all(c["level"] == "intermediate" for c in cards)
+    assert generator.last_coverage.coverage == 1.0
+
+
+def test_iter_generate_counts_rejected_stream_once():
+    """Test that a streamed response whose cards all fail validation is counted once per attempt."""
+    with patch('src.flashcard_generator.OpenAIClient') as mock_client_cls:
+        mock_client_cls.return_value.request_body.return_value = {"model": "gpt-4o"}
+        mock_client_cls.return_value.stream_flashcards.side_effect = lambda prompt, **kwargs: iter(
+            ['[{"question": "Q"}, ', '{"answer": "A"}]']
+        )
+
+        generator = FlashcardGenerator()
+        cards = list(generator.iter_generate(["only chunk"]))
+
+    assert cards == []
+    stats = generator.parse_stats
+    assert (stats.responses, stats.parse_failures, stats.retries) == (2, 2, 1)
+    assert (stats.cards_accepted, stats.cards_rejected, stats.batches_failed) == (0, 4, 1)
+
+
+def test_iter_generate_concurrent_yields_every_card(chunks):
+    """Test that concurrent streaming yields every batch's cards."""
+    with patch('src.flashcard_generator.OpenAIClient') as mock_client_cls:
+        mock_client_cls.return_value.stream_flashcards.side_effect = _fake_stream
+
+        generator = _generator(max_concurrency=5)
+        cards = list(generator.iter_generate(chunks))
+
+    assert sorted(c["question"] for c in cards) == ["Q0", "Q12", "Q3", "Q6", "Q9"]
+    assert generator.last_coverage.chunks_covered == 15
+
+
+def test_parse_response_ignores_surrounding_text():
+    """Test that cards are recovered from a response wrapped in prose."""
+    with patch('src.flashcard_generator.OpenAIClient'):
+        generator = FlashcardGenerator()
+
+    text = 'Sure! Here are your cards:\n[{"question": "Q", "answer": "A [1]"}]\nGood luck {student}.'
+    assert generator.parse_response(text) == [{"question": "Q", "answer": "A [1]"}]
+
+
+def test_parse_response_accepts_structured_output():
+    """Test that a schema-constrained {"cards": [...]} response is unwrapped."""
+    with patch('src.flashcard_generator.OpenAIClient'):
+        generator = FlashcardGenerator()
+
+    text = '{"cards": [{"question": "Q", "answer": "A", "tags": []}]}'
+    assert generator.parse_response(text) == [{"question": "Q", "answer": "A", "tags": []}]
+
+
+def test_unparseable_batch_is_retried_not_faked():
+    """Test that a garbage response re-requests only that batch and adds no error card."""
+    responses = iter(["I cannot help with that.", json.dumps([{"question": "Q", "answer": "A"}])])
+    with patch('src.flashcard_generator.OpenAIClient') as mock_client_cls:
+        generate = mock_client_cls.return_value.generate_flashcards
+        generate.side_effect = lambda prompt, **kwargs: next(responses)
+
+        generator = FlashcardGenerator()
+        cards = generator.generate(["only chunk"])
+
+    assert [c["question"] for c in cards] == ["Q"]
+    assert generate.call_args_list[1].kwargs == {"refresh": True, "level": "intermediate"}
+    stats = generator.parse_stats
+    assert (stats.responses, stats.parse_failures, stats.retries) == (2, 1, 1)
+    assert stats.failure_rate == 0.5
+
+
+def test_failed_batch_drops_coverage_after_retries():
+    """Test that a batch failing every attempt yields no cards and no coverage."""
+    with patch('src.flashcard_generator.OpenAIClient') as mock_client_cls:
+        mock_client_cls.return_value.generate_flashcards.return_value = "not json"
+
+        generator = FlashcardGenerator(parse_retries=2)
+        cards = generator.generate(["only chunk"])
+
+    assert cards == []
+    assert mock_client_cls.return_value.generate_flashcards.call_count == 3
+    assert mock_client_cls.return_value.evict.call_count == 3
+    assert generator.parse_stats.batches_failed == 1
+    assert generator.last_coverage.chunks_covered == 0
+
+
+def test_cards_are_validated_individually():
+    """Test that one malformed card is rejected while its neighbours are kept."""
+    response = json.dumps([
+        {"question": "Q1", "answer": "A1", "tags": "a, b"},
+        {"question": "", "answer": "no question"},
+        {"front": "Q2", "back": "A2"},
+    ])
+    with patch('src.flashcard_generator.OpenAIClient') as mock_client_cls:
+        mock_client_cls.return_value.generate_flashcards.return_value = response
+
+        generator = FlashcardGenerator()
+        cards = generator.generate(["only chunk"])
+
+    assert cards == [
+        {"question": "Q1", "answer": "A1", "tags": ["a", "b"], "level": "intermediate"},
+        {"question": "Q2", "answer": "A2", "tags": [], "level": "intermediate"},
+    ]
+    stats = generator.parse_stats
+    assert (stats.cards_accepted, stats.cards_repaired, stats.cards_rejected) == (2, 2, 1)
+    assert stats.parse_failures == 0
+
+
+def test_card_deduplicator_drops_repeats_across_batches(chunks):
+    """Test that the same question from different batches is kept once."""
+    from src.dedup import CardDeduplicator
+
+    with patch('src.flashcard_generator.OpenAIClient') as mock_client_cls:
+        mock_client_cls.return_value.generate_flashcards.return_value = json.dumps(
+            [{"question": "What is YOLO?", "answer": "A detector."}]
+        )
+        mock_client_cls.return_value.stream_flashcards.side_effect = lambda prompt, **kwargs: iter(
+            [json.dumps([{"question": "Define YOLO.", "answer": "A detector."}])]
+        )
+
+        generator = _generator(card_deduplicator=CardDeduplicator())
+        cards = generator.generate(chunks)
+        streamed = list(generator.iter_generate(chunks))
+
+    assert [c["question"] for c in cards] == ["What is YOLO?"]
+    assert streamed == []
+    assert generator.card_deduplicator.stats.cards_dropped == 9
@@ -5,14 +5,26 @@ These tests mock the Supabase client to avoid actual API calls.
 import json
 import os
 import tempfile
+import threading
 import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock
 
+import httpx
 import pytest
 
+from src.retry import RetryPolicy
 from src.flashcards_db import (
+    BulkUpsertStats,
+    bulk_upsert_flashcards,
+    is_transient_error,
+    iter_flashcards_file,
     upsert_flashcards_from_json,
     get_flashcards,
+    iter_flashcards,
+    page_cursor,
+    record_reviews,
     get_flashcard_by_id,
     update_flashcard_stats
 )
@@ -86,6 +98,131 @@ def test_upsert_flashcards_nonexistent_file():
         upsert_flashcards_from_json('nonexistent_file.json')
 
 
+def _write_cards(path, count: int, jsonl: bool = False) -> None:
+    """Write count numbered flashcards as a JSON array or JSONL."""
+    cards = [{"question": f"Q{i}", "answer": f"A{i}", "tags": ["t"]} for i in range(count)]
+    with open(path, 'w') as f:
+        if jsonl:
+            f.write("\n".join(json.dumps(card) for card in cards) + "\n")
+        else:
+            json.dump(cards, f)
+
+
+def test_iter_flashcards_file_streams_json_and_jsonl(tmp_path):
+    """Test that JSON arrays and JSONL files are read card by card, skipping malformed lines."""
+    json_path = tmp_path / "cards.json"
+    _write_cards(json_path, 5)
+    jsonl_path = tmp_path / "cards.jsonl"
+    _write_cards(jsonl_path, 3, jsonl=True)
+    with open(jsonl_path, 'a') as f:
+        f.write("not json\n[1]\n")
+
+    assert [card["question"] for card in iter_flashcards_file(str(json_path))] == [f"Q{i}" for i in range(5)]
+    with patch('src.flashcards_db.READ_CHUNK_SIZE', 7):
+        assert len(list(iter_flashcards_file(str(json_path)))) == 5
+
+    stats = BulkUpsertStats()
+    assert len(list(iter_flashcards_file(str(jsonl_path), stats))) == 3
+    assert stats.invalid == 2
+
+
+def test_iter_flashcards_file_rejects_non_arrays(tmp_path):
+    """Test that a JSON file must hold a complete array."""
+    path = tmp_path / "cards.json"
+    path.write_text('{"question": "Q"}')
+    with pytest.raises(ValueError):
+        list(iter_flashcards_file(str(path)))
+
+    path.write_text('[{"question": "Q", "answer": "A"}, {"quest')
+    with pytest.raises(ValueError):
+        list(iter_flashcards_file(str(path)))
+
+
+def _upsert_client(send):
+    """Mock Supabase client whose upsert requests are answered by send(page, timeout)."""
+    def query(page):
+        session = SimpleNamespace(request=lambda method, url, json, timeout, **kwargs: send(json, timeout))
+        return SimpleNamespace(request=SimpleNamespace(
+            session=session, http_method="POST", path="http://supabase.test/rest/v1/flashcards",
+            json=page, params=None, headers={}, auth=None,
+        ))
+
+    mock_client = MagicMock()
+    mock_client.table.return_value.upsert.side_effect = query
+    return mock_client
+
+
+def _response(status_code: int, text: str = "[]") -> httpx.Response:
+    return httpx.Response(status_code, text=text,
+                          request=httpx.Request("POST", "http://supabase.test/rest/v1/flashcards"))
+
+
+def test_bulk_upsert_flashcards_pages_and_retries(tmp_path):
+    """Test that cards are upserted in pages and a failing page is retried on its own."""
+    path = tmp_path / "cards.json"
+    _write_cards(path, 23)
+    pages = []
+    failures = []
+    timeouts = set()
+
+    def send(page, timeout):
+        timeouts.add(timeout)
+        if page[0]["question"] == "Q10" and not failures:
+            failures.append(page)
+            return _response(503, '{"message": "upstream unavailable"}')
+        pages.append(page)
+        return _response(201)
+
+    with patch('src.flashcards_db.get_supabase_client', return_value=_upsert_client(send)):
+        stats = bulk_upsert_flashcards(str(path), page_size=5, max_workers=3,
+                                       retry_policy=RetryPolicy(base_delay=0, timeout=7.5))
+
+    assert sorted(len(page) for page in pages) == [3, 5, 5, 5, 5]
+    assert sorted(card["question"] for page in pages for card in page) == sorted(f"Q{i}" for i in range(23))
+    assert all(card["id"] and card["created_at"] for page in pages for card in page)
+    # The retried page keeps the IDs it was given on the first attempt
+    assert [card["id"] for card in failures[0]] == [card["id"] for page in pages if page[0]["question"] == "Q10"
+                                                     for card in page]
+    assert (stats.rows, stats.pages, stats.retries, stats.failed_pages) == (23, 5, 1, 0)
+    assert stats.rows_per_second > 0
+    assert timeouts == {7.5}
+
+
+def test_bulk_upsert_flashcards_reports_failed_pages(tmp_path):
+    """Test that a page rejected by the server is reported, not retried, while the other pages are uploaded."""
+    path = tmp_path / "cards.jsonl"
+    _write_cards(path, 10, jsonl=True)
+    attempts = []
+
+    def send(page, timeout):
+        attempts.append(page[0]["question"])
+        if page[0]["question"] == "Q0":
+            return _response(413, '{"message": "request entity too large"}')
+        return _response(201)
+
+    with patch('src.flashcards_db.get_supabase_client', return_value=_upsert_client(send)):
+        stats = bulk_upsert_flashcards(str(path), page_size=4, retry_policy=RetryPolicy(base_delay=0))
+
+    assert (stats.rows, stats.pages, stats.failed_rows, stats.failed_pages) == (6, 2, 4, 1)
+    assert attempts.count("Q0") == 1
+    assert stats.retries == 0
+    assert "413" in stats.errors[0] and "request entity too large" in stats.errors[0]
+
+
+@pytest.mark.parametrize("exc, transient", [
+    (httpx.ConnectError("connection refused"), True),
+    (httpx.ReadTimeout("timed out"), True),
+    (httpx.HTTPStatusError("", request=None, response=_response(429)), True),
+    (httpx.HTTPStatusError("", request=None, response=_response(502)), True),
+    (httpx.HTTPStatusError("", request=None, response=_response(409)), False),
+    (httpx.HTTPStatusError("", request=None, response=_response(400)), False),
+    (ValueError("bad row"), False),
+])
+def test_is_transient_error(exc, transient):
+    """Test that only connection errors, timeouts, 408/429 and 5xx responses are retried."""
+    assert is_transient_error(exc) is transient
+
+
 def test_get_flashcards():
     """Test retrieving flashcards with various filters."""
     with patch('src.flashcards_db.get_supabase_client') as mock_get_client:
@@ -102,12 +239,18 @@ def test_get_flashcards():
         mock_eq = MagicMock()
         mock_select.eq.return_value = mock_eq
 
-        mock_range = MagicMock()
-        mock_eq.range.return_value = mock_range
-        mock_select.range.return_value = mock_range
+        mock_or = MagicMock()
+        mock_eq.or_.return_value = mock_or
+
+        mock_order = MagicMock()
+        mock_or.order.return_value = mock_order
+        mock_order.order.return_value = mock_order
+
+        mock_limit = MagicMock()
+        mock_order.limit.return_value = mock_limit
 
         mock_execute = MagicMock()
-        mock_range.execute.return_value = mock_execute
+        mock_limit.execute.return_value = mock_execute
 
         # Set up mock data
         mock_execute.data = [
@@ -121,18 +264,99 @@ def test_get_flashcards():
         ]
 
         # Call the function
-        result = get_flashcards(limit=10, offset=0, level="intermediate", tags=["test"])
+        result = get_flashcards(limit=10, offset=0, level="intermediate", tags=["test", "a,b"])
 
         # Verify behavior
         mock_client.table.assert_called_once_with('flashcards')
         mock_table.select.assert_called_once_with('*')
         mock_select.eq.assert_called_once_with('level', 'intermediate')
+        # Tags are filtered on the server with JSONB containment, quoted for PostgREST
+        mock_eq.or_.assert_called_once_with('tags.cs."[\\"test\\"]",tags.cs."[\\"a,b\\"]"')
+        mock_or.order.assert_called_once_with('created_at')
+        mock_order.order.assert_called_once_with('id')
+        mock_order.limit.assert_called_once_with(10)
+        mock_order.range.assert_not_called()
 
         # Verify the result
         assert len(result) == 1
         assert "test" in result[0]["tags"]
 
 
+def test_get_flashcards_keyset_pagination():
+    """Test that a cursor seeks past the previous page instead of using an offset."""
+    with patch('src.flashcards_db.get_supabase_client') as mock_get_client:
+        mock_query = MagicMock()
+        mock_get_client.return_value.table.return_value.select.return_value = mock_query
+        for method in ('contains', 'or_', 'order', 'limit'):
+            getattr(mock_query, method).return_value = mock_query
+        mock_query.execute.return_value.data = [{"id": "c2", "created_at": "2024-05-01T10:00:00+00:00"}]
+
+        cards = get_flashcards(limit=2, tags=["attention", "nlp"], match_all_tags=True,
+                               after=("2024-05-01T09:00:00+00:00", "c1"))
+
+        mock_query.contains.assert_called_once_with('tags', '["attention", "nlp"]')
+        mock_query.or_.assert_called_once_with(
+            'created_at.gt."2024-05-01T09:00:00+00:00",'
+            'and(created_at.eq."2024-05-01T09:00:00+00:00",id.gt."c1")'
+        )
+        mock_query.limit.assert_called_once_with(2)
+        mock_query.range.assert_not_called()
+        assert page_cursor(cards) == ("2024-05-01T10:00:00+00:00", "c2")
+        assert page_cursor([]) is None
+
+
+def _table(count: int) -> list:
+    """Return count cards in (created_at, id) order."""
+    return [{"id": f"id{i:03d}", "created_at": f"2024-05-01T10:00:{i // 10:02d}+00:00", "question": f"Q{i}"}
+            for i in range(count)]
+
+
+def _fake_get_flashcards(rows: list):
+    """Return a get_flashcards stand-in that pages through rows by cursor."""
+    def fake(limit, after=None, columns=None, **filters):
+        start = 0 if after is None else next(i for i, row in enumerate(rows)
+                                             if (row["created_at"], row["id"]) == after) + 1
+        return [{column: row[column] for column in columns} if columns else row for row in rows[start:start + limit]]
+    return fake
+
+
+def test_iter_flashcards_pages_by_cursor():
+    """Test that every row is yielded once, with cursor columns added to the projection."""
+    rows = _table(25)
+    with patch('src.flashcards_db.get_flashcards', side_effect=_fake_get_flashcards(rows)) as mock_get:
+        cards = list(iter_flashcards({"tags": ["t"]}, columns=["question"], page_size=10))
+
+    assert [card["question"] for card in cards] == [row["question"] for row in rows]
+    assert mock_get.call_count == 3
+    assert mock_get.call_args_list[0].kwargs == {
+        "limit": 10, "after": None, "columns": ["question", "created_at", "id"], "tags": ["t"],
+    }
+    assert mock_get.call_args_list[2].kwargs["after"] == (rows[19]["created_at"], "id019")
+
+
+def test_iter_flashcards_prefetches_next_page():
+    """Test that the next page is requested while the caller is still on the current one."""
+    fake = _fake_get_flashcards(_table(20))
+    second_page_requested = threading.Event()
+
+    def fetch(**kwargs):
+        if kwargs["after"] is not None:
+            second_page_requested.set()
+        return fake(**kwargs)
+
+    with patch('src.flashcards_db.get_flashcards', side_effect=fetch):
+        cards = iter_flashcards(page_size=10)
+        next(cards)
+        assert second_page_requested.wait(timeout=5)
+        assert len(list(cards)) == 19
+
+
+def test_iter_flashcards_rejects_unknown_filters():
+    """Test that misspelled filters fail instead of silently matching everything."""
+    with pytest.raises(ValueError):
+        list(iter_flashcards({"tag": ["t"]}))
+
+
 def test_get_flashcard_by_id():
     """Test retrieving a single flashcard by ID."""
     test_id = str(uuid.uuid4())
@@ -214,46 +438,22 @@ def test_update_flashcard_stats_new_record():
     flashcard_id = str(uuid.uuid4())
     user_id = str(uuid.uuid4())
 
-    with patch('src.flashcards_db.get_supabase_client') as mock_get_client, \
-         patch('src.flashcards_db.uuid.uuid4') as mock_uuid:
-        # Set up the UUID mock
-        mock_uuid_value = uuid.uuid4()
-        mock_uuid.return_value = mock_uuid_value
-
+    with patch('src.flashcards_db.get_supabase_client') as mock_get_client:
         # Set up the client mock
         mock_client = MagicMock()
         mock_get_client.return_value = mock_client
 
-        # Mock for checking existing record
-        mock_table = MagicMock()
-        mock_client.table.return_value = mock_table
-
-        mock_select = MagicMock()
-        mock_table.select.return_value = mock_select
-
-        mock_eq1 = MagicMock()
-        mock_select.eq.return_value = mock_eq1
+        # Mock for the atomic upsert function
+        mock_rpc = MagicMock()
+        mock_client.rpc.return_value = mock_rpc
 
-        mock_eq2 = MagicMock()
-        mock_eq1.eq.return_value = mock_eq2
-
-        mock_execute1 = MagicMock()
-        mock_eq2.execute.return_value = mock_execute1
-
-        # Set up mock data for not found
-        mock_execute1.data = []
-
-        # Mock for inserting new record
-        mock_insert = MagicMock()
-        mock_table.insert.return_value = mock_insert
-
-        mock_execute2 = MagicMock()
-        mock_insert.execute.return_value = mock_execute2
+        mock_execute = MagicMock()
+        mock_rpc.execute.return_value = mock_execute
 
-        # Set up mock data for insert result
-        mock_execute2.data = [
+        # Set up mock data for the created record
+        mock_execute.data = [
             {
-                "id": str(mock_uuid_value),
+                "id": str(uuid.uuid4()),
                 "flashcard_id": flashcard_id,
                 "user_id": user_id,
                 "correct_count": 1,
@@ -264,12 +464,12 @@ def test_update_flashcard_stats_new_record():
         # Call the function
         result = update_flashcard_stats(flashcard_id, user_id, True)
 
-        # Verify behavior for checking existing record
-        mock_client.table.assert_called_with('user_flashcard_stats')
-        mock_table.select.assert_called_once_with('*')
-
-        # Verify behavior for inserting new record
-        mock_table.insert.assert_called_once()
+        # Verify a single round trip, with no read before the write
+        mock_client.rpc.assert_called_once_with('record_flashcard_reviews', {'reviews': [
+            {'flashcard_id': flashcard_id, 'user_id': user_id, 'is_correct': True, 'studied_at': None}
+        ]})
+        mock_rpc.execute.assert_called_once()
+        mock_client.table.assert_not_called()
 
         # Verify the result
         assert result["flashcard_id"] == flashcard_id
@@ -289,45 +489,15 @@ def test_update_flashcard_stats_existing_record():
         mock_client = MagicMock()
         mock_get_client.return_value = mock_client
 
-        # Mock for checking existing record
-        mock_table = MagicMock()
-        mock_client.table.return_value = mock_table
-
-        mock_select = MagicMock()
-        mock_table.select.return_value = mock_select
+        # Mock for the atomic upsert function
+        mock_rpc = MagicMock()
+        mock_client.rpc.return_value = mock_rpc
 
-        mock_eq1 = MagicMock()
-        mock_select.eq.return_value = mock_eq1
-
-        mock_eq2 = MagicMock()
-        mock_eq1.eq.return_value = mock_eq2
-
-        mock_execute1 = MagicMock()
-        mock_eq2.execute.return_value = mock_execute1
-
-        # Set up mock data for existing record
-        mock_execute1.data = [
-            {
-                "id": record_id,
-                "flashcard_id": flashcard_id,
-                "user_id": user_id,
-                "correct_count": 2,
-                "incorrect_count": 1,
-            }
-        ]
-
-        # Mock for updating existing record
-        mock_update = MagicMock()
-        mock_table.update.return_value = mock_update
-
-        mock_eq3 = MagicMock()
-        mock_update.eq.return_value = mock_eq3
-
-        mock_execute2 = MagicMock()
-        mock_eq3.execute.return_value = mock_execute2
+        mock_execute = MagicMock()
+        mock_rpc.execute.return_value = mock_execute
 
-        # Set up mock data for update result
-        mock_execute2.data = [
+        # Set up mock data for the incremented record
+        mock_execute.data = [
             {
                 "id": record_id,
                 "flashcard_id": flashcard_id,
@@ -340,12 +510,10 @@ def test_update_flashcard_stats_existing_record():
         # Call the function
         result = update_flashcard_stats(flashcard_id, user_id, False)
 
-        # Verify behavior for checking existing record
-        mock_client.table.assert_called_with('user_flashcard_stats')
-        mock_table.select.assert_called_once_with('*')
-
-        # Verify behavior for updating existing record
-        mock_table.update.assert_called_once()
+        # Verify behavior: the increment happens in the database function
+        mock_client.rpc.assert_called_once()
+        assert mock_client.rpc.call_args.args[1]['reviews'][0]['is_correct'] is False
+        mock_client.table.assert_not_called()
 
         # Verify the result
         assert result["id"] == record_id
@@ -353,3 +521,41 @@ def test_update_flashcard_stats_existing_record():
         assert result["user_id"] == user_id
         assert result["correct_count"] == 2
         assert result["incorrect_count"] == 2
+
+
+def test_record_reviews_sends_one_request():
+    """Test that a batch of answers is applied through one RPC call."""
+    user_id = uuid.uuid4()
+    studied_at = datetime(2024, 5, 1, 9, 30, tzinfo=timezone.utc)
+    batch = [
+        {"flashcard_id": "card-1", "user_id": user_id, "is_correct": True, "studied_at": studied_at},
+        {"flashcard_id": "card-1", "user_id": user_id, "is_correct": False},
+        {"flashcard_id": "card-2", "user_id": user_id, "is_correct": True, "studied_at": "2024-05-01T09:31:00Z"},
+    ]
+
+    with patch('src.flashcards_db.get_supabase_client') as mock_get_client:
+        mock_client = mock_get_client.return_value
+        mock_client.rpc.return_value.execute.return_value.data = [{"flashcard_id": "card-1"}, {"flashcard_id": "card-2"}]
+
+        result = record_reviews(iter(batch))
+
+    mock_client.rpc.assert_called_once()
+    name, params = mock_client.rpc.call_args.args
+    assert name == 'record_flashcard_reviews'
+    assert [review['studied_at'] for review in params['reviews']] == [
+        "2024-05-01T09:30:00+00:00", None, "2024-05-01T09:31:00Z",
+    ]
+    assert all(review['user_id'] == str(user_id) for review in params['reviews'])
+    assert len(result) == 2
+
+
+def test_record_reviews_validates_answers():
+    """Test that malformed answers are rejected before any request, and empty batches are free."""
+    with patch('src.flashcards_db.get_supabase_client') as mock_get_client:
+        with pytest.raises(ValueError):
+            record_reviews([{"flashcard_id": "card-1", "is_correct": True}])
+        with pytest.raises(ValueError):
+            record_reviews([{"flashcard_id": "card-1", "user_id": "u", "is_correct": "yes"}])
+        assert record_reviews([]) == []
+
+    mock_get_client.assert_not_called()
@@ -0,0 +1,49 @@
+"""
+Startup regression tests.
+These tests check that entry points don't import heavy optional libraries
+until they are actually needed.
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ["fitz", "pymupdf", "docx", "pptx", "openai", "supabase", "langchain_text_splitters"]
+
+
+def _imported_modules(module: str) -> set:
+    """Import a module in a fresh interpreter and return the names in sys.modules."""
+    result = subprocess.run(
+        [sys.executable, "-c", f"import sys, {module}; print('\\n'.join(sys.modules))"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(result.stdout.split())
+
+
+@pytest.mark.parametrize("module", ["src.document", "src.cli", "src.generate_and_upload"])
+def test_entry_points_import_lazily(module):
+    """Test that importing an entry point doesn't load format or API libraries."""
+    loaded = _imported_modules(module)
+
+    assert not loaded.intersection(HEAVY_MODULES)
+
+
+def test_text_extraction_skips_pdf_and_docx_libraries(tmp_path):
+    """Test that processing a .txt file only loads what the text extractor needs."""
+    file_path = tmp_path / "notes.txt"
+    file_path.write_text("Backpropagation notes\n")
+    script = (
+        "import sys\n"
+        "from src.document import DocumentProcessor\n"
+        f"DocumentProcessor().process_document({str(file_path)!r})\n"
+        "print('\\n'.join(sys.modules))\n"
+    )
+
+    result = subprocess.run([sys.executable, "-c", script], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+
+    assert not set(result.stdout.split()).intersection(["fitz", "pymupdf", "docx", "pptx"])
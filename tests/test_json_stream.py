@@ -0,0 +1,47 @@
+"""
+Unit tests for incremental JSON array parsing.
+"""
+import json
+
+import pytest
+
+from src.json_stream import JSONArrayStream, iter_array_objects
+
+CARDS = [
+    {"question": 'What does "}" close?', "answer": "An object \\ in JSON", "tags": ["json", "[syntax]"]},
+    {"question": "Nested?", "answer": {"parts": [1, {"deep": True}]}, "tags": []},
+]
+
+
+@pytest.mark.parametrize("piece_size", [1, 2, 5, 13, 10000])
+def test_objects_survive_any_split(piece_size):
+    """Test that objects parse the same however the text is split."""
+    text = "Here you go:\n```json\n" + json.dumps(CARDS) + "\n```"
+    pieces = [text[i:i + piece_size] for i in range(0, len(text), piece_size)]
+
+    assert list(iter_array_objects(pieces)) == CARDS
+
+
+def test_object_emitted_when_its_brace_arrives():
+    """Test that each object is returned by the feed that completes it."""
+    parser = JSONArrayStream()
+
+    assert parser.feed('[{"question": "A"}, {"quest') == [{"question": "A"}]
+    assert parser.feed('ion": "B"}') == [{"question": "B"}]
+    assert parser.feed("]") == []
+    assert parser.done
+
+
+def test_malformed_object_is_skipped():
+    """Test that one bad object does not lose its neighbours."""
+    parser = JSONArrayStream()
+
+    cards = parser.feed('[{"question": "A"}, {"question": "B",}, {"question": "C"}]')
+
+    assert cards == [{"question": "A"}, {"question": "C"}]
+    assert parser.errors == 1
+
+
+def test_text_after_array_is_ignored():
+    """Test that parsing stops at the closing bracket."""
+    assert list(iter_array_objects(['[{"a": 1}] and then {"b": 2}'])) == [{"a": 1}]
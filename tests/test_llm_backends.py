@@ -0,0 +1,127 @@
+"""
+Unit tests for the LLM backends.
+The fake backend runs in-process; the OpenAI backend uses a mocked SDK client.
+"""
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.batch_jobs import respond_with
+from src.flashcard_generator import FlashcardGenerator
+from src.llm_backends import FakeLLMBackend, FakeLLMError, FakeLLMTimeout, OpenAIBackend
+from src.metrics import MetricsRegistry
+from src.model import OpenAIClient
+from src.retry import RetryPolicy
+
+REQUEST = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "Chunk 1: attention."}]}
+
+
+def test_fake_backend_returns_deterministic_cards():
+    """Test that the same prompt always gets the same valid cards, with token usage."""
+    backend = FakeLLMBackend(cards_per_response=3)
+
+    first = backend.complete(**REQUEST)
+    second = FakeLLMBackend(cards_per_response=3).complete(**REQUEST)
+
+    cards = json.loads(first.content)
+    assert first.content == second.content
+    assert len(cards) == 3
+    assert all(card["question"] and card["answer"] and card["tags"] for card in cards)
+    assert first.usage.prompt_tokens > 0 and first.usage.completion_tokens > 0
+
+
+def test_fake_backend_honours_response_format():
+    """Test that structured-output requests get a {"cards": [...]} object."""
+    content = FakeLLMBackend(cards_per_response=2).complete(response_format={"type": "json_schema"}, **REQUEST).content
+
+    assert len(json.loads(content)["cards"]) == 2
+
+
+def test_fake_backend_streams_the_same_text():
+    """Test that a stream's pieces join to the complete response and end with usage."""
+    backend = FakeLLMBackend(stream_piece_chars=10)
+
+    events = list(backend.stream(**REQUEST))
+
+    assert "".join(event.content for event in events[:-1]) == backend.complete(**REQUEST).content
+    assert all(len(event.content) <= 10 for event in events[:-1])
+    assert events[-1].usage is not None
+
+
+def test_fake_backend_injects_errors_and_timeouts():
+    """Test that injected errors are transient and latencies past the timeout raise."""
+    failing = FakeLLMBackend(error_rate=1.0, error_status=503, retry_after=2)
+    with pytest.raises(FakeLLMError) as excinfo:
+        failing.complete(**REQUEST)
+    assert failing.is_transient(excinfo.value)
+    assert excinfo.value.response.headers == {"retry-after": "2"}
+    assert not failing.is_transient(FakeLLMError(400))
+
+    slow = FakeLLMBackend(latency=0.05)
+    with pytest.raises(FakeLLMTimeout):
+        slow.complete(timeout=0.01, **REQUEST)
+    assert slow.is_transient(FakeLLMTimeout())
+
+
+def test_fake_backend_error_rate_is_seeded():
+    """Test that the fraction of failed calls follows error_rate and the seed."""
+    def failures(seed):
+        backend = FakeLLMBackend(error_rate=0.3, seed=seed)
+        for _ in range(500):
+            try:
+                backend.complete(**REQUEST)
+            except FakeLLMError:
+                pass
+        return backend.errors
+
+    assert failures(7) == failures(7)
+    assert 100 < failures(7) < 200
+
+
+def test_generator_runs_end_to_end_on_fake_backend():
+    """Test that generation retries injected errors and records usage from the fake backend."""
+    metrics = MetricsRegistry()
+    client = OpenAIClient(
+        backend=FakeLLMBackend(error_rate=0.3, cards_per_response=2, seed=1),
+        retry_policy=RetryPolicy(max_retries=10, base_delay=0),
+        metrics=metrics,
+    )
+    generator = FlashcardGenerator(max_concurrency=4, context_token_budget=30, openai_client=client)
+    chunks = [f"Chunk {i}: topic number {i} explained in a sentence." for i in range(12)]
+
+    cards = generator.generate(chunks)
+
+    assert cards and generator.parse_stats.batches_failed == 0
+    assert client.retry_policy.retries == client.backend.errors > 0
+    assert sum(entry["value"] for entry in metrics.summary()["llm_prompt_tokens_total"]) > 0
+
+
+def test_openai_backend_wraps_sdk_responses():
+    """Test that SDK responses and stream events are converted, including usage."""
+    sdk = MagicMock()
+    sdk.chat.completions.create.return_value = MagicMock(
+        choices=[MagicMock(message=MagicMock(content="[]"))],
+        usage=MagicMock(prompt_tokens=5, completion_tokens=7),
+    )
+    completion = OpenAIBackend(sdk).complete(timeout=3, **REQUEST)
+    assert completion.content == "[]"
+    assert completion.usage.total_tokens == 12
+    assert sdk.chat.completions.create.call_args.kwargs["timeout"] == 3
+
+    sdk.chat.completions.create.return_value = [
+        MagicMock(choices=[MagicMock(delta=MagicMock(content="[]"))], usage=None),
+        MagicMock(choices=[], usage=MagicMock(prompt_tokens=5, completion_tokens=1)),
+    ]
+    events = list(OpenAIBackend(sdk).stream(**REQUEST))
+    assert [event.content for event in events] == ["[]", None]
+    assert events[1].usage.completion_tokens == 1
+    assert sdk.chat.completions.create.call_args.kwargs["stream_options"] == {"include_usage": True}
+
+
+def test_respond_with_builds_chat_completion_bodies():
+    """Test that a backend can answer local batch jobs."""
+    body = respond_with(FakeLLMBackend(cards_per_response=1))(REQUEST)
+
+    assert len(json.loads(body["choices"][0]["message"]["content"])) == 1
+    assert body["usage"]["total_tokens"] == body["usage"]["prompt_tokens"] + body["usage"]["completion_tokens"]
@@ -0,0 +1,184 @@
+"""
+Unit tests for the LLM response cache.
+These tests mock the OpenAI SDK to avoid actual API calls.
+"""
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from src.llm_cache import ResponseCache
+from src.model import OpenAIClient
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Provide a response cache in a temporary directory."""
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"))
+    yield cache
+    cache.close()
+
+
+def _messages(prompt: str) -> list:
+    """Build a minimal chat message list."""
+    return [{"role": "user", "content": prompt}]
+
+
+def test_key_depends_on_model_messages_and_temperature():
+    """Test that every keyed field changes the hash."""
+    base = ResponseCache.key("gpt-4", _messages("a"), 0.2)
+
+    assert base == ResponseCache.key("gpt-4", _messages("a"), 0.2)
+    assert base != ResponseCache.key("gpt-4o", _messages("a"), 0.2)
+    assert base != ResponseCache.key("gpt-4", _messages("b"), 0.2)
+    assert base != ResponseCache.key("gpt-4", _messages("a"), 0.7)
+
+
+def test_get_put_and_counters(cache):
+    """Test hits, misses and the hit rate."""
+    key = ResponseCache.key("gpt-4", _messages("a"), 0.2)
+
+    assert cache.get(key) is None
+    cache.put(key, "[]")
+    assert cache.get(key) == "[]"
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+    assert stats["entries"] == 1
+
+
+def test_persists_across_instances(tmp_path):
+    """Test that responses survive reopening the database."""
+    path = str(tmp_path / "responses.sqlite3")
+    first = ResponseCache(path)
+    first.put("k", "cached")
+    first.close()
+
+    second = ResponseCache(path)
+    assert second.get("k") == "cached"
+    second.close()
+
+
+def test_expired_entries_are_misses(tmp_path):
+    """Test that entries older than the TTL are dropped."""
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"), ttl_seconds=60)
+    with patch('src.llm_cache.time.time', return_value=1000.0):
+        cache.put("k", "old")
+    with patch('src.llm_cache.time.time', return_value=1061.0):
+        assert cache.get("k") is None
+
+    assert cache.stats()["entries"] == 0
+    cache.close()
+
+
+def test_evicts_least_recently_used(tmp_path):
+    """Test that the oldest accessed entries are evicted past max_entries."""
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"), ttl_seconds=None, max_entries=2)
+    with patch('src.llm_cache.time.time', return_value=1.0):
+        cache.put("a", "A")
+    with patch('src.llm_cache.time.time', return_value=2.0):
+        cache.put("b", "B")
+    with patch('src.llm_cache.time.time', return_value=3.0):
+        cache.get("a")
+    with patch('src.llm_cache.time.time', return_value=4.0):
+        cache.put("c", "C")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+    assert cache.stats()["evictions"] == 1
+    cache.close()
+
+
+def _client(cache, bypass_cache=False) -> tuple:
+    """Create an OpenAIClient whose SDK returns a fixed completion."""
+    sdk = MagicMock()
+    sdk.chat.completions.create.return_value.choices = [MagicMock(message=MagicMock(content='[{"question": "Q"}]'))]
+    with patch('openai.OpenAI', return_value=sdk):
+        client = OpenAIClient(cache=cache, bypass_cache=bypass_cache)
+    return client, sdk.chat.completions.create
+
+
+def test_client_serves_repeat_prompts_from_cache(cache):
+    """Test that an identical prompt does not call the API twice."""
+    client, create = _client(cache)
+
+    first = client.generate_flashcards("prompt", model="gpt-4")
+    second = client.generate_flashcards("prompt", model="gpt-4")
+
+    assert first == second == '[{"question": "Q"}]'
+    assert create.call_count == 1
+
+    client.generate_flashcards("prompt", model="gpt-4o")
+    assert create.call_count == 2
+
+
+def test_client_bypass_refreshes_cache(cache):
+    """Test that bypass_cache calls the API but still stores the response."""
+    client, create = _client(cache, bypass_cache=True)
+
+    client.generate_flashcards("prompt", model="gpt-4")
+    client.generate_flashcards("prompt", model="gpt-4")
+    assert create.call_count == 2
+    assert cache.stats()["hits"] == 0
+
+    cached_client, cached_create = _client(cache)
+    cached_client.generate_flashcards("prompt", model="gpt-4")
+    assert cached_create.call_count == 0
+
+
+def test_stream_is_cached_whole(cache):
+    """Test that a completed stream is cached and replayed in one piece."""
+    sdk = MagicMock()
+    events = [MagicMock(choices=[MagicMock(delta=MagicMock(content=piece))]) for piece in ("[", "{}", "]")]
+    sdk.chat.completions.create.return_value = iter(events)
+    with patch('openai.OpenAI', return_value=sdk):
+        client = OpenAIClient(cache=cache)
+
+    assert list(client.stream_flashcards("prompt", model="gpt-4")) == ["[", "{}", "]"]
+    assert list(client.stream_flashcards("prompt", model="gpt-4")) == ["[{}]"]
+    assert sdk.chat.completions.create.call_count == 1
+    assert client.generate_flashcards("prompt", model="gpt-4") == "[{}]"
+
+
+def test_structured_output_sends_schema_and_keys_cache(cache):
+    """Test that structured mode requests the schema and caches separately."""
+    plain, plain_create = _client(cache)
+    plain.generate_flashcards("prompt", model="gpt-4")
+
+    sdk = MagicMock()
+    sdk.chat.completions.create.return_value.choices = [MagicMock(message=MagicMock(content='{"cards": []}'))]
+    with patch('openai.OpenAI', return_value=sdk):
+        structured = OpenAIClient(cache=cache, structured_output=True)
+
+    assert structured.generate_flashcards("prompt", model="gpt-4") == '{"cards": []}'
+    kwargs = sdk.chat.completions.create.call_args.kwargs
+    assert kwargs["response_format"]["json_schema"]["name"] == "flashcards"
+
+
+def test_refresh_skips_cached_response(cache):
+    """Test that refresh=True calls the API despite a cached response."""
+    client, create = _client(cache)
+
+    client.generate_flashcards("prompt", model="gpt-4")
+    client.generate_flashcards("prompt", model="gpt-4", refresh=True)
+
+    assert create.call_count == 2
+
+
+def test_unparseable_response_is_not_replayed(cache):
+    """Test that a response the generator could not parse is evicted, so a rerun asks again."""
+    from src.flashcard_generator import FlashcardGenerator
+
+    client, create = _client(cache)
+    create.return_value.choices = [MagicMock(message=MagicMock(content="I cannot help with that."))]
+    FlashcardGenerator(openai_client=client, parse_retries=0).generate(["only chunk"])
+    assert cache.stats()["entries"] == 0
+
+    create.return_value.choices = [MagicMock(message=MagicMock(content='[{"question": "Q", "answer": "A"}]'))]
+    cards = FlashcardGenerator(openai_client=client, parse_retries=0).generate(["only chunk"])
+
+    assert [c["question"] for c in cards] == ["Q"]
+    assert create.call_count == 2
+    assert cache.stats()["entries"] == 1
@@ -0,0 +1,117 @@
+"""
+Unit tests for LLM call metrics.
+The OpenAI client tests run against the local stub server in benchmarks/.
+"""
+import json
+from unittest.mock import patch
+
+import pytest
+
+from benchmarks.stub_openai_server import start_stub_server
+from src.flashcard_generator import FlashcardGenerator
+from src.metrics import Histogram, MetricsRegistry
+from src.model import OpenAIClient
+from src.retry import RetryPolicy
+
+
+def test_histogram_buckets_and_quantiles():
+    """Test bucket counts and bucket-bound quantile estimates."""
+    histogram = Histogram(buckets=(1.0, 2.0))
+    for value in (0.5, 0.7, 1.5, 3.0):
+        histogram.observe(value)
+
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.sum == pytest.approx(5.7)
+    assert histogram.quantile(0.5) == 1.0
+    assert histogram.quantile(0.75) == 2.0
+    assert histogram.quantile(1.0) == float("inf")
+    assert Histogram().quantile(0.5) is None
+
+
+def test_record_llm_call_tracks_tokens_and_cost():
+    """Test that usage and estimated cost are recorded per model and level."""
+    metrics = MetricsRegistry(prices={"gpt-4o": (2.0, 10.0)})
+
+    metrics.record_llm_call("gpt-4o", "beginner", 0.3, prompt_tokens=1000, completion_tokens=500)
+    metrics.record_llm_call("gpt-4o", "beginner", 0.0, outcome="cache_hit")
+
+    labels = {"model": "gpt-4o", "level": "beginner"}
+    assert metrics.counter("llm_requests_total", outcome="ok", **labels) == 1
+    assert metrics.counter("llm_requests_total", outcome="cache_hit", **labels) == 1
+    assert metrics.counter("llm_prompt_tokens_total", **labels) == 1000
+    assert metrics.counter("llm_cost_usd_total", **labels) == pytest.approx(0.007)
+    assert metrics.histogram("llm_request_duration_seconds", **labels).count == 1
+
+
+def test_prometheus_text_format():
+    """Test counter and cumulative histogram exposition."""
+    metrics = MetricsRegistry(buckets=(1.0,))
+    metrics.inc("llm_retries_total", model="gpt-4", level="advanced", reason='Rate"Limit')
+    metrics.observe("llm_request_duration_seconds", 0.5, model="gpt-4", level="advanced")
+    metrics.observe("llm_request_duration_seconds", 2.5, model="gpt-4", level="advanced")
+
+    text = metrics.to_prometheus()
+
+    assert "# TYPE llm_retries_total counter" in text
+    assert 'llm_retries_total{level="advanced",model="gpt-4",reason="Rate\\"Limit"} 1' in text
+    assert "# TYPE llm_request_duration_seconds histogram" in text
+    assert 'llm_request_duration_seconds_bucket{level="advanced",model="gpt-4",le="1"} 1' in text
+    assert 'llm_request_duration_seconds_bucket{level="advanced",model="gpt-4",le="+Inf"} 2' in text
+    assert 'llm_request_duration_seconds_count{level="advanced",model="gpt-4"} 2' in text
+
+
+def test_write_json_summary(tmp_path):
+    """Test the JSON summary file, including quantiles past the last bucket."""
+    metrics = MetricsRegistry(buckets=(1.0,))
+    metrics.observe("llm_request_duration_seconds", 5.0, model="gpt-4", level="beginner")
+    path = tmp_path / "metrics.json"
+
+    metrics.write(str(path))
+
+    entry = json.loads(path.read_text())["llm_request_duration_seconds"][0]
+    assert entry["labels"] == {"level": "beginner", "model": "gpt-4"}
+    assert entry["p95"] == "+Inf"
+    with pytest.raises(ValueError):
+        metrics.write(str(path), format="csv")
+
+
+@pytest.fixture
+def stub_url():
+    """Run the stub server and point the OpenAI client at it."""
+    server, url = start_stub_server(latency=0.0, error_rate=0.3, retry_after=0.01, seed=5)
+    with patch.multiple('src.model.settings', OPENAI_BASE_URL=url, OPENAI_API_KEY="stub", OPENAI_MODEL="gpt-4o"):
+        yield server.RequestHandlerClass
+    server.shutdown()
+    server.server_close()
+
+
+def test_client_records_usage_and_retries_from_stub(stub_url):
+    """Test that the response's usage and each retry are recorded."""
+    metrics = MetricsRegistry()
+    client = OpenAIClient(retry_policy=RetryPolicy(max_retries=20), metrics=metrics)
+
+    for _ in range(4):
+        client.generate_flashcards("prompt " * 100, level="beginner")
+
+    labels = {"model": "gpt-4o", "level": "beginner"}
+    assert metrics.counter("llm_requests_total", outcome="ok", **labels) == 4
+    assert metrics.counter("llm_prompt_tokens_total", **labels) > 0
+    assert metrics.counter("llm_completion_tokens_total", **labels) > 0
+    assert metrics.counter("llm_cost_usd_total", **labels) > 0
+    assert metrics.histogram("llm_request_duration_seconds", **labels).count == 4
+    assert metrics.counter("llm_retries_total", reason="RateLimitError", **labels) == stub_url.rate_limited
+
+
+def test_generator_counts_parse_failures():
+    """Test that unparseable responses are counted by the request's model and level."""
+    metrics = MetricsRegistry()
+    with patch('src.flashcard_generator.OpenAIClient') as mock_client_cls, \
+            patch('src.model.settings.OPENAI_MODEL', "gpt-4o"):
+        mock_client_cls.return_value.generate_flashcards.return_value = "no cards here"
+        mock_client_cls.return_value.request_body.return_value = {"model": "gpt-4o-mini"}
+        generator = FlashcardGenerator(metrics=metrics)
+        generator.level = "advanced"
+        generator.generate(["only chunk"])
+
+    assert metrics.counter("llm_parse_failures_total", model="gpt-4o-mini", level="advanced") == 2
+    assert metrics.counter("llm_parse_failures_total", model="gpt-4o", level="advanced") == 0
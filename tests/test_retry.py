@@ -0,0 +1,253 @@
+"""
+Unit tests for retries, deadlines and hedged requests.
+The OpenAI client tests run against the local stub server in benchmarks/.
+"""
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from benchmarks.stub_openai_server import start_stub_server
+from src.model import OpenAIClient
+from src.retry import DeadlineExceeded, Hedger, LatencyTracker, RetryPolicy, retry_after_seconds
+
+
+class FakeClock:
+    """Clock advanced only by the fake sleep."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TransientError(Exception):
+    """Error carrying an optional Retry-After header."""
+
+    def __init__(self, retry_after=None):
+        super().__init__("transient")
+        headers = {"retry-after": retry_after} if retry_after is not None else {}
+        self.response = MagicMock(headers=headers)
+
+
+def _failing(failures: int, error=TransientError):
+    """Return a function that fails the given number of times, then succeeds."""
+    calls = []
+
+    def fn(timeout):
+        calls.append(timeout)
+        if len(calls) <= failures:
+            raise error()
+        return "ok"
+
+    return fn, calls
+
+
+def test_retries_with_bounded_jittered_backoff():
+    """Test that backoff grows exponentially within full-jitter bounds."""
+    clock = FakeClock()
+    policy = RetryPolicy(max_retries=4, base_delay=1.0, max_delay=3.0, sleep=clock.sleep, clock=clock)
+    fn, calls = _failing(4)
+
+    assert policy.call(fn) == "ok"
+    assert len(calls) == 5
+    assert policy.retries == 4
+    for retry, delay in enumerate(clock.sleeps):
+        assert 0 <= delay <= min(3.0, 2 ** retry)
+
+
+def test_gives_up_after_max_retries():
+    """Test that the last error is raised once retries are exhausted."""
+    clock = FakeClock()
+    policy = RetryPolicy(max_retries=2, sleep=clock.sleep, clock=clock)
+    fn, calls = _failing(10)
+
+    with pytest.raises(TransientError):
+        policy.call(fn)
+    assert len(calls) == 3
+
+
+def test_non_retryable_errors_are_raised_immediately():
+    """Test that the retryable predicate stops retries."""
+    policy = RetryPolicy(sleep=lambda s: None)
+    fn, calls = _failing(1, error=ValueError)
+
+    with pytest.raises(ValueError):
+        policy.call(fn, retryable=lambda exc: not isinstance(exc, ValueError))
+    assert len(calls) == 1
+
+
+def test_retry_after_replaces_backoff():
+    """Test that a Retry-After header sets the delay."""
+    clock = FakeClock()
+    policy = RetryPolicy(sleep=clock.sleep, clock=clock)
+    fn, _ = _failing(1, error=lambda: TransientError(retry_after="7"))
+
+    policy.call(fn)
+    assert clock.sleeps == [7.0]
+
+
+def test_deadline_caps_attempt_timeouts_and_retries():
+    """Test that attempts share the deadline and a retry past it is not made."""
+    clock = FakeClock()
+    policy = RetryPolicy(timeout=60.0, deadline=10.0, sleep=clock.sleep, clock=clock)
+    fn, calls = _failing(5, error=lambda: TransientError(retry_after="4"))
+
+    with pytest.raises(DeadlineExceeded):
+        policy.call(fn)
+    # Attempts at t=0, 4 and 8; a fourth would start after the deadline
+    assert calls == [10.0, 6.0, 2.0]
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({"retry-after-ms": "250"}, 0.25),
+    ({"retry-after": "3"}, 3.0),
+    ({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}, 0.0),
+    ({"retry-after": "soon"}, None),
+    ({}, None),
+])
+def test_retry_after_seconds(headers, expected):
+    """Test parsing of Retry-After hints."""
+    exc = Exception()
+    exc.response = MagicMock(headers=headers)
+    assert retry_after_seconds(exc) == expected
+
+
+def test_latency_tracker_percentile():
+    """Test that percentiles wait for enough samples."""
+    tracker = LatencyTracker(min_samples=10)
+    for i in range(9):
+        tracker.record(i)
+    assert tracker.percentile(0.95) is None
+
+    for i in range(9, 100):
+        tracker.record(i)
+    assert tracker.percentile(0.95) == 95
+
+
+def test_hedger_takes_first_response():
+    """Test that a call slower than p95 is hedged and the faster copy wins."""
+    tracker = LatencyTracker(min_samples=1)
+    tracker.record(0.01)
+    hedger = Hedger(tracker=tracker)
+    delays = iter([1.0, 0.0])
+
+    def request():
+        time.sleep(next(delays))
+        return "done"
+
+    start = time.perf_counter()
+    assert hedger.call(request) == "done"
+    assert time.perf_counter() - start < 0.5
+    assert (hedger.hedged, hedger.hedge_wins) == (1, 1)
+    hedger.close()
+
+
+def test_hedger_hedges_do_not_queue_behind_stragglers():
+    """Test that a hedge still starts while earlier losing primaries occupy the primary pool."""
+    tracker = LatencyTracker(min_samples=1)
+    tracker.record(0.01)
+    hedger = Hedger(tracker=tracker, max_concurrency=1)
+
+    def request():
+        # Primaries straggle; hedges answer at once
+        time.sleep(1.0 if threading.current_thread().name.startswith("primary") else 0.0)
+        return "done"
+
+    start = time.perf_counter()
+    assert [hedger.call(request) for _ in range(3)] == ["done"] * 3
+    assert time.perf_counter() - start < 0.5
+    assert hedger.hedge_wins == 3
+    hedger.close()
+
+
+def test_hedger_runs_unhedged_calls_inline():
+    """Test that calls made before the tracker has a threshold run on the caller's thread."""
+    hedger = Hedger(tracker=LatencyTracker(min_samples=5))
+    caller = threading.get_ident()
+
+    assert hedger.call(threading.get_ident) == caller
+    assert hedger.hedged == 0
+    hedger.close()
+
+
+@pytest.fixture
+def stub_settings():
+    """Point the OpenAI client at the local stub server."""
+    def start(**kwargs):
+        server, url = start_stub_server(**kwargs)
+        servers.append(server)
+        patcher = patch.multiple('src.model.settings', OPENAI_BASE_URL=url, OPENAI_API_KEY="stub", OPENAI_MODEL="stub")
+        patcher.start()
+        patchers.append(patcher)
+        return server.RequestHandlerClass
+
+    servers, patchers = [], []
+    yield start
+    for patcher in patchers:
+        patcher.stop()
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_client_retries_rate_limits_from_stub(stub_settings):
+    """Test that 429s with Retry-After are retried until the call succeeds."""
+    handler = stub_settings(latency=0.0, error_rate=0.5, retry_after=0.01, seed=3)
+    client = OpenAIClient(retry_policy=RetryPolicy(max_retries=20))
+
+    for _ in range(5):
+        assert "Stub question" in client.generate_flashcards("prompt")
+
+    assert handler.rate_limited > 0
+    assert client.retry_policy.retries == handler.rate_limited
+
+
+def test_client_does_not_retry_client_errors(stub_settings):
+    """Test that non-transient errors surface without retries."""
+    import openai
+
+    stub_settings(latency=0.0)
+    client = OpenAIClient()
+    with patch.object(client.client.chat.completions, 'create',
+                      side_effect=openai.BadRequestError("bad", response=MagicMock(status_code=400), body=None)):
+        with pytest.raises(openai.BadRequestError):
+            client.generate_flashcards("prompt")
+    assert client.retry_policy.retries == 0
+
+
+def test_client_hedges_slow_stub_request(stub_settings):
+    """Test that a request in the slow tail is hedged by a faster duplicate."""
+    stub_settings(latency=0.01, slow_every=2, slow_latency=2.0)
+    client = OpenAIClient(hedge=True)
+    client.hedger.tracker = LatencyTracker(min_samples=1)
+
+    client.generate_flashcards("warm up")  # request 1, fast
+    start = time.perf_counter()
+    client.generate_flashcards("prompt")  # request 2 is slow, its hedge is request 3
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 1.0
+    assert client.hedger.hedge_wins == 1
+
+    client.close()
+    with pytest.raises(RuntimeError):
+        client.generate_flashcards("after close", refresh=True)
+
+
+def test_client_streams_from_stub(stub_settings):
+    """Test that streamed completions reassemble into the full response."""
+    stub_settings(latency=0.0)
+    client = OpenAIClient()
+
+    pieces = list(client.stream_flashcards("prompt"))
+
+    assert len(pieces) > 1
+    assert "".join(pieces).startswith('[{"question": "Stub question 0')
@@ -0,0 +1,74 @@
+"""
+Unit tests for the shared Supabase client.
+The pooling test runs against the local PostgREST stand-in in benchmarks/.
+"""
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from benchmarks.stub_postgrest_server import start_stub_server
+from src import flashcards_db, supabase_client
+
+
+@pytest.fixture(autouse=True)
+def shared_client_state():
+    """Start and end each test without a shared client."""
+    supabase_client.close_supabase_client()
+    yield
+    supabase_client.close_supabase_client()
+
+
+def test_get_supabase_client_is_shared():
+    """Test that the client is created once and reused."""
+    with patch('src.supabase_client.create_supabase_client') as mock_create:
+        first = supabase_client.get_supabase_client()
+        second = supabase_client.get_supabase_client()
+
+    assert first is second
+    mock_create.assert_called_once_with()
+
+
+def test_close_and_reset_supabase_client():
+    """Test that close releases the connections and reset builds a new client."""
+    with patch('src.supabase_client.create_supabase_client', side_effect=lambda: MagicMock()) as mock_create:
+        first = supabase_client.get_supabase_client()
+        supabase_client.close_supabase_client()
+        first.options.httpx_client.close.assert_called_once()
+
+        second = supabase_client.reset_supabase_client()
+        assert second is not first
+        assert supabase_client.get_supabase_client() is second
+        assert mock_create.call_count == 2
+
+
+def test_forked_child_builds_its_own_client():
+    """Test that a client inherited from another process is replaced, not closed."""
+    with patch('src.supabase_client.create_supabase_client', side_effect=lambda: MagicMock()):
+        parent = supabase_client.get_supabase_client()
+        with patch('src.supabase_client.os.getpid', return_value=-1):
+            child = supabase_client.get_supabase_client()
+
+    assert child is not parent
+    parent.options.httpx_client.close.assert_not_called()
+
+
+def test_missing_credentials_raise():
+    """Test that a missing URL or key is reported before connecting."""
+    with patch.object(supabase_client, 'SUPABASE_URL', None):
+        with pytest.raises(ValueError):
+            supabase_client.get_supabase_client()
+
+
+def test_requests_reuse_pooled_connections():
+    """Test that repeated queries through the shared client use one keep-alive connection."""
+    server, url = start_stub_server()
+    try:
+        with patch.object(supabase_client, 'SUPABASE_URL', url), \
+             patch.object(supabase_client, 'SUPABASE_KEY', 'stub'):
+            for _ in range(5):
+                assert len(flashcards_db.get_flashcards(limit=3)) == 3
+    finally:
+        server.shutdown()
+
+    assert server.RequestHandlerClass.requests == 5
+    assert server.RequestHandlerClass.connections == 1
@@ -0,0 +1,131 @@
+"""
+Unit tests for the URL fetcher module.
+These tests run against a local HTTP server.
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.document import DocumentUploader
+from src.extraction_cache import ExtractionCache
+from src.url_fetcher import ConditionalCache, URLFetcher
+
+
+class _DocumentHandler(BaseHTTPRequestHandler):
+    """Serves text documents with an ETag and honours If-None-Match."""
+
+    full_responses = 0
+
+    def do_GET(self):
+        if self.path.startswith("/missing"):
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        etag = f'"{self.path}-v1"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        type(self).full_responses += 1
+        body = f"Notes served from {self.path}\n".encode() * 20
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    """Run a local HTTP server for the duration of a test."""
+    _DocumentHandler.full_responses = 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _DocumentHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_fetch_many(server):
+    """Test fetching several URLs concurrently with per-URL failures."""
+    urls = [f"{server}/doc{i}.txt" for i in range(5)] + [f"{server}/missing.txt"]
+
+    with URLFetcher(DocumentUploader(), max_workers=3, per_host_limit=2) as fetcher:
+        results = {r.url: r for r in fetcher.fetch_many(urls)}
+
+    assert len(results) == 6
+    assert not results[f"{server}/missing.txt"].ok
+    assert results[f"{server}/doc3.txt"].document.content.startswith("Notes served from /doc3.txt")
+    assert _DocumentHandler.full_responses == 5
+
+
+def test_not_modified_served_from_cache(server, test_files_dir):
+    """Test that an unchanged document is revalidated instead of re-downloaded."""
+    cache_path = str(test_files_dir / "validators.sqlite3")
+    uploader = DocumentUploader(cache=ExtractionCache(str(test_files_dir / "extraction")))
+    url = f"{server}/lecture.txt"
+
+    # Validators are committed on each fetch, without finishing the batch
+    with URLFetcher(uploader, cache=ConditionalCache(cache_path)) as fetcher:
+        first = next(fetcher.fetch_many([url]))
+
+    # A fresh fetcher reloads the validators from disk
+    with URLFetcher(uploader, cache=ConditionalCache(cache_path)) as fetcher:
+        second = fetcher.fetch(url)
+
+    assert not first.not_modified
+    assert second.not_modified
+    assert second.document.chunks == first.document.chunks
+    assert _DocumentHandler.full_responses == 1
+
+
+def test_evicted_document_is_downloaded_again(server, test_files_dir):
+    """Test that validators are not sent when the extracted document is no longer cached."""
+    extraction_cache = ExtractionCache(str(test_files_dir / "extraction"))
+    uploader = DocumentUploader(cache=extraction_cache)
+    url = f"{server}/lecture.txt"
+
+    with URLFetcher(uploader) as fetcher:
+        fetcher.fetch(url)
+        extraction_cache.clear()
+        second = fetcher.fetch(url)
+
+    assert not second.not_modified
+    assert second.document.content.startswith("Notes served from /lecture.txt")
+    assert _DocumentHandler.full_responses == 2
+
+
+def test_conditional_cache_is_bounded():
+    """Test that the least recently used validators are evicted past max_entries."""
+    cache = ConditionalCache(max_entries=2)
+    for i in range(3):
+        cache.put(f"https://example.com/{i}.pdf", f'"v{i}"', None, f"hash{i}", "pdf")
+
+    assert cache.get("https://example.com/0.pdf") is None
+    assert cache.get("https://example.com/2.pdf") == {
+        'etag': '"v2"', 'last_modified': None, 'content_hash': 'hash2', 'file_type': 'pdf'
+    }
+
+
+def test_upload_from_urls(server):
+    """Test the DocumentUploader batch URL entry point."""
+    results = list(DocumentUploader().upload_from_urls([f"{server}/a.txt", f"{server}/b.txt"]))
+
+    assert sorted(r.document.file_name for r in results) == ["a.txt", "b.txt"]
+
+
+def test_conditional_cache_requires_extraction_cache(test_files_dir):
+    """Test that a conditional cache is rejected when unchanged documents could not be served."""
+    with pytest.raises(ValueError, match="extraction cache"):
+        URLFetcher(DocumentUploader(), cache=ConditionalCache())
+
+    with pytest.raises(ValueError, match="extraction cache"):
+        DocumentUploader().upload_from_urls([], conditional_cache_path=str(test_files_dir / "v.sqlite3"))